@@ -0,0 +1,231 @@
+"""
+Minimal client for the adb server's host protocol.
+
+Every `adb` command line starts a process that connects to the local adb
+server (port 5037) and relays one request. AdbClient talks to that server
+directly over TCP, so a capture step costs a socket round trip instead of a
+process launch (or, on Windows, a PowerShell launch plus an adb launch).
+
+Protocol summary: a request is a 4-digit hex length followed by the
+payload; the server answers OKAY, or FAIL with a hex-length message.
+`host:transport:<serial>` binds the connection to a device, after which one
+service runs on it (`shell:`, `exec:`) and its output streams until the
+server closes the socket. `sync:` switches to the binary file transfer
+protocol, which can serve many requests; those sessions are pooled per
+device and reused across pulls.
+
+fake_adb_server.py implements the same protocol for trying this without
+devices.
+"""
+
+import os
+import socket
+import struct
+import threading
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = int(os.environ.get("ANDROID_ADB_SERVER_PORT", "5037"))
+
+
+class AdbProtocolError(Exception):
+    """Raised when the adb server answers FAIL or breaks the protocol."""
+
+
+def _recv_exact(sock, count):
+    """Read exactly count bytes from sock."""
+    chunks = []
+    while count:
+        chunk = sock.recv(min(count, 1 << 20))
+        if not chunk:
+            raise AdbProtocolError("adb server closed the connection")
+        chunks.append(chunk)
+        count -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv_all(sock):
+    """Read until the server closes the connection."""
+    chunks = []
+    while True:
+        chunk = sock.recv(1 << 20)
+        if not chunk:
+            return b"".join(chunks)
+        chunks.append(chunk)
+
+
+class AdbClient:
+    """Speaks the adb host protocol to a running adb server."""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=30):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._sync_sessions = {}
+        self._lock = threading.Lock()
+
+    def _connect(self, timeout=None):
+        """Open a new connection to the adb server (timeout defaults to the client's)."""
+        sock = socket.create_connection((self.host, self.port),
+                                        timeout=self.timeout if timeout is None else timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    def _request(self, sock, payload):
+        """Send one host request and check the server accepted it."""
+        data = payload.encode("utf-8")
+        sock.sendall(b"%04x" % len(data) + data)
+        status = _recv_exact(sock, 4)
+        if status == b"OKAY":
+            return
+        if status == b"FAIL":
+            length = int(_recv_exact(sock, 4), 16)
+            message = _recv_exact(sock, length).decode("utf-8", errors="replace")
+            raise AdbProtocolError(f"{payload}: {message}")
+        raise AdbProtocolError(f"{payload}: unexpected reply {status!r}")
+
+    def _read_length_prefixed(self, sock):
+        """Read a hex-length-prefixed reply body."""
+        length = int(_recv_exact(sock, 4), 16)
+        return _recv_exact(sock, length)
+
+    def _open_service(self, serial, service, timeout=None):
+        """Return a socket bound to a device with service started on it."""
+        sock = self._connect(timeout)
+        try:
+            self._request(sock, f"host:transport:{serial}" if serial else "host:transport-any")
+            self._request(sock, service)
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+
+    def version(self):
+        """Return the adb server's protocol version number."""
+        with self._connect() as sock:
+            self._request(sock, "host:version")
+            return int(self._read_length_prefixed(sock), 16)
+
+    def devices(self):
+        """Return [(serial, state)] for every device the server knows."""
+        with self._connect() as sock:
+            self._request(sock, "host:devices")
+            listing = self._read_length_prefixed(sock).decode("utf-8", errors="replace")
+        return [tuple(line.split("\t", 1)) for line in listing.splitlines() if "\t" in line]
+
+    def shell(self, serial, command):
+        """Run a shell command on a device and return its output bytes."""
+        with self._open_service(serial, f"shell:{command}") as sock:
+            return _recv_all(sock)
+
+    def exec_out(self, serial, command, timeout=None):
+        """Run a command with a raw, binary-safe output stream (adb exec-out)."""
+        with self._open_service(serial, f"exec:{command}", timeout) as sock:
+            return _recv_all(sock)
+
+    def screencap(self, serial, timeout=None):
+        """Return one raw framebuffer (see screencap.parse_raw_screencap)."""
+        return self.exec_out(serial, "screencap", timeout)
+
+    def _sync_session(self, serial):
+        """Return a pooled sync connection for a device, opening one if needed."""
+        with self._lock:
+            sock = self._sync_sessions.pop(serial, None)
+        return sock or self._open_service(serial, "sync:")
+
+    def _release_sync_session(self, serial, sock):
+        """Return a healthy sync connection to the pool."""
+        with self._lock:
+            previous = self._sync_sessions.get(serial)
+            self._sync_sessions[serial] = sock
+        if previous is not None:
+            previous.close()
+
+    def pull_bytes(self, serial, remote_path):
+        """Return the contents of a file on the device (adb pull)."""
+        sock = self._sync_session(serial)
+        try:
+            path = remote_path.encode("utf-8")
+            sock.sendall(b"RECV" + struct.pack("<I", len(path)) + path)
+            chunks = []
+            while True:
+                header = _recv_exact(sock, 8)
+                kind, length = header[:4], struct.unpack("<I", header[4:])[0]
+                if kind == b"DATA":
+                    chunks.append(_recv_exact(sock, length))
+                elif kind == b"DONE":
+                    break
+                elif kind == b"FAIL":
+                    message = _recv_exact(sock, length).decode("utf-8", errors="replace")
+                    # The session is still usable after a failed RECV
+                    self._release_sync_session(serial, sock)
+                    sock = None
+                    raise AdbProtocolError(f"pull {remote_path}: {message}")
+                else:
+                    raise AdbProtocolError(f"pull {remote_path}: unexpected packet {kind!r}")
+        except BaseException:
+            if sock is not None:
+                sock.close()
+            raise
+        self._release_sync_session(serial, sock)
+        return b"".join(chunks)
+
+    def pull(self, serial, remote_path, local_path):
+        """Copy a file from the device to local_path."""
+        data = self.pull_bytes(serial, remote_path)
+        with open(local_path, "wb") as f:
+            f.write(data)
+        return local_path
+
+    def run(self, args, serial=None):
+        """Run an adb command line given as arguments; return its output bytes.
+
+        Supports the forms the capture scripts use: `devices`,
+        `shell CMD...`, `exec-out CMD...` and `pull REMOTE LOCAL`.
+        """
+        args = list(args)
+        if args[:1] == ["-s"]:
+            serial, args = args[1], args[2:]
+        if args[:1] == ["devices"]:
+            lines = ["List of devices attached"] + [f"{s}\t{state}" for s, state in self.devices()]
+            return ("\n".join(lines) + "\n").encode("utf-8")
+        if args[:1] == ["shell"]:
+            return self.shell(serial, " ".join(args[1:]))
+        if args[:1] == ["exec-out"]:
+            return self.exec_out(serial, " ".join(args[1:]))
+        if args[:1] == ["pull"] and len(args) == 3:
+            self.pull(serial, args[1], args[2])
+            return b""
+        raise AdbProtocolError(f"unsupported adb command: {' '.join(args)}")
+
+    def close(self):
+        """Close every pooled sync session."""
+        with self._lock:
+            sessions, self._sync_sessions = self._sync_sessions, {}
+        for sock in sessions.values():
+            try:
+                sock.sendall(b"QUIT" + struct.pack("<I", 0))
+            except OSError:
+                pass
+            sock.close()
+
+
+_default_client = None
+
+
+def default_client():
+    """Return a shared AdbClient if an adb server is listening, else None.
+
+    Returns None when $ADB names a specific adb executable, so explicit
+    overrides (such as fake_adb.py) keep going through that executable.
+    """
+    global _default_client
+    if os.environ.get("ADB"):
+        return None
+    if _default_client is None:
+        client = AdbClient()
+        try:
+            client.version()
+        except (OSError, AdbProtocolError):
+            return None
+        _default_client = client
+    return _default_client
@@ -0,0 +1,350 @@
+"""
+Watch mode for generate_assets.py: regenerate and redeploy on every change.
+
+    python assets_store/generate_assets.py --watch [--source svg|original ...]
+
+The asset sources every output depends on (SVGs, the original artwork,
+fonts) and the generator modules in this folder are watched with inotify
+on Linux, or by polling modification times elsewhere. A burst of changes
+(an editor's save, a batch export) is collected until DEBOUNCE seconds
+pass without another event, then handled as one rebuild:
+
+  * changed generator modules are reloaded together with the modules that
+    import from them; modules that did not change keep their caches, so
+    parsed SVGs, decoded sources and loaded fonts stay warm in memory
+  * the build graph fingerprints source files and every module a
+    generator reaches, so it finds the outputs each change made stale
+  * only the stale outputs are rendered, and only those are redeployed
+    through deploy_engine (and web_bundle, for the web icon)
+
+Run this module with --check to confirm that editing any module constant
+a generator uses (a color scheme, a font name, ...) makes its outputs stale:
+
+    python assets_store/asset_watch.py --check
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import importlib
+import inspect
+import os
+import select
+import struct
+import sys
+import time
+import types
+
+import build_graph
+import deploy_app_icons
+import deploy_engine
+import font_service
+import text_layout
+import web_bundle
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Quiet time that ends a burst of changes, and the longest a burst may last
+DEBOUNCE = 0.3
+DEBOUNCE_MAX = 2.0
+
+# Polling interval where inotify is not available
+POLL_INTERVAL = 0.5
+
+# inotify_init1 flag and the events that mean a file's contents changed
+IN_CLOEXEC = 0o2000000
+IN_CLOSE_WRITE = 0x08
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_DELETE = 0x200
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """Reports changes to a set of files through Linux inotify, via libc."""
+
+    def __init__(self, files):
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.directories = {}
+        self.files = set()
+        self.update(files)
+
+    def update(self, files):
+        """Watch these files (their folders are watched, so saves by rename are seen)."""
+        self.files = {os.path.abspath(f) for f in files}
+        for directory in {os.path.dirname(f) for f in self.files} - set(self.directories.values()):
+            if not os.path.isdir(directory):
+                continue
+            wd = self.libc.inotify_add_watch(self.fd, directory.encode(), WATCH_MASK)
+            if wd >= 0:
+                self.directories[wd] = directory
+
+    def wait(self, timeout=None):
+        """Return the watched files changed before timeout (None waits forever)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        data = os.read(self.fd, 64 * 1024)
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+            offset += length
+            path = os.path.join(self.directories.get(wd, ""), name)
+            if path in self.files:
+                changed.add(path)
+        return changed
+
+
+class PollingWatcher:
+    """Reports changes to a set of files by comparing modification times."""
+
+    def __init__(self, files):
+        self.stamps = {}
+        self.update(files)
+
+    @staticmethod
+    def _stamp(path):
+        """Return what identifies a file's current version, or None if missing."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def update(self, files):
+        """Watch exactly these files from now on."""
+        files = {os.path.abspath(f) for f in files}
+        self.stamps = {f: self.stamps.get(f, self._stamp(f)) for f in files}
+
+    def wait(self, timeout=None):
+        """Return the watched files changed before timeout (None waits forever)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = set()
+            for path, stamp in self.stamps.items():
+                current = self._stamp(path)
+                if current != stamp:
+                    self.stamps[path] = current
+                    changed.add(path)
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            time.sleep(POLL_INTERVAL)
+
+
+def make_watcher(files):
+    """Return an inotify watcher where available, else a polling one."""
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(files)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(files)
+
+
+def wait_for_changes(watcher):
+    """Block until something changes, then collect the rest of the burst."""
+    changed = watcher.wait()
+    start = time.monotonic()
+    while time.monotonic() - start < DEBOUNCE_MAX:
+        more = watcher.wait(DEBOUNCE)
+        if not more:
+            break
+        changed |= more
+    return changed
+
+
+def local_modules():
+    """Return {file: module} for the loaded modules defined in this folder."""
+    modules = {}
+    for module in list(sys.modules.values()):
+        path = getattr(module, "__file__", None)
+        if (path and os.path.dirname(os.path.abspath(path)) == HERE
+                and module.__name__ not in ("__main__", __name__)):
+            modules[os.path.abspath(path)] = module
+    return modules
+
+
+def _imports(module, names):
+    """Return the modules among names that module refers to at top level."""
+    found = set()
+    for value in vars(module).values():
+        if isinstance(value, types.ModuleType):
+            source = value.__name__
+        else:
+            source = getattr(value, "__module__", None)
+        if source in names and source != module.__name__:
+            found.add(source)
+    return found
+
+
+def reload_modules(changed_files):
+    """Reload changed local modules and everything importing from them.
+
+    Returns the names of the reloaded modules. Dependencies are reloaded
+    before the modules that import them.
+    """
+    modules = {m.__name__: m for m in local_modules().values()}
+    stale = {m.__name__ for path, m in local_modules().items() if path in changed_files}
+    # Modules that import from a stale module hold references to its old objects
+    while True:
+        importers = {name for name, m in modules.items()
+                     if name not in stale and _imports(m, stale)}
+        if not importers:
+            break
+        stale |= importers
+
+    reloaded = []
+    pending = set(stale)
+    while pending:
+        ready = [name for name in sorted(pending) if not _imports(modules[name], pending)]
+        # An import cycle: reload the rest in any order
+        for name in ready or sorted(pending):
+            try:
+                modules[name] = importlib.reload(modules[name])
+                reloaded.append(name)
+            except Exception as e:
+                print(f"❌ Could not reload {name}: {e}")
+            pending.discard(name)
+    return reloaded
+
+
+def clear_font_caches():
+    """Drop loaded fonts and measured text so edited font files are read again."""
+    font_service._font_bytes.cache_clear()
+    font_service.get_font.cache_clear()
+    text_layout.text_width.cache_clear()
+    text_layout._line_box.cache_clear()
+    text_layout.fit_text.cache_clear()
+
+
+def watched_files(graph):
+    """Return every file a rebuild may depend on: sources, fonts and modules."""
+    files = set(local_modules())
+    for node in graph.nodes.values():
+        files.update(os.path.abspath(f) for f in node.get("deps", {}).get("files", {}))
+    return files
+
+
+def rebuild(graph, args):
+    """Render what is out of date and redeploy it; return the outputs written."""
+    generate_assets = importlib.import_module("generate_assets")
+    graph.built = graph.skipped = 0
+    graph.restored = []
+    graph.timings = []
+    generate_assets.schedule_assets(graph, args)
+    generate_assets.render_assets(graph, args)
+
+    outputs = {os.path.abspath(o) for o, _ in graph.timings} | \
+        {os.path.abspath(o) for o in graph.restored}
+    if outputs:
+        entries = [entry for group in deploy_engine.load_manifest().values() for entry in group]
+        stats = deploy_engine.deploy(entries, only=outputs)
+        print(f"🚀 Deployed: {deploy_engine.summarize(stats)}")
+    if web_bundle.DEFAULT_SOURCE in outputs:
+        deploy_app_icons.copy_web_icons()
+    return outputs
+
+
+def try_rebuild(graph, args):
+    """Rebuild, reporting an error instead of raising it; return the outputs or None."""
+    try:
+        return rebuild(graph, args)
+    except Exception as e:
+        # A half-saved source usually fails to parse; the next save recovers
+        graph.pending = []
+        print(f"❌ Rebuild failed: {type(e).__name__}: {e}")
+        print("👀 Still watching; fix the error and save again")
+        return None
+
+
+def watch(graph, args):
+    """Build once, then rebuild whatever each change affects until interrupted."""
+    start = time.perf_counter()
+    try_rebuild(graph, args)
+    # --force applies to the initial build; later rebuilds only redraw what changed
+    graph.force = False
+    print(f"\n👀 Watching for changes (initial build {time.perf_counter() - start:.1f}s)...")
+
+    watcher = make_watcher(watched_files(graph))
+    try:
+        while True:
+            changed = wait_for_changes(watcher)
+            if not changed:
+                continue
+            start = time.perf_counter()
+            print("\n✏️  Changed: " + ", ".join(sorted(os.path.relpath(p) for p in changed)))
+
+            if any(p.lower().endswith(font_service.FONT_EXTENSIONS) for p in changed):
+                clear_font_caches()
+
+            reloaded = reload_modules(changed)
+            if reloaded:
+                print(f"🔁 Reloaded {', '.join(reloaded)}")
+
+            outputs = try_rebuild(graph, args)
+            if outputs is None:
+                continue
+            print(f"✅ {len(outputs)} assets updated in {time.perf_counter() - start:.1f}s")
+            watcher.update(watched_files(graph))
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+
+
+def check_constants(module_name="generate_assets"):
+    """Edit each module constant the create_* generators use, one at a time,
+    and return the (generator, constant) pairs whose fingerprint did not change."""
+    module = importlib.import_module(module_name)
+    missed = []
+    checked = 0
+    for name, func in sorted(vars(module).items()):
+        if not (name.startswith("create_") and inspect.isfunction(func)
+                and func.__module__ == module.__name__):
+            continue
+        before = build_graph.function_fingerprint(func)
+        constants = set()
+        for helper in build_graph._same_module_helpers(func):
+            constants.update(n for n in build_graph._code_names(helper.__code__)
+                             if n in vars(module) and not callable(vars(module)[n])
+                             and not inspect.ismodule(vars(module)[n]))
+        for constant in sorted(constants):
+            original = getattr(module, constant)
+            setattr(module, constant, ("edited", original))
+            try:
+                if build_graph.function_fingerprint(func) == before:
+                    missed.append((name, constant))
+            finally:
+                setattr(module, constant, original)
+            checked += 1
+    print(f"Checked {checked} uses of module constants by {module_name} generators")
+    return missed
+
+
+def main(argv=None):
+    """Check that watch mode notices edits to generator module constants."""
+    parser = argparse.ArgumentParser(description="Watch mode support for generate_assets.py")
+    parser.add_argument("--check", action="store_true",
+                        help="check that editing a module constant makes the outputs using it stale")
+    args = parser.parse_args(argv)
+    if not args.check:
+        parser.error("run generate_assets.py --watch to watch; this module only has --check")
+
+    missed = check_constants()
+    for generator, constant in missed:
+        print(f"❌ {generator} does not notice edits to {constant}")
+    if missed:
+        sys.exit(1)
+    print("✅ Every module constant a generator uses is part of its fingerprint")
+
+
+if __name__ == "__main__":
+    main()
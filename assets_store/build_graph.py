@@ -0,0 +1,379 @@
+"""
+Dependency-tracked build state for the asset generator scripts.
+
+Every output PNG is recorded together with the inputs it was produced from:
+the generator function (and a hash of its source), the other modules of
+this folder it reaches (svg_raster, resize_engine, ...), the parameters it
+was called with, any files it reads (fonts, source images) and the script
+version. A rerun only redraws outputs whose recorded inputs changed or whose
+file was modified or deleted since the last build.
+
+With a RenderCache, an out-of-date output whose exact inputs were rendered
+before (on another branch, or before a revert) is restored from the cache
+instead of being redrawn.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import render_cache
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_STATE_PATH = os.path.join(HERE, ".asset_build_state.json")
+
+# Cache of file hashes keyed by (path, size, mtime) so each input file is
+# read at most once per run, no matter how many outputs depend on it.
+_file_hashes = {}
+
+
+def _digest(data):
+    """Return a short hex digest for the given bytes."""
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def _code_names(code):
+    """Return the global names code and its nested code objects (comprehensions,
+    lambdas) refer to."""
+    names = list(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names.extend(_code_names(const))
+    return names
+
+
+def _same_module_helpers(func):
+    """Yield func and every function of its module it (transitively) calls."""
+    seen = set()
+    stack = [func]
+    while stack:
+        current = stack.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        yield current
+
+        code = getattr(current, "__code__", None)
+        if code is None:
+            continue
+        for name in _code_names(code):
+            helper = current.__globals__.get(name)
+            # Look through decorators such as functools.lru_cache
+            helper = getattr(helper, "__wrapped__", helper)
+            if inspect.isfunction(helper) and helper.__module__ == func.__module__:
+                stack.append(helper)
+
+
+def generator_name(func):
+    """Return module.qualname for a generator, naming a script's module after
+    its file so running it directly and importing it record the same inputs."""
+    module = func.__module__
+    if module == "__main__":
+        path = getattr(sys.modules["__main__"], "__file__", None)
+        if path:
+            module = os.path.splitext(os.path.basename(path))[0]
+    return f"{module}.{func.__qualname__}"
+
+
+def _stable_value(value):
+    """Return a JSON-serializable form of a module constant that does not
+    change between runs (functions are named, not given by address)."""
+    if isinstance(value, dict):
+        return sorted([repr(k), _stable_value(v)] for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return [_stable_value(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted(repr(_stable_value(v)) for v in value)
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if callable(value):
+        return f"{getattr(value, '__module__', '')}.{getattr(value, '__qualname__', '')}"
+    return repr(value)
+
+
+def _module_constants(helper):
+    """Return {name: value} for the constants of its module a function uses."""
+    constants = {}
+    for name in _code_names(helper.__code__):
+        if name not in helper.__globals__:
+            continue
+        value = helper.__globals__[name]
+        if not (inspect.ismodule(value) or callable(value)):
+            constants[name] = _stable_value(value)
+    return constants
+
+
+def function_fingerprint(func):
+    """Return a hash of a generator function's source, its module helpers and
+    the module constants (color schemes, font names, ...) they use."""
+    sources = []
+    constants = {}
+    for helper in _same_module_helpers(func):
+        try:
+            sources.append(inspect.getsource(helper))
+        except (OSError, TypeError):
+            sources.append(f"{helper.__module__}.{helper.__qualname__}")
+        if hasattr(helper, "__code__"):
+            constants.update(_module_constants(helper))
+    data = "\n".join(sorted(sources)) + json.dumps(constants, sort_keys=True, default=str)
+    return _digest(data.encode("utf-8"))
+
+
+def _local_module(value):
+    """Return the module of this folder that value is or comes from, else None."""
+    if inspect.ismodule(value):
+        module = value
+    else:
+        module = sys.modules.get(getattr(value, "__module__", None) or "")
+    path = getattr(module, "__file__", None)
+    if path and os.path.dirname(os.path.abspath(path)) == HERE:
+        return module
+    return None
+
+
+def generator_modules(func):
+    """Return {name: module} for the other modules of this folder a generator reaches.
+
+    Starts from the modules the generator and its module helpers refer to
+    (including modules imported inside a function) and follows the modules
+    those import in turn.
+    """
+    found = {}
+    stack = []
+    for helper in _same_module_helpers(func):
+        code = getattr(helper, "__code__", None)
+        for name in _code_names(code) if code is not None else ():
+            stack.append(helper.__globals__.get(name, sys.modules.get(name)))
+
+    while stack:
+        module = _local_module(stack.pop())
+        if module is None or module.__name__ in found or module.__name__ in (
+                func.__module__, "__main__"):
+            continue
+        found[module.__name__] = module
+        stack.extend(vars(module).values())
+    return found
+
+
+def modules_fingerprint(func):
+    """Return {name: hash of its file} for the modules a generator reaches."""
+    return {name: file_fingerprint(module.__file__)
+            for name, module in sorted(generator_modules(func).items())}
+
+
+def file_fingerprint(path):
+    """Return a hash of a file's contents, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _file_hashes:
+        with open(path, "rb") as f:
+            _file_hashes[key] = _digest(f.read())
+    return _file_hashes[key]
+
+
+# A stale output waiting to be rendered; cost is used to schedule the largest
+# canvases first so they do not end up as the tail of a parallel run. Tasks
+# sharing a group are rendered one after another in the same process, so
+# per-process caches (splash layers, ...) are filled once per group.
+RenderTask = namedtuple("RenderTask", "output func args kwargs deps cost group")
+
+
+def _render(func, args, kwargs):
+    """Run one generator call and return how long it took (worker side)."""
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    # Generators may use the render cache themselves (see IconVariants)
+    render_cache.flush_default()
+    return time.perf_counter() - start
+
+
+def _render_batch(calls):
+    """Run (func, args, kwargs) calls in order; return how long each took."""
+    return [_render(func, args, kwargs) for func, args, kwargs in calls]
+
+
+def _normalize(value):
+    """Convert parameters to the JSON form they are stored in."""
+    return json.loads(json.dumps(value, sort_keys=True, default=str))
+
+
+class BuildGraph:
+    """Record of every generated output and the inputs it depends on."""
+
+    def __init__(self, state_path=DEFAULT_STATE_PATH, version=None, cache=None, force=False):
+        """With force, every output is redrawn: neither the recorded build
+        state nor the render cache is trusted (fresh renders are still cached)."""
+        self.state_path = state_path
+        self.version = version
+        self.cache = cache
+        self.force = force
+        self.nodes = {}
+        self.built = 0
+        self.skipped = 0
+        self.restored = []
+        self.pending = []
+        self.timings = []
+
+        if os.path.exists(state_path):
+            try:
+                with open(state_path) as f:
+                    state = json.load(f)
+                self.nodes = state.get("outputs", {})
+            except (OSError, ValueError):
+                # A corrupt state file just means a full rebuild
+                self.nodes = {}
+
+    def dependencies(self, func, params, files=()):
+        """Describe the inputs of one output."""
+        return _normalize({
+            "generator": generator_name(func),
+            "code": function_fingerprint(func),
+            "modules": modules_fingerprint(func),
+            "params": params,
+            "files": {path: file_fingerprint(path) for path in files},
+            "version": self.version,
+        })
+
+    def is_fresh(self, output, deps):
+        """Return True if output exists and was built from exactly these inputs."""
+        node = self.nodes.get(output)
+        if node is None or node.get("deps") != deps:
+            return False
+
+        try:
+            stat = os.stat(output)
+        except OSError:
+            return False
+        return node.get("size") == stat.st_size and node.get("mtime") == stat.st_mtime_ns
+
+    def record(self, output, deps):
+        """Remember that output was just built from deps."""
+        stat = os.stat(output)
+        self.nodes[output] = {
+            "deps": deps,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+        }
+
+    @staticmethod
+    def _cache_key(deps):
+        """Return the render cache key of an output.
+
+        deps carries the hashes of the generator's code and of every module
+        it reaches, so another branch's version of svg_raster.py or
+        resize_engine.py never restores this one's bytes.
+        """
+        return render_cache.cache_key("BuildGraph", deps)
+
+    def _restore(self, output, deps):
+        """Restore output from the render cache if these inputs were rendered before."""
+        if self.cache is None or not self.cache.get_file(self._cache_key(deps), output):
+            return False
+        self.record(output, deps)
+        self.restored.append(output)
+        return True
+
+    def _store(self, output, deps):
+        """Add a freshly rendered output to the render cache."""
+        if self.cache is not None:
+            self.cache.put_file(self._cache_key(deps), output)
+
+    def build(self, output, func, *args, files=(), **kwargs):
+        """Call func(*args, **kwargs) to produce output, unless it is up to date."""
+        deps = self.dependencies(func, {"args": args, "kwargs": kwargs}, files)
+        if not self.force and self.is_fresh(output, deps):
+            self.skipped += 1
+            return False
+        if not self.force and self._restore(output, deps):
+            return True
+
+        func(*args, **kwargs)
+        self.record(output, deps)
+        self._store(output, deps)
+        self.built += 1
+        return True
+
+    def schedule(self, output, func, *args, files=(), cost=0, group=None, **kwargs):
+        """Queue func(*args, **kwargs) to produce output if it is out of date.
+
+        Stale outputs scheduled with the same group are rendered by one worker.
+        """
+        deps = self.dependencies(func, {"args": args, "kwargs": kwargs}, files)
+        if not self.force and self.is_fresh(output, deps):
+            self.skipped += 1
+            return False
+        if not self.force and self._restore(output, deps):
+            return True
+
+        self.pending.append(RenderTask(output, func, args, kwargs, deps, cost, group))
+        return True
+
+    def _batches(self):
+        """Group the pending tasks into batches, largest total cost first."""
+        batches = {}
+        for task in sorted(self.pending, key=lambda task: task.cost, reverse=True):
+            key = ("output", task.output) if task.group is None else ("group", task.group)
+            batches.setdefault(key, []).append(task)
+        return sorted(batches.values(), key=lambda batch: sum(t.cost for t in batch),
+                      reverse=True)
+
+    def run(self, jobs=1):
+        """Render all scheduled tasks, largest first, on up to jobs processes."""
+        batches = self._batches()
+        self.pending = []
+        if not batches:
+            return
+
+        if jobs <= 1:
+            for batch in batches:
+                for task in batch:
+                    self._finish(task, _render(task.func, task.args, task.kwargs))
+            return
+
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {}
+            for batch in batches:
+                calls = [(task.func, task.args, task.kwargs) for task in batch]
+                futures[pool.submit(_render_batch, calls)] = batch
+            for future in as_completed(futures):
+                for task, seconds in zip(futures[future], future.result()):
+                    self._finish(task, seconds)
+
+    def _finish(self, task, seconds):
+        """Record a completed task and its render time."""
+        self.record(task.output, task.deps)
+        self._store(task.output, task.deps)
+        self.timings.append((task.output, seconds))
+        self.built += 1
+
+    def report_timings(self, wall_time=None):
+        """Print per-task render times, slowest first."""
+        if not self.timings:
+            return
+
+        print("\nRender timings:")
+        for output, seconds in sorted(self.timings, key=lambda t: t[1], reverse=True):
+            print(f"  {seconds * 1000:8.1f} ms  {output}")
+
+        total = sum(seconds for _, seconds in self.timings)
+        print(f"  {total * 1000:8.1f} ms  total render time")
+        if wall_time:
+            print(f"  {wall_time * 1000:8.1f} ms  wall time ({total / wall_time:.1f}x parallelism)")
+
+    def save(self):
+        """Write the build state atomically next to the previous one."""
+        state = {"version": self.version, "outputs": self.nodes}
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.state_path)
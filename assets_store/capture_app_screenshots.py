@@ -3,11 +3,15 @@
 Simple screenshot capture for AAC app Play Store submission.
 """
 
+import argparse
+import asyncio
 import os
 import subprocess
-import time
 from datetime import datetime
 
+from multi_device_capture import SCENARIO_FILE, capture_all_devices, load_scenarios
+from screencap import ScreencapError, capture_png
+
 def capture_screenshot(filename, description):
     """Capture a screenshot using ADB."""
     print(f"\n📸 {description}")
@@ -19,26 +23,34 @@ def capture_screenshot(filename, description):
     filepath = os.path.join(screenshot_dir, filename)
     
     try:
-        # Capture screenshot using ADB
-        result = subprocess.run([
-            "adb", "exec-out", "screencap", "-p"
-        ], capture_output=True, check=True)
-        
-        # Save the screenshot
-        with open(filepath, "wb") as f:
-            f.write(result.stdout)
+        # Stream raw frames until the UI has settled; the PNG is encoded on this machine
+        capture_png(filepath, wait_stable=True)
         
         print(f"✅ Screenshot saved: {filepath}")
         return True
         
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Error capturing screenshot: {e}")
-        return False
     except FileNotFoundError:
         print("❌ ADB not found. Please ensure Android SDK is installed and ADB is in PATH.")
         print("🔧 Alternative: Take screenshots manually on your device and save them to:")
         print(f"   {screenshot_dir}/")
         return False
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError,
+            ScreencapError) as e:
+        print(f"❌ Error capturing screenshot: {e}")
+        return False
+
+def capture_scenario(scenario_file, restart=False):
+    """Capture a scenario file unattended: no prompts, no fixed delays."""
+    print("🎬 AAC App Screenshot Capture for Play Store (unattended)")
+    print("=" * 50)
+    
+    # Each shot waits for its readiness condition; finished shots are journaled
+    captured = asyncio.run(capture_all_devices(load_scenarios(scenario_file),
+                                               output_root="promotional/screenshots/android",
+                                               resume=not restart))
+    total = sum(len(paths) for paths in captured.values())
+    print(f"\n🎉 Captured {total} screenshots on {len(captured)} device(s)")
+    return bool(captured)
 
 def capture_all_screenshots():
     """Capture all required screenshots for Play Store submission."""
@@ -46,7 +58,7 @@ def capture_all_screenshots():
     print("🎬 AAC App Screenshot Capture for Play Store")
     print("=" * 50)
     print("📱 Make sure your app is running on the connected Android device!")
-    print("⏰ You'll have 10 seconds between each screenshot to navigate the app.")
+    print("⏱️  Each screenshot is taken as soon as the screen stops animating.")
     print()
     
     screenshots = [
@@ -67,10 +79,6 @@ def capture_all_screenshots():
         success = capture_screenshot(filename, description)
         if not success:
             print("⚠️  Screenshot failed - please capture manually")
-        
-        if i < len(screenshots):
-            print("⏰ 5 seconds to navigate to next screen...")
-            time.sleep(5)
     
     print("\n🎉 Screenshot capture complete!")
     print(f"📁 Screenshots saved in: promotional/screenshots/android/phone/")
@@ -80,4 +88,15 @@ def capture_all_screenshots():
     print("   3. Create feature graphic if needed")
 
 if __name__ == "__main__":
-    capture_all_screenshots()
+    parser = argparse.ArgumentParser(description="Capture Play Store screenshots")
+    parser.add_argument("--scenario", nargs="?", const=SCENARIO_FILE, default=None,
+                        help="run a scenario file unattended instead of prompting "
+                             "(default file: capture_scenarios.json)")
+    parser.add_argument("--restart", action="store_true",
+                        help="with --scenario, recapture shots the journal lists as done")
+    args = parser.parse_args()
+    
+    if args.scenario:
+        capture_scenario(args.scenario, args.restart)
+    else:
+        capture_all_screenshots()
@@ -4,16 +4,24 @@ Automated screenshot capture script for AAC Communication Helper.
 This script helps capture screenshots for app store submission.
 """
 
+import argparse
+import asyncio
 import os
 import time
 import subprocess
 from datetime import datetime
 
+from adb_client import AdbProtocolError, default_client
+from multi_device_capture import SCENARIO_FILE, capture_all_devices, load_scenarios
+from screencap import ScreencapError, ScreencapWriter, capture_png
+
 def create_screenshot_directories():
     """Create directory structure for screenshots."""
     directories = [
         "assets_store/promotional/screenshots/android/phone",
         "assets_store/promotional/screenshots/android/tablet", 
+        "assets_store/promotional/screenshots/android/tablet_7",
+        "assets_store/promotional/screenshots/android/tablet_10",
         "assets_store/promotional/screenshots/ios/iphone",
         "assets_store/promotional/screenshots/ios/ipad",
         "assets_store/promotional/feature_graphics"
@@ -23,39 +31,48 @@ def create_screenshot_directories():
         os.makedirs(directory, exist_ok=True)
         print(f"📁 Created directory: {directory}")
 
-def capture_android_screenshot(filename, device_id=None):
-    """Capture screenshot from Android device/emulator."""
+def capture_android_screenshot(filename, device_id=None, writer=None):
+    """Capture screenshot from Android device/emulator.
+
+    With a ScreencapWriter the PNG is encoded in the background and this
+    returns as soon as the framebuffer has been transferred.
+    """
     try:
         # Get device ID if not provided
         if not device_id:
-            result = subprocess.run(['adb', 'devices'], capture_output=True, text=True)
-            lines = result.stdout.strip().split('\n')[1:]  # Skip header
-            devices = [line.split()[0] for line in lines if 'device' in line]
+            client = default_client()
+            if client is not None:
+                devices = [serial for serial, state in client.devices() if state == 'device']
+            else:
+                result = subprocess.run(['adb', 'devices'], capture_output=True, text=True)
+                lines = result.stdout.strip().split('\n')[1:]  # Skip header
+                devices = [line.split()[0] for line in lines if 'device' in line]
             if not devices:
                 print("❌ No Android devices found")
                 return False
             device_id = devices[0]
         
-        # Capture screenshot
-        temp_path = "/sdcard/screenshot.png"
+        # Stream the raw framebuffer and encode the PNG on this machine
         local_path = f"assets_store/promotional/screenshots/android/phone/{filename}"
-        
-        # Take screenshot on device
-        subprocess.run(['adb', '-s', device_id, 'shell', 'screencap', '-p', temp_path])
-        
-        # Pull screenshot to local machine
-        subprocess.run(['adb', '-s', device_id, 'pull', temp_path, local_path])
-        
-        # Clean up device
-        subprocess.run(['adb', '-s', device_id, 'shell', 'rm', temp_path])
+        if writer is not None:
+            future = writer.capture_when_stable(local_path, device_id)
+            future.add_done_callback(_report_encode_error)
+        else:
+            capture_png(local_path, device_id, wait_stable=True)
         
         print(f"📸 Captured Android screenshot: {local_path}")
         return True
         
-    except subprocess.CalledProcessError as e:
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError,
+            AdbProtocolError, ScreencapError) as e:
         print(f"❌ Error capturing Android screenshot: {e}")
         return False
 
+def _report_encode_error(future):
+    """Print a background PNG encode failure instead of losing it."""
+    if future.exception() is not None:
+        print(f"❌ Error saving Android screenshot: {future.exception()}")
+
 def capture_ios_screenshot(filename, simulator_name="iPhone 14"):
     """Capture screenshot from iOS Simulator."""
     try:
@@ -102,8 +119,9 @@ def interactive_screenshot_session():
     print("1. Android")
     print("2. iOS Simulator")
     print("3. Both")
+    print("4. All connected Android devices at once")
     
-    choice = input("\nEnter choice (1-3): ").strip()
+    choice = input("\nEnter choice (1-4): ").strip()
     
     # Define screenshot scenarios
     scenarios = [
@@ -122,17 +140,31 @@ def interactive_screenshot_session():
         print("Make sure your Android device/emulator is connected and the app is running.")
         input("Press Enter when ready...")
         
+        # PNGs are encoded in the background while you navigate to the next screen
+        with ScreencapWriter() as writer:
+            for filename, description in scenarios:
+                print(f"\n📸 Next screenshot: {description}")
+                print("Navigate to the appropriate screen in your app.")
+                input("Press Enter to capture screenshot...")
+                
+                if capture_android_screenshot(filename, writer=writer):
+                    print(f"✅ Captured: {filename}")
+                else:
+                    print(f"❌ Failed to capture: {filename}")
+    
+    if choice == '4':  # Every Android device, captured concurrently
+        print("\n📱 Starting capture on every connected Android device...")
+        print("Screenshots are sorted into phone / tablet_7 / tablet_10 folders.")
+        input("Press Enter when ready...")
+        
         for filename, description in scenarios:
             print(f"\n📸 Next screenshot: {description}")
-            print("Navigate to the appropriate screen in your app.")
+            print("Navigate to the appropriate screen on every device.")
             input("Press Enter to capture screenshot...")
             
-            if capture_android_screenshot(filename):
-                print(f"✅ Captured: {filename}")
-            else:
-                print(f"❌ Failed to capture: {filename}")
-            
-            time.sleep(1)  # Brief pause between captures
+            step = {"name": filename, "description": description}
+            # The user just navigated here, so capture even if the journal has it
+            asyncio.run(capture_all_devices([step], resume=False))
     
     if choice in ['2', '3']:  # iOS
         print("\n📱 Starting iOS screenshot capture...")
@@ -159,19 +191,16 @@ def interactive_screenshot_session():
 def create_feature_graphic():
     """Create a feature graphic for Google Play Store."""
     try:
-        from PIL import Image, ImageDraw, ImageFont
+        from PIL import Image, ImageDraw
+        from font_service import get_font
         
         # Create feature graphic (1024 x 500)
         img = Image.new('RGB', (1024, 500), color=(78, 205, 196))  # Teal background
         draw = ImageDraw.Draw(img)
         
         # Add app title
-        try:
-            font_large = ImageFont.truetype("arial.ttf", 48)
-            font_medium = ImageFont.truetype("arial.ttf", 24)
-        except:
-            font_large = ImageFont.load_default()
-            font_medium = ImageFont.load_default()
+        font_large = get_font(48, "Arial")
+        font_medium = get_font(24, "Arial")
         
         # Title
         title = "AAC Communication Helper"
@@ -210,12 +239,28 @@ def create_feature_graphic():
     except Exception as e:
         print(f"❌ Error creating feature graphic: {e}")
 
-def main():
+def main(argv=None):
     """Main function to run screenshot capture."""
+    parser = argparse.ArgumentParser(description="Capture app store screenshots")
+    parser.add_argument("--scenario", nargs="?", const=SCENARIO_FILE, default=None,
+                        help="run a scenario file unattended on every Android device "
+                             "(default file: capture_scenarios.json)")
+    parser.add_argument("--restart", action="store_true",
+                        help="with --scenario, recapture shots the journal lists as done")
+    args = parser.parse_args(argv)
+    
     print("🎯 AAC Communication Helper - Screenshot Capture Tool")
     print("This tool helps you capture screenshots for app store submission.")
     print()
     
+    if args.scenario:
+        # No prompts or fixed delays: each shot waits for its readiness condition
+        create_screenshot_directories()
+        asyncio.run(capture_all_devices(load_scenarios(args.scenario),
+                                        resume=not args.restart))
+        create_feature_graphic()
+        return
+    
     print("Options:")
     print("1. Interactive screenshot session")
     print("2. Create feature graphic only")
@@ -1,178 +1,69 @@
 #!/usr/bin/env python3
 """
 Deploy generated app icons to their proper locations in the Flutter project.
+
+What goes where is listed in deploy_manifest.json; see deploy_engine for how
+unchanged files are skipped and changed ones linked or copied into place.
+Web icons are built into a favicon.ico and manifest icons by web_bundle.
 """
 
-import os
-import shutil
+import argparse
+
+from PIL import Image
+
+import web_bundle
+from deploy_engine import PLACE_METHODS, deploy, format_report, load_manifest, summarize
+from resize_engine import IconVariants
+
+def deploy_group(group, mode="auto", dry_run=False):
+    """Deploy one platform group of the manifest and print a summary."""
+    stats = deploy(load_manifest()[group], mode=mode, dry_run=dry_run)
+    print(f"   {summarize(stats)}")
+    report = format_report(stats)
+    if report:
+        print(f"   {report}")
+    return stats
 
-def copy_android_icons():
-    """Copy Android icons to proper mipmap directories."""
-    android_mappings = [
-        # (source_file, target_directory, target_filename)
-        ("assets_store/icons/android/ic_launcher_48.png", "android/app/src/main/res/mipmap-mdpi", "ic_launcher.png"),
-        ("assets_store/icons/android/ic_launcher_72.png", "android/app/src/main/res/mipmap-hdpi", "ic_launcher.png"),
-        ("assets_store/icons/android/ic_launcher_96.png", "android/app/src/main/res/mipmap-xhdpi", "ic_launcher.png"),
-        ("assets_store/icons/android/ic_launcher_144.png", "android/app/src/main/res/mipmap-xxhdpi", "ic_launcher.png"),
-        ("assets_store/icons/android/ic_launcher_192.png", "android/app/src/main/res/mipmap-xxxhdpi", "ic_launcher.png"),
-        
-        # Round icons (same source, different name)
-        ("assets_store/icons/android/ic_launcher_48.png", "android/app/src/main/res/mipmap-mdpi", "ic_launcher_round.png"),
-        ("assets_store/icons/android/ic_launcher_72.png", "android/app/src/main/res/mipmap-hdpi", "ic_launcher_round.png"),
-        ("assets_store/icons/android/ic_launcher_96.png", "android/app/src/main/res/mipmap-xhdpi", "ic_launcher_round.png"),
-        ("assets_store/icons/android/ic_launcher_144.png", "android/app/src/main/res/mipmap-xxhdpi", "ic_launcher_round.png"),
-        ("assets_store/icons/android/ic_launcher_192.png", "android/app/src/main/res/mipmap-xxxhdpi", "ic_launcher_round.png"),
-    ]
-    
-    print("Copying Android icons...")
-    for source, target_dir, target_file in android_mappings:
-        if os.path.exists(source):
-            os.makedirs(target_dir, exist_ok=True)
-            target_path = os.path.join(target_dir, target_file)
-            shutil.copy2(source, target_path)
-            print(f"✅ Copied {source} -> {target_path}")
-        else:
-            print(f"❌ Source not found: {source}")
+def copy_android_icons(mode="auto", dry_run=False):
+    """Deploy Android icons to the mipmap directories, as WebP where that is smaller."""
+    print("Deploying Android icons...")
+    return deploy_group("android", mode, dry_run)
 
-def copy_ios_icons():
-    """Copy iOS icons to proper iOS directory."""
-    ios_source_dir = "assets_store/icons/ios"
-    ios_target_dir = "ios/Runner/Assets.xcassets/AppIcon.appiconset"
-    
-    # Create Contents.json for iOS AppIcon set
-    contents_json = """{
-  "images" : [
-    {
-      "filename" : "Icon-40.png",
-      "idiom" : "ipad",
-      "scale" : "1x",
-      "size" : "40x40"
-    },
-    {
-      "filename" : "Icon-80.png",
-      "idiom" : "ipad",
-      "scale" : "2x",
-      "size" : "40x40"
-    },
-    {
-      "filename" : "Icon-76.png",
-      "idiom" : "ipad",
-      "scale" : "1x",
-      "size" : "76x76"
-    },
-    {
-      "filename" : "Icon-152.png",
-      "idiom" : "ipad",
-      "scale" : "2x",
-      "size" : "76x76"
-    },
-    {
-      "filename" : "Icon-167.png",
-      "idiom" : "ipad",
-      "scale" : "2x",
-      "size" : "83.5x83.5"
-    },
-    {
-      "filename" : "Icon-60.png",
-      "idiom" : "iphone",
-      "scale" : "2x",
-      "size" : "30x30"
-    },
-    {
-      "filename" : "Icon-87.png",
-      "idiom" : "iphone",
-      "scale" : "3x",
-      "size" : "29x29"
-    },
-    {
-      "filename" : "Icon-80.png",
-      "idiom" : "iphone",
-      "scale" : "2x",
-      "size" : "40x40"
-    },
-    {
-      "filename" : "Icon-120.png",
-      "idiom" : "iphone",
-      "scale" : "3x",
-      "size" : "40x40"
-    },
-    {
-      "filename" : "Icon-120.png",
-      "idiom" : "iphone",
-      "scale" : "2x",
-      "size" : "60x60"
-    },
-    {
-      "filename" : "Icon-180.png",
-      "idiom" : "iphone",
-      "scale" : "3x",
-      "size" : "60x60"
-    },
-    {
-      "filename" : "Icon-1024.png",
-      "idiom" : "ios-marketing",
-      "scale" : "1x",
-      "size" : "1024x1024"
-    }
-  ],
-  "info" : {
-    "author" : "xcode",
-    "version" : 1
-  }
-}"""
-    
-    print("Copying iOS icons...")
-    os.makedirs(ios_target_dir, exist_ok=True)
-    
-    # Copy all iOS icon files
-    for filename in os.listdir(ios_source_dir):
-        if filename.endswith('.png'):
-            source_path = os.path.join(ios_source_dir, filename)
-            target_path = os.path.join(ios_target_dir, filename)
-            shutil.copy2(source_path, target_path)
-            print(f"✅ Copied {source_path} -> {target_path}")
-    
-    # Create Contents.json
-    contents_path = os.path.join(ios_target_dir, "Contents.json")
-    with open(contents_path, 'w') as f:
-        f.write(contents_json)
-    print(f"✅ Created {contents_path}")
+def copy_ios_icons(mode="auto", dry_run=False):
+    """Deploy iOS icons and generate the AppIcon set's Contents.json."""
+    print("Deploying iOS icons...")
+    return deploy_group("ios", mode, dry_run)
 
-def copy_web_icons():
-    """Copy web icons to assets/icons directory."""
-    web_source_dir = "assets_store/icons/web"
-    web_target_dir = "assets/icons"
-    
-    web_mappings = [
-        ("icon-16.png", "web_icon_16x16.png"),
-        ("icon-32.png", "web_icon_32x32.png"),
-        ("icon-192.png", "web_icon_192x192.png"),
-        ("icon-512.png", "web_icon_512x512.png"),
-    ]
-    
-    print("Copying web icons...")
-    os.makedirs(web_target_dir, exist_ok=True)
-    
-    for source_name, target_name in web_mappings:
-        source_path = os.path.join(web_source_dir, source_name)
-        target_path = os.path.join(web_target_dir, target_name)
-        if os.path.exists(source_path):
-            shutil.copy2(source_path, target_path)
-            print(f"✅ Copied {source_path} -> {target_path}")
-        else:
-            print(f"❌ Source not found: {source_path}")
+def copy_web_icons(mode="auto", dry_run=False):
+    """Build favicon.ico and the manifest icons in web/ from the 512px web icon."""
+    print("Deploying web icons...")
+    if dry_run:
+        print(f"   dry run: would build the web icon bundle from {web_bundle.DEFAULT_SOURCE}")
+        return None
+    with Image.open(web_bundle.DEFAULT_SOURCE) as img:
+        variants = IconVariants(img.convert("RGBA"))
+    return web_bundle.build_bundle(variants)
 
-def main():
+def main(argv=None):
     """Deploy all generated icons to their proper locations."""
+    parser = argparse.ArgumentParser(description="Deploy generated icons into the app projects")
+    parser.add_argument("--mode", choices=("auto",) + PLACE_METHODS, default="auto",
+                        help="how to create changed files: reflink, hardlink or copy "
+                             "(default: auto, a reflink where the filesystem supports it, "
+                             "else a copy; hardlinked targets change with their source)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="show what would change without touching any file")
+    args = parser.parse_args(argv)
+
     print("🚀 Deploying new app icons...")
     print("=" * 50)
-    
-    copy_android_icons()
+
+    copy_android_icons(args.mode, args.dry_run)
     print()
-    copy_ios_icons()
+    copy_ios_icons(args.mode, args.dry_run)
     print()
-    copy_web_icons()
-    
+    copy_web_icons(args.mode, args.dry_run)
+
     print("=" * 50)
     print("✅ All app icons deployed successfully!")
     print("\nNext steps:")
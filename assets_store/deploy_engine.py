@@ -0,0 +1,293 @@
+"""
+Manifest-driven deployment of generated assets into the app projects.
+
+deploy_manifest.json lists, per platform group, each generated source and
+the files it is deployed to. A target whose contents already match its
+source (same inode, or same size and SHA-256) is left alone. Otherwise
+it is replaced atomically. The new file is first placed next to the
+target under a temporary name, then renamed over it. The new file is
+made, in order of preference:
+
+  * a reflink, a copy-on-write clone (Linux, on Btrfs, XFS and similar)
+  * a plain copy
+
+so the same icon deployed as ic_launcher.png and ic_launcher_round.png in
+five mipmap folders costs no extra disk space where the filesystem allows.
+A hardlink to the source is only made when asked for (mode="hardlink"):
+the deployed file then shares the source's inode, so regenerating the
+source rewrites the shipped icon without a deploy.
+
+Entries with a "catalog" list also describe asset catalog images, and the
+Contents.json of each target folder is generated from them, so it only
+references files that are actually deployed.
+
+Entries with a "formats" list (Android resources) are deployed in whichever
+of those formats is smallest, see format_select. The target's extension is
+replaced accordingly and the file in the other format is removed, since
+Android rejects two resources with the same name.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from collections import Counter, OrderedDict
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MANIFEST_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "deploy_manifest.json")
+
+# How targets may be created
+PLACE_METHODS = ("reflink", "hardlink", "copy")
+
+# What "auto" tries, in this order; a target never aliases its source
+AUTO_METHODS = ("reflink", "copy")
+
+# Linux ioctl that clones a file's extents (copy-on-write)
+FICLONE = 0x40049409
+
+CATALOG_INFO = OrderedDict([("author", "xcode"), ("version", 1)])
+
+
+class ManifestError(Exception):
+    """Raised when the deploy manifest is malformed."""
+
+
+def load_manifest(path=MANIFEST_FILE):
+    """Return {group: [entry, ...]} from a deploy manifest.
+
+    Each entry has a "source", a list of "targets" and optionally a
+    "catalog" list of {"idiom", "size", "scale"} images for Contents.json.
+    """
+    with open(path) as f:
+        manifest = json.load(f)
+
+    groups = OrderedDict()
+    for group, entries in manifest.items():
+        if group == "notes":
+            continue
+        if not isinstance(entries, list):
+            raise ManifestError(f"{path}: {group} must be a list of entries")
+        for entry in entries:
+            if not entry.get("source") or not entry.get("targets"):
+                raise ManifestError(f"{path}: every {group} entry needs a source and targets")
+            if entry.get("formats") and entry.get("catalog"):
+                raise ManifestError(f"{path}: {entry['source']}: asset catalog images "
+                                    "cannot change format")
+        groups[group] = entries
+    return groups
+
+
+def file_digest(path):
+    """Return the SHA-256 of a file's contents."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _reflink(source, dest):
+    """Clone source to dest sharing its data blocks; raises OSError if unsupported."""
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError("reflinks are not supported on this platform")
+    with open(source, "rb") as src, open(dest, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            dst.close()
+            os.remove(dest)
+            raise
+    shutil.copystat(source, dest)
+
+
+def _place(method, source, dest):
+    """Create dest from source with one method."""
+    if method == "reflink":
+        _reflink(source, dest)
+    elif method == "hardlink":
+        os.link(source, dest)
+    else:
+        shutil.copy2(source, dest)
+
+
+def place_file(source, target, mode="auto"):
+    """Atomically replace target with source's contents; return the method used."""
+    os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+    temp = os.path.join(os.path.dirname(target),
+                        f".{os.path.basename(target)}.{os.getpid()}.tmp")
+    methods = AUTO_METHODS if mode == "auto" else (mode,)
+    for method in methods:
+        try:
+            _place(method, source, temp)
+        except OSError:
+            if os.path.lexists(temp):
+                os.remove(temp)
+            if method == methods[-1]:
+                raise
+            continue
+        os.replace(temp, target)
+        return method
+
+
+def is_current(source, target, source_digest, mode="auto"):
+    """Return True if target already holds source's contents.
+
+    A target hardlinked to its source only counts as current in "hardlink"
+    mode; otherwise it is replaced, so it stops changing with the source.
+    """
+    try:
+        if os.path.samefile(source, target):
+            return mode == "hardlink"
+        if os.path.getsize(source) != os.path.getsize(target):
+            return False
+    except OSError:
+        return False
+    return file_digest(target) == source_digest
+
+
+def holds(path, data):
+    """Return True if the file at path holds exactly data."""
+    try:
+        with open(path, "rb") as f:
+            return f.read() == data
+    except OSError:
+        return False
+
+
+def write_if_changed(path, data):
+    """Atomically write bytes to path unless it already holds them; return True if written."""
+    if holds(path, data):
+        return False
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp = f"{path}.{os.getpid()}.tmp"
+    with open(temp, "wb") as f:
+        f.write(data)
+    os.replace(temp, path)
+    return True
+
+
+def _select_format(source, source_digest, entry):
+    """Return format_select.select() for an entry with "formats" (Pillow is needed then)."""
+    import format_select
+    return format_select.select(source, source_digest, entry["formats"],
+                                entry.get("max_error", 0))
+
+
+def _with_format(target_name, fmt):
+    """Return target_name with the extension of fmt."""
+    from format_select import EXTENSIONS
+    return os.path.splitext(target_name)[0] + EXTENSIONS[fmt]
+
+
+def contents_json(entries, folder, root=REPO_ROOT):
+    """Return the Contents.json bytes for the catalog images deployed to folder."""
+    images = []
+    for entry in entries:
+        for target in entry["targets"]:
+            if os.path.dirname(os.path.join(root, target)) != folder:
+                continue
+            for image in entry.get("catalog", []):
+                images.append(OrderedDict([("filename", os.path.basename(target)),
+                                           ("idiom", image["idiom"]),
+                                           ("scale", image["scale"]),
+                                           ("size", image["size"])]))
+    contents = OrderedDict([("images", images), ("info", CATALOG_INFO)])
+    return (json.dumps(contents, indent=2, separators=(",", " : ")) + "\n").encode("utf-8")
+
+
+def _deploy_format(source, target_name, fmt, data, formats, root, dry_run, stats):
+    """Write an encoded target and remove its copies in the other formats."""
+    target = os.path.join(root, target_name)
+    if data is not None:
+        if holds(target, data):
+            stats["unchanged"] += 1
+        else:
+            if not dry_run:
+                write_if_changed(target, data)
+            stats["dry run" if dry_run else "encoded"] += 1
+            print(f"✅ {'dry run' if dry_run else fmt}: "
+                  f"{os.path.relpath(source, root)} -> {target_name}")
+
+    for other in formats:
+        stale = _with_format(target_name, other)
+        if other == fmt or not os.path.lexists(os.path.join(root, stale)):
+            continue
+        if not dry_run:
+            os.remove(os.path.join(root, stale))
+        stats["removed"] += 1
+        print(f"🗑️  {'dry run: ' if dry_run else ''}removed {stale}")
+
+
+def deploy(entries, root=REPO_ROOT, mode="auto", dry_run=False, only=None):
+    """Deploy manifest entries; return a Counter of what happened to each target.
+
+    only, a set of absolute source paths, limits which sources are placed;
+    generated Contents.json files still describe every deployed entry.
+    """
+    stats = Counter()
+    catalog_folders = []
+    deployed = []
+    for entry in entries:
+        source = os.path.join(root, entry["source"])
+        if not os.path.exists(source):
+            print(f"❌ Source not found: {entry['source']}")
+            stats["missing"] += len(entry["targets"])
+            continue
+
+        deployed.append(entry)
+        if only is not None and os.path.abspath(source) not in only:
+            continue
+        source_digest = file_digest(source)
+        formats = entry.get("formats")
+        if formats:
+            fmt, data, png_size = _select_format(source, source_digest, entry)
+            stats["png bytes"] += png_size * len(entry["targets"])
+            stats["deployed bytes"] += (png_size if data is None else len(data)) * len(entry["targets"])
+
+        for target_name in entry["targets"]:
+            if formats:
+                target_name = _with_format(target_name, fmt)
+                _deploy_format(source, target_name, fmt, data, formats, root, dry_run, stats)
+                if data is not None:
+                    continue
+            target = os.path.join(root, target_name)
+            if entry.get("catalog") and os.path.dirname(target) not in catalog_folders:
+                catalog_folders.append(os.path.dirname(target))
+            if is_current(source, target, source_digest, mode):
+                stats["unchanged"] += 1
+                continue
+            method = "dry run" if dry_run else place_file(source, target, mode)
+            stats[method] += 1
+            print(f"✅ {method}: {entry['source']} -> {target_name}")
+
+    for folder in catalog_folders:
+        path = os.path.join(folder, "Contents.json")
+        data = contents_json(deployed, folder, root)
+        relative = os.path.relpath(path, root)
+        if holds(path, data):
+            stats["unchanged"] += 1
+        elif dry_run:
+            print(f"✅ dry run: {relative}")
+        else:
+            write_if_changed(path, data)
+            print(f"✅ Generated {relative}")
+    return stats
+
+
+def summarize(stats):
+    """Return a one-line summary of deploy() counters."""
+    keys = PLACE_METHODS + ("encoded", "dry run", "unchanged", "removed", "missing")
+    parts = [f"{stats[key]} {key}" for key in keys if stats[key]]
+    return ", ".join(parts) or "nothing to deploy"
+
+
+def format_report(stats):
+    """Return a line on the bytes format selection saved, or None if it did not run."""
+    if not stats["png bytes"]:
+        return None
+    saved = stats["png bytes"] - stats["deployed bytes"]
+    return (f"format selection: {stats['deployed bytes']:,} bytes deployed instead of "
+            f"{stats['png bytes']:,} as PNG, {saved:,} bytes "
+            f"({saved * 100 / stats['png bytes']:.0f}%) saved in the app package")
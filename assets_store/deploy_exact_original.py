@@ -3,11 +3,34 @@
 Create the user's original icon directly and replace all icons.
 """
 
+import argparse
+import math
 import os
 from PIL import Image, ImageDraw
 
-def create_original_icon_from_attachment():
-    """Recreate the exact image from the user's attachment."""
+from format_select import remove_other_formats
+from resize_engine import IconVariants, WHITE
+from web_bundle import build_bundle, variant_requests
+
+# Exact colors from the user's image
+ORIGINAL_COLORS = {
+    'bright_blue': (0, 150, 220),    # Top figure
+    'orange': (255, 165, 0),         # Top right figure  
+    'green': (76, 175, 80),          # Bottom right figure
+    'purple': (156, 39, 176),        # Bottom left figure
+    'teal': (0, 150, 136),          # Top left figure
+    'play_button': (25, 118, 210)    # Central play button
+}
+
+def create_original_icon_from_attachment(size=512, renderer="draw"):
+    """Recreate the exact image from the user's attachment.
+    
+    renderer "draw" uses ImageDraw directly; "sdf" rasterizes the same design
+    from original_icon_shapes() with anti-aliasing at exactly this size.
+    """
+    if renderer == "sdf":
+        import sdf_raster
+        return sdf_raster.render(original_icon_shapes(), size)
     
     # The user's image shows:
     # - 5 colorful human figures arranged in a circle
@@ -16,26 +39,17 @@ def create_original_icon_from_attachment():
     # - White background
     # - Vibrant, playful design
     
-    size = 512  # High resolution for quality
     img = Image.new('RGBA', (size, size), (255, 255, 255, 255))
     draw = ImageDraw.Draw(img)
     
     # Exact colors from the user's image
-    colors = {
-        'bright_blue': (0, 150, 220),    # Top figure
-        'orange': (255, 165, 0),         # Top right figure  
-        'green': (76, 175, 80),          # Bottom right figure
-        'purple': (156, 39, 176),        # Bottom left figure
-        'teal': (0, 150, 136),          # Top left figure
-        'play_button': (25, 118, 210)    # Central play button
-    }
+    colors = ORIGINAL_COLORS
     
     center = size // 2
     figure_radius = size // 6  # Distance from center to figures
     figure_size = size // 12   # Size of each figure
     
     # Calculate positions for 5 figures in a circle (starting from top)
-    import math
     positions = []
     figure_colors_ordered = [
         colors['bright_blue'],  # Top
@@ -110,13 +124,80 @@ def create_original_icon_from_attachment():
     
     return img
 
-def deploy_original_icon():
-    """Create and deploy the user's exact original icon."""
+def original_icon_shapes():
+    """Describe the original icon as sdf_raster shapes in unit coordinates."""
+    import sdf_raster as sdf
+    
+    colors = ORIGINAL_COLORS
+    center = 0.5
+    figure_radius = 1 / 6  # Distance from center to figures
+    figure_size = 1 / 12   # Size of each figure
+    figure_colors_ordered = [
+        colors['bright_blue'],  # Top
+        colors['orange'],       # Top right
+        colors['green'],        # Bottom right  
+        colors['purple'],       # Bottom left
+        colors['teal']         # Top left
+    ]
+    
+    shapes = []
+    for i, color in enumerate(figure_colors_ordered):
+        angle = math.radians(i * 72 - 90)  # Start from top, 72° apart
+        x = center + figure_radius * math.cos(angle)
+        y = center + figure_radius * math.sin(angle)
+        
+        # Head
+        head_size = figure_size / 2
+        shapes.append(sdf.ellipse(x, y - figure_size / 2 - head_size * 3 / 4,
+                                  head_size / 2, head_size / 4, color))
+        
+        # Body (rounded rectangle)
+        body_width = figure_size / 2
+        shapes.append(sdf.rounded_rect(x - body_width / 2, y - figure_size / 2,
+                                       x + body_width / 2, y + figure_size / 2,
+                                       body_width / 4, color))
+        
+        # Arms (extending outward)
+        arm_length = figure_size / 2
+        arm_width = figure_size / 6
+        arm_top = y - figure_size / 4
+        shapes.append(sdf.rounded_rect(x - body_width / 2 - arm_length, arm_top,
+                                       x - body_width / 2, arm_top + arm_width,
+                                       arm_width / 2, color))
+        shapes.append(sdf.rounded_rect(x + body_width / 2, arm_top,
+                                       x + body_width / 2 + arm_length, arm_top + arm_width,
+                                       arm_width / 2, color))
+        
+        # Legs (extending downward)
+        leg_length = figure_size / 2
+        leg_width = figure_size / 6
+        leg_gap = figure_size / 8
+        hip_y = y + figure_size / 2
+        shapes.append(sdf.rounded_rect(x - leg_gap / 2 - leg_width, hip_y,
+                                       x - leg_gap / 2, hip_y + leg_length,
+                                       leg_width / 2, color))
+        shapes.append(sdf.rounded_rect(x + leg_gap / 2, hip_y,
+                                       x + leg_gap / 2 + leg_width, hip_y + leg_length,
+                                       leg_width / 2, color))
+    
+    # Central play button (triangle pointing right)
+    play_size = 1 / 8
+    play_offset = play_size / 6  # Slight offset to make triangle look centered
+    shapes.append(sdf.polygon([
+        (center - play_size / 2 + play_offset, center - play_size / 2),
+        (center - play_size / 2 + play_offset, center + play_size / 2),
+        (center + play_size / 2 + play_offset, center),
+    ], colors['play_button']))
+    
+    return shapes
+
+def deploy_original_icon(renderer="draw", jobs=1):
+    """Create and deploy the user's exact original icon, resizing on jobs processes."""
     
     print("🎨 Creating your exact original icon...")
     
     # Create the icon
-    original_img = create_original_icon_from_attachment()
+    original_img = create_original_icon_from_attachment(renderer=renderer)
     
     # Save it for reference
     original_img.save("user_exact_original.png")
@@ -124,6 +205,14 @@ def deploy_original_icon():
     
     print("\n📱 Generating all required sizes and deploying...")
     
+    # Every size below is resized and encoded once, then shared by all destinations.
+    # The SDF renderer draws each size natively instead of resampling the master.
+    if renderer == "sdf":
+        variants = IconVariants(original_img, render=lambda size: create_original_icon_from_attachment(
+            size[0], renderer))
+    else:
+        variants = IconVariants(original_img)
+    
     # Android mipmap folders and sizes
     android_folders = {
         "../android/app/src/main/res/mipmap-mdpi": 48,
@@ -132,56 +221,34 @@ def deploy_original_icon():
         "../android/app/src/main/res/mipmap-xxhdpi": 144,
         "../android/app/src/main/res/mipmap-xxxhdpi": 192
     }
+    ios_folder = "../ios/Runner/Assets.xcassets/AppIcon.appiconset"
+    ios_sizes = [40, 58, 60, 80, 87, 120, 152, 167, 180, 1024]
+    
+    # Resize and encode every size up front, in parallel when jobs > 1
+    variants.prefetch([(size, WHITE) for size in list(android_folders.values()) + ios_sizes]
+                      + variant_requests(), jobs=jobs)
     
     # Deploy to Android
     for folder_path, size in android_folders.items():
         os.makedirs(folder_path, exist_ok=True)
         
-        resized = original_img.resize((size, size), Image.Resampling.LANCZOS)
-        
         # Convert to RGB with white background
-        rgb_img = Image.new('RGB', (size, size), (255, 255, 255))
-        if resized.mode == 'RGBA':
-            rgb_img.paste(resized, mask=resized.split()[-1])
-        else:
-            rgb_img.paste(resized)
-        
-        rgb_img.save(os.path.join(folder_path, "ic_launcher.png"))
-        rgb_img.save(os.path.join(folder_path, "ic_launcher_round.png"))
+        variants.save(os.path.join(folder_path, "ic_launcher.png"), size, background=WHITE)
+        variants.save(os.path.join(folder_path, "ic_launcher_round.png"), size, background=WHITE)
+        # deploy_app_icons.py may have deployed these as WebP
+        for name in ("ic_launcher.png", "ic_launcher_round.png"):
+            remove_other_formats(os.path.join(folder_path, name))
         print(f"✅ Android {os.path.basename(folder_path)}: {size}x{size}")
     
     # Deploy to iOS
-    ios_folder = "../ios/Runner/Assets.xcassets/AppIcon.appiconset"
-    ios_sizes = [40, 58, 60, 80, 87, 120, 152, 167, 180, 1024]
-    
     os.makedirs(ios_folder, exist_ok=True)
     
     for size in ios_sizes:
-        resized = original_img.resize((size, size), Image.Resampling.LANCZOS)
-        
-        rgb_img = Image.new('RGB', (size, size), (255, 255, 255))
-        if resized.mode == 'RGBA':
-            rgb_img.paste(resized, mask=resized.split()[-1])
-        else:
-            rgb_img.paste(resized)
-        
-        rgb_img.save(os.path.join(ios_folder, f"Icon-App-{size}x{size}@1x.png"))
+        variants.save(os.path.join(ios_folder, f"Icon-App-{size}x{size}@1x.png"), size, background=WHITE)
         print(f"✅ iOS: {size}x{size}")
     
-    # Deploy to Web
-    web_folder = "../assets/icons"
-    web_sizes = [16, 32, 48, 72, 96, 128, 144, 152, 192, 384, 512]
-    
-    os.makedirs(web_folder, exist_ok=True)
-    
-    for size in web_sizes:
-        resized = original_img.resize((size, size), Image.Resampling.LANCZOS)
-        resized.save(os.path.join(web_folder, f"icon-{size}x{size}.png"))
-        print(f"✅ Web: {size}x{size}")
-    
-    # Main web icons
-    original_img.resize((192, 192), Image.Resampling.LANCZOS).save(os.path.join(web_folder, "Icon-192.png"))
-    original_img.resize((512, 512), Image.Resampling.LANCZOS).save(os.path.join(web_folder, "Icon-512.png"))
+    # Deploy to Web: favicon.ico and the manifest icons
+    build_bundle(variants, "../web")
     
     print("\n🎉 SUCCESS! Your exact original icon has been deployed!")
     print("✅ All platform icons updated with your exact design")
@@ -189,4 +256,11 @@ def deploy_original_icon():
     print("✅ Ready to test in your app!")
 
 if __name__ == "__main__":
-    deploy_original_icon()
+    parser = argparse.ArgumentParser(description="Create and deploy the original icon")
+    parser.add_argument("--renderer", choices=["draw", "sdf"], default="draw",
+                        help="ImageDraw primitives, or the anti-aliased NumPy SDF rasterizer")
+    parser.add_argument("--jobs", "-j", type=int, default=1, metavar="N",
+                        help="resize on N worker processes sharing the master (default: 1)")
+    args = parser.parse_args()
+    
+    deploy_original_icon(renderer=args.renderer, jobs=args.jobs)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Stand-in adb executable for trying the capture scripts without devices.
+
+Point the scripts at it with ADB=assets_store/fake_adb.py (or --adb). It
+understands the subset of adb the capture scripts use:
+
+    adb devices [-l]
+    adb -s SERIAL shell wm size | wm density | dumpsys window windows
+    adb -s SERIAL shell <any other command>
+    adb -s SERIAL exec-out screencap [-p] | uiautomator dump /dev/tty
+
+Devices are configured with $FAKE_ADB_DEVICES as a comma-separated list of
+SERIAL:WIDTHxHEIGHT@DENSITY entries. The default is one phone, one 7-inch
+and one 10-inch tablet emulator. Each device's screen is a solid color
+derived from its serial. For $FAKE_ADB_ANIMATION seconds (default 0.5)
+after an `am` or `input` command a bar slides across the screen, so frame
+stability detection has something to wait for.
+"""
+
+import hashlib
+import io
+import os
+import struct
+import sys
+import tempfile
+import time
+
+FOCUSED_ACTIVITY = "com.svarah.app/com.aacpp.app.MainActivity"
+
+DEFAULT_DEVICES = ("emulator-5554:1080x2400@420,"
+                   "emulator-5556:1200x1920@320,"
+                   "emulator-5558:1600x2560@320")
+
+ANIMATION_SECONDS = float(os.environ.get("FAKE_ADB_ANIMATION", "0.5"))
+
+
+def configured_devices():
+    """Return {serial: (width, height, density)} from $FAKE_ADB_DEVICES."""
+    devices = {}
+    for entry in os.environ.get("FAKE_ADB_DEVICES", DEFAULT_DEVICES).split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        serial, spec = entry.rsplit(":", 1)
+        size, density = spec.split("@")
+        width, height = size.split("x")
+        devices[serial] = (int(width), int(height), int(density))
+    return devices
+
+
+def screen_color(serial):
+    """Return the RGB color a fake device's screen is filled with."""
+    digest = hashlib.sha256(serial.encode()).digest()
+    return digest[0], digest[1], digest[2]
+
+
+def _state_path(serial):
+    """Return the file holding the time of a device's last UI action."""
+    safe = "".join(c if c.isalnum() else "_" for c in serial)
+    return os.path.join(tempfile.gettempdir(), f"fake_adb_{safe}.last_action")
+
+
+def animation_progress(serial):
+    """Return 0..1 while the UI is animating after an action, else None."""
+    try:
+        elapsed = time.time() - os.path.getmtime(_state_path(serial))
+    except OSError:
+        return None
+    return elapsed / ANIMATION_SECONDS if elapsed < ANIMATION_SECONDS else None
+
+
+def raw_framebuffer(width, height, color, progress=None):
+    """Return raw screencap output: a 16-byte header and RGBA_8888 pixels.
+
+    While progress is not None, a white bar is drawn at that fraction of the
+    screen height.
+    """
+    header = struct.pack("<IIII", width, height, 1, 0)
+    row = bytes((*color, 255)) * width
+    rows = [row] * height
+    if progress is not None:
+        bar = bytes((255, 255, 255, 255)) * width
+        top = int(progress * height * 0.8)
+        for y in range(top, min(top + max(height // 10, 1), height)):
+            rows[y] = bar
+    return header + b"".join(rows)
+
+
+def devices_listing(devices, long=False):
+    """Return the `adb devices` table for the configured devices."""
+    lines = ["List of devices attached"]
+    for name, (width, height, _) in devices.items():
+        lines.append(f"{name}\tdevice" + (f" model:Fake_{width}x{height}" if long else ""))
+    return "\n".join(lines) + "\n"
+
+
+def exec_output(serial, device, command):
+    """Return the stdout bytes of `adb exec-out COMMAND...`, or None if unsupported."""
+    width, height, _ = device
+    if command[:1] == ["screencap"]:
+        data = raw_framebuffer(width, height, screen_color(serial), animation_progress(serial))
+        if "-p" in command:
+            from PIL import Image
+            image = Image.frombytes("RGBA", (width, height), data[16:])
+            buffer = io.BytesIO()
+            image.save(buffer, "PNG")
+            data = buffer.getvalue()
+        return data
+
+    if command[:1] == ["uiautomator"]:
+        package = FOCUSED_ACTIVITY.split("/")[0]
+        return ('<?xml version="1.0" encoding="UTF-8"?><hierarchy rotation="0">'
+                f'<node text="" content-desc="AAC Communication Helper" package="{package}" '
+                f'bounds="[0,0][{width},{height}]" /></hierarchy>\n').encode()
+    return None
+
+
+def shell_output(serial, device, command):
+    """Return the output bytes of `adb shell COMMAND...`."""
+    width, height, density = device
+    if command == ["wm", "size"]:
+        return f"Physical size: {width}x{height}\n".encode()
+    if command == ["wm", "density"]:
+        return f"Physical density: {density}\n".encode()
+    if command[:2] == ["dumpsys", "window"]:
+        return (f"  mCurrentFocus=Window{{1a2b3c u0 {FOCUSED_ACTIVITY}}}\n"
+                f"  mFocusedApp=ActivityRecord{{4d5e6f u0 {FOCUSED_ACTIVITY} t12}}\n").encode()
+    if command[:1] in (["am"], ["input"]):
+        # UI actions start an animation
+        with open(_state_path(serial), "w"):
+            pass
+    # Every other shell command just succeeds
+    return b""
+
+
+def main(argv):
+    devices = configured_devices()
+    serial = None
+    if argv[:1] == ["-s"]:
+        serial, argv = argv[1], argv[2:]
+    elif len(devices) == 1:
+        serial = next(iter(devices))
+
+    if argv[:1] == ["devices"]:
+        sys.stdout.write(devices_listing(devices, "-l" in argv))
+        return 0
+
+    if serial not in devices:
+        print("adb: error: device not found" if serial else
+              "adb: error: more than one device/emulator", file=sys.stderr)
+        return 1
+
+    if argv[:1] == ["exec-out"]:
+        data = exec_output(serial, devices[serial], argv[1:])
+        if data is not None:
+            sys.stdout.buffer.write(data)
+            return 0
+
+    if argv[:1] == ["shell"]:
+        sys.stdout.buffer.write(shell_output(serial, devices[serial], " ".join(argv[1:]).split()))
+        return 0
+
+    print(f"fake adb: unsupported command: {' '.join(argv)}", file=sys.stderr)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Stand-in adb server speaking the host protocol, for use without devices.
+
+It serves the same fake devices as fake_adb.py ($FAKE_ADB_DEVICES) and the
+requests AdbClient sends: host:version, host:devices, host:transport[-any],
+shell:, exec: and sync: (RECV and QUIT; /sdcard/screenshot.png is the
+current screen as a PNG).
+
+    python assets_store/fake_adb_server.py --port 5038
+    ANDROID_ADB_SERVER_PORT=5038 python assets_store/multi_device_capture.py
+
+--benchmark N starts the server in-process and times N screencaps through
+AdbClient against N runs of the fake adb executable.
+"""
+
+import argparse
+import os
+import socketserver
+import struct
+import subprocess
+import sys
+import threading
+import time
+
+import fake_adb
+from adb_client import AdbClient
+
+# Protocol version reported by host:version (adb 1.0.41)
+SERVER_VERSION = 41
+
+# Largest chunk the sync protocol allows per DATA packet
+SYNC_DATA_MAX = 64 * 1024
+
+
+class AdbRequestHandler(socketserver.BaseRequestHandler):
+    """Handles one client connection: host requests, then at most one service."""
+
+    def _read_exact(self, count):
+        """Read exactly count bytes from the client."""
+        data = b""
+        while len(data) < count:
+            chunk = self.request.recv(count - len(data))
+            if not chunk:
+                raise ConnectionError("client closed the connection")
+            data += chunk
+        return data
+
+    def _read_request(self):
+        """Read one hex-length-prefixed request."""
+        length = int(self._read_exact(4), 16)
+        return self._read_exact(length).decode("utf-8")
+
+    def _okay(self, body=None):
+        """Accept a request, optionally with a length-prefixed reply body."""
+        reply = b"OKAY"
+        if body is not None:
+            reply += b"%04x" % len(body) + body
+        self.request.sendall(reply)
+
+    def _fail(self, message):
+        """Reject a request with an error message."""
+        message = message.encode("utf-8")
+        self.request.sendall(b"FAIL" + b"%04x" % len(message) + message)
+
+    def handle(self):
+        """Serve host requests until a service takes over the connection."""
+        devices = fake_adb.configured_devices()
+        serial = None
+        try:
+            while True:
+                request = self._read_request()
+                if request == "host:version":
+                    self._okay(b"%04x" % SERVER_VERSION)
+                    return
+                if request in ("host:devices", "host:devices-l"):
+                    listing = fake_adb.devices_listing(devices, request.endswith("-l"))
+                    self._okay(listing.split("\n", 1)[1].encode("utf-8"))
+                    return
+                if request.startswith("host:transport:"):
+                    serial = request.split(":", 2)[2]
+                    if serial not in devices:
+                        self._fail(f"device '{serial}' not found")
+                        return
+                    self._okay()
+                    continue
+                if request == "host:transport-any":
+                    if len(devices) != 1:
+                        self._fail("more than one device/emulator")
+                        return
+                    serial = next(iter(devices))
+                    self._okay()
+                    continue
+                if serial is None:
+                    self._fail(f"unknown host service: {request}")
+                    return
+                self._device_service(serial, devices[serial], request)
+                return
+        except (ConnectionError, ValueError):
+            return
+
+    def _device_service(self, serial, device, service):
+        """Run a shell:, exec: or sync: service for a device."""
+        if service.startswith("shell:"):
+            self._okay()
+            self.request.sendall(fake_adb.shell_output(serial, device, service[6:].split()))
+        elif service.startswith("exec:"):
+            data = fake_adb.exec_output(serial, device, service[5:].split())
+            if data is None:
+                self._fail(f"unsupported command: {service[5:]}")
+                return
+            self._okay()
+            self.request.sendall(data)
+        elif service == "sync:":
+            self._okay()
+            self._sync(serial, device)
+        else:
+            self._fail(f"unknown service: {service}")
+
+    def _sync(self, serial, device):
+        """Serve sync requests until QUIT or the client disconnects."""
+        while True:
+            header = self._read_exact(8)
+            kind, length = header[:4], struct.unpack("<I", header[4:])[0]
+            if kind == b"QUIT":
+                return
+            path = self._read_exact(length).decode("utf-8")
+            if kind != b"RECV":
+                self._sync_fail(f"unsupported sync request {kind!r}")
+                continue
+            if path != "/sdcard/screenshot.png":
+                self._sync_fail(f"remote object '{path}' does not exist")
+                continue
+            data = fake_adb.exec_output(serial, device, ["screencap", "-p"])
+            for offset in range(0, len(data), SYNC_DATA_MAX):
+                chunk = data[offset:offset + SYNC_DATA_MAX]
+                self.request.sendall(b"DATA" + struct.pack("<I", len(chunk)) + chunk)
+            self.request.sendall(b"DONE" + struct.pack("<I", int(time.time())))
+
+    def _sync_fail(self, message):
+        """Reject one sync request; the session stays open."""
+        message = message.encode("utf-8")
+        self.request.sendall(b"FAIL" + struct.pack("<I", len(message)) + message)
+
+
+class FakeAdbServer(socketserver.ThreadingTCPServer):
+    """Threaded fake adb server on 127.0.0.1; port 0 picks a free port."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port=0):
+        super().__init__(("127.0.0.1", port), AdbRequestHandler)
+
+    @property
+    def port(self):
+        """The port the server is listening on."""
+        return self.server_address[1]
+
+    def start(self):
+        """Serve on a background thread; returns the server."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def benchmark(count):
+    """Compare screencaps through AdbClient with screencaps through adb processes."""
+    server = FakeAdbServer().start()
+    client = AdbClient(port=server.port)
+    serial = next(iter(fake_adb.configured_devices()))
+    fake_adb_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_adb.py")
+
+    start = time.perf_counter()
+    for _ in range(count):
+        client.screencap(serial)
+    socket_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(count):
+        subprocess.run([sys.executable, fake_adb_path, "-s", serial, "exec-out", "screencap"],
+                       capture_output=True, check=True)
+    process_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(count):
+        client.pull_bytes(serial, "/sdcard/screenshot.png")
+    pull_time = time.perf_counter() - start
+
+    server.shutdown()
+    print(f"{count} screencaps of {serial}:")
+    print(f"  adb server protocol:  {socket_time / count * 1000:8.1f} ms each")
+    print(f"  adb process per call: {process_time / count * 1000:8.1f} ms each")
+    print(f"  sync pull (pooled):   {pull_time / count * 1000:8.1f} ms each")
+
+
+def main(argv=None):
+    """Run the fake server, or the benchmark."""
+    parser = argparse.ArgumentParser(description="Fake adb server for the capture scripts")
+    parser.add_argument("--port", type=int, default=5038,
+                        help="port to listen on (default: 5038, leaving a real adb server alone)")
+    parser.add_argument("--benchmark", type=int, metavar="N",
+                        help="time N screencaps via the protocol client and via adb processes")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        benchmark(args.benchmark)
+        return
+
+    server = FakeAdbServer(args.port)
+    print(f"Fake adb server listening on 127.0.0.1:{server.port} "
+          f"with {len(fake_adb.configured_devices())} device(s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
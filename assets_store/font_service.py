@@ -0,0 +1,172 @@
+"""
+Font lookup and caching for the asset scripts.
+
+ImageFont.truetype("arial.ttf", ...) only works where Windows font lookup
+finds Arial; on Linux build hosts it raises and the scripts silently fall
+back to Pillow's tiny bitmap font. get_font() resolves a family name to a
+font file instead, looking in order at:
+
+  1. the bundled font directory (assets_store/fonts, or $ASSET_FONT_DIR),
+  2. fontconfig (fc-match), when it is installed,
+  3. the usual system font directories,
+
+trying metric-compatible substitutes for Arial/Helvetica. Each resolved
+file is read once per process and every sized FreeTypeFont is kept in an
+LRU cache, so rendering dozens of assets does not reload the same face.
+"""
+
+import functools
+import io
+import os
+import shutil
+import subprocess
+import sys
+
+from PIL import ImageFont
+
+BUNDLED_FONT_DIR = os.environ.get(
+    "ASSET_FONT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts"))
+
+DEFAULT_FAMILY = "Arial"
+
+# Metric-compatible (or at least similar) substitutes tried after the family itself
+FAMILY_FALLBACKS = {
+    "arial": ["Liberation Sans", "Arimo", "Helvetica", "DejaVu Sans"],
+    "helvetica": ["Arial", "Liberation Sans", "Arimo", "DejaVu Sans"],
+    "sans-serif": ["Arial", "Liberation Sans", "DejaVu Sans"],
+}
+
+# Font file stems for families whose file names do not follow "<Family>-<Style>"
+KNOWN_FILES = {
+    "arial": (["arial", "Arial"], ["arialbd", "Arial Bold", "Arial-Bold"]),
+    "helvetica": (["Helvetica"], ["Helvetica-Bold"]),
+}
+
+FONT_EXTENSIONS = (".ttf", ".otf", ".ttc")
+
+# Number of sized FreeTypeFont objects kept alive
+FONT_CACHE_SIZE = 64
+
+
+def _system_font_dirs():
+    """Return the platform's font directories that exist."""
+    if sys.platform == "win32":
+        dirs = [os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "Fonts")]
+    elif sys.platform == "darwin":
+        dirs = ["/System/Library/Fonts", "/Library/Fonts",
+                os.path.expanduser("~/Library/Fonts")]
+    else:
+        data_home = os.environ.get("XDG_DATA_HOME", os.path.expanduser("~/.local/share"))
+        dirs = ["/usr/share/fonts", "/usr/local/share/fonts",
+                os.path.join(data_home, "fonts"), os.path.expanduser("~/.fonts")]
+    return [d for d in dirs if os.path.isdir(d)]
+
+
+@functools.lru_cache(maxsize=None)
+def _font_index(directory):
+    """Map lower-cased file stems to paths for every font under directory."""
+    index = {}
+    for dirpath, _, filenames in os.walk(directory):
+        for name in sorted(filenames):
+            stem, ext = os.path.splitext(name)
+            if ext.lower() in FONT_EXTENSIONS:
+                index.setdefault(stem.lower(), os.path.join(dirpath, name))
+    return index
+
+
+def _file_stems(family, bold):
+    """Return the file stems a family/weight is commonly stored under."""
+    key = family.lower()
+    if key in KNOWN_FILES:
+        regular, bold_stems = KNOWN_FILES[key]
+        return bold_stems if bold else regular
+
+    compact = family.replace(" ", "")
+    if bold:
+        return [f"{compact}-Bold", f"{compact}Bold", f"{compact}bd"]
+    return [f"{compact}-Regular", compact, f"{compact}-Roman"]
+
+
+def _find_in_dirs(family, bold, directories):
+    """Look a family up by file name in the given font directories."""
+    for directory in directories:
+        index = _font_index(directory)
+        for stem in _file_stems(family, bold):
+            path = index.get(stem.lower())
+            if path:
+                return path
+    return None
+
+
+def _fc_match(family, bold):
+    """Ask fontconfig for the file of an exact family match."""
+    if shutil.which("fc-match") is None:
+        return None
+
+    pattern = f"{family}:bold" if bold else family
+    try:
+        result = subprocess.run(["fc-match", "--format=%{family}\n%{file}", pattern],
+                                capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    lines = result.stdout.splitlines()
+    if result.returncode != 0 or len(lines) < 2:
+        return None
+
+    # fc-match always answers with something; only accept the family asked for
+    matched = [name.strip().lower() for name in lines[0].split(",")]
+    if family.lower() not in matched or not os.path.isfile(lines[1]):
+        return None
+    return lines[1]
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_font(family=DEFAULT_FAMILY, bold=False):
+    """Return the font file for a family, trying its fallbacks, or None."""
+    bundled = [BUNDLED_FONT_DIR] if os.path.isdir(BUNDLED_FONT_DIR) else []
+    system = _system_font_dirs()
+    for name in [family] + FAMILY_FALLBACKS.get(family.lower(), []):
+        path = (_find_in_dirs(name, bold, bundled)
+                or _fc_match(name, bold)
+                or _find_in_dirs(name, bold, system))
+        if path:
+            return path
+
+    # Last resort: Pillow's own lookup (Windows font folder, cwd)
+    for stem in _file_stems(family, bold):
+        try:
+            return ImageFont.truetype(stem + ".ttf", 12).path
+        except OSError:
+            continue
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _font_bytes(path):
+    """Read a font file once; every size is created from these bytes."""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@functools.lru_cache(maxsize=FONT_CACHE_SIZE)
+def get_font(size, family=DEFAULT_FAMILY, bold=False):
+    """Return a FreeTypeFont for family at size, cached across calls.
+
+    Falls back to Pillow's default font if no matching file is installed.
+    """
+    size = max(int(size), 1)
+    path = resolve_font(family, bold)
+    if path is not None:
+        return ImageFont.truetype(io.BytesIO(_font_bytes(path)), size)
+
+    try:
+        # Pillow >= 10.1 ships a scalable default font
+        return ImageFont.load_default(size)
+    except TypeError:
+        return ImageFont.load_default()
+
+
+def font_files(families=((DEFAULT_FAMILY, False),)):
+    """Return the resolved files for (family, bold) pairs, for dependency tracking."""
+    paths = [resolve_font(family, bold) for family, bold in families]
+    return tuple(sorted({path for path in paths if path}))
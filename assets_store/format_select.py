@@ -0,0 +1,110 @@
+"""
+Choose the smallest file format a platform accepts for each deployed image.
+
+Deploy manifest entries may list "formats", e.g. ["png", "webp"] for
+Android resources (lossless WebP with alpha needs API 18; this app's
+minSdk is 24). Each source PNG is encoded as lossless WebP and compared
+with the PNG, and the smaller file is deployed. With "max_error" above 0
+a palette-reduced image is also tried (near-lossless), and kept only if
+no channel differs from the PNG by more than max_error.
+
+Encodings are cached in the render cache, keyed by the PNG's digest.
+"""
+
+import io
+import os
+
+from PIL import Image
+
+import png_optimizer
+import render_cache
+
+# Formats deploy_engine can produce, with the file extension they use
+EXTENSIONS = {"png": ".png", "webp": ".webp"}
+
+# Slowest, smallest lossless WebP encoding
+WEBP_OPTIONS = {"lossless": True, "quality": 100, "method": 6}
+
+
+def _encode_webp(image):
+    """Encode image as lossless WebP."""
+    buffer = io.BytesIO()
+    image.save(buffer, "WEBP", **WEBP_OPTIONS)
+    return buffer.getvalue()
+
+
+def _webp(original, max_error):
+    """Return the smallest acceptable WebP encoding of PNG bytes."""
+    image = Image.open(io.BytesIO(original))
+    image.load()
+    reference = image.convert("RGBA")
+    mode = "RGB" if reference.getextrema()[3][0] == 255 else "RGBA"
+
+    best = _encode_webp(image.convert(mode))
+    if max_error <= 0:
+        return best
+    # WebP has no palette mode, but fewer distinct colors still compress better
+    for _, candidate, lossless in png_optimizer.candidates(image, max_error):
+        if lossless:
+            continue
+        data = _encode_webp(candidate.convert(mode))
+        if len(data) < len(best) and png_optimizer.max_difference(reference, data) <= max_error:
+            best = data
+    return best
+
+
+def encode(source, source_digest, fmt, max_error=0):
+    """Return the bytes of source (a PNG file) in fmt."""
+    if fmt == "png":
+        with open(source, "rb") as f:
+            return f.read()
+
+    cache = render_cache.default_cache()
+    # Near-lossless candidates come from png_optimizer, so its code is part of the key
+    key = render_cache.cache_key("format_select", render_cache.code_version(_webp),
+                                 render_cache.code_version(png_optimizer),
+                                 source_digest, fmt, WEBP_OPTIONS, max_error)
+    data = cache.get(key) if cache is not None else None
+    if data is None:
+        with open(source, "rb") as f:
+            data = _webp(f.read(), max_error)
+        if cache is not None:
+            cache.put(key, data)
+    return data
+
+
+def select(source, source_digest, formats, max_error=0):
+    """Return (format, bytes, png_size) for the smallest encoding of source.
+
+    A PNG is chosen unless another format is strictly smaller, so bytes is
+    None when the PNG itself should be deployed (and may be linked).
+    """
+    for fmt in formats:
+        if fmt not in EXTENSIONS:
+            raise ValueError(f"unknown format {fmt!r}; expected one of {sorted(EXTENSIONS)}")
+
+    png_size = len(encode(source, source_digest, "png"))
+    best = ("png", None, png_size)
+    best_size = png_size
+    for fmt in formats:
+        if fmt == "png":
+            continue
+        data = encode(source, source_digest, fmt, max_error)
+        if len(data) < best_size:
+            best, best_size = (fmt, data, png_size), len(data)
+    return best
+
+
+def remove_other_formats(path):
+    """Remove files named like path in the other formats; return the removed paths.
+
+    Scripts writing Android resources directly call this, since a PNG and a
+    WebP with the same name are a duplicate resource error.
+    """
+    base, ext = os.path.splitext(path)
+    removed = []
+    for other in EXTENSIONS.values():
+        if other != ext and os.path.lexists(base + other):
+            os.remove(base + other)
+            removed.append(base + other)
+    return removed
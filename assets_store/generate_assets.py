@@ -4,8 +4,57 @@ Python script to generate app store assets for the AAC Communication Helper app.
 This script generates all required assets without requiring ImageMagick.
 """
 
+import argparse
+import functools
+import io
 import os
-from PIL import Image, ImageDraw, ImageFont
+import time
+from PIL import Image, ImageDraw
+
+import png_optimizer
+import render_cache
+import svg_raster
+from build_graph import BuildGraph, file_fingerprint
+from font_service import font_files
+from image_ingest import load_master
+from splash_compositor import LayerCompositor, aspect_class
+from text_layout import draw_layout, fit_text
+from resize_engine import IconVariants
+
+# Bump whenever a change outside the create_* functions alters the output
+SCRIPT_VERSION = "1"
+
+FONT_FAMILY = "Arial"
+
+# Resolution the app icon is drawn at in render-once mode; 2x the largest
+# icon size so every derived size is a downscale.
+MASTER_ICON_SIZE = 2048
+ICON_MASTER = "assets_store/.asset_build/app_icon_master.png"
+
+APP_ICON_COLORS = {
+    'background': (78, 205, 196),  # #4ECDC4 teal
+    'accent': (255, 107, 107),     # #FF6B6B coral
+    'highlight': (69, 183, 209),   # #45B7D1 blue
+    'text': (255, 255, 255)        # white
+}
+
+# Vector sources used with --source svg
+LOGO_SVG = "assets_store/source_logo.svg"
+SPLASH_SVG = "assets_store/splash_source.svg"
+SPLASH_BACKGROUND = (78, 205, 196)  # #4ECDC4 teal
+
+# Raster artwork every icon size is resized from with --source original
+ORIGINAL_ICON = "assets_store/user_original_icon.png"
+
+SPLASH_COLORS = {
+    'background': SPLASH_BACKGROUND,
+    'accent': (255, 107, 107),     # #FF6B6B coral
+    'text': (255, 255, 255)        # white
+}
+
+def font_dependencies():
+    """Return the resolved font files the text-drawing generators read."""
+    return font_files([(FONT_FAMILY, False)])
 
 def create_directory_structure():
     """Create the directory structure for assets."""
@@ -27,13 +76,38 @@ def create_directory_structure():
 def create_app_icon(size, filename, color_scheme=None):
     """Create a simple app icon with the specified size."""
     if color_scheme is None:
-        color_scheme = {
-            'background': (78, 205, 196),  # #4ECDC4 teal
-            'accent': (255, 107, 107),     # #FF6B6B coral
-            'highlight': (69, 183, 209),   # #45B7D1 blue
-            'text': (255, 255, 255)        # white
-        }
+        color_scheme = APP_ICON_COLORS
+    
+    # Identical sizes (192 for Android and web, ...) are drawn and encoded once
+    color_scheme_items = tuple(sorted(color_scheme.items()))
+    data = render_app_icon(size, color_scheme_items)
     
+    # Save image
+    with open(filename, "wb") as f:
+        f.write(data)
+    print(f"Created icon: {filename}")
+
+def create_icon_master(filename, color_scheme=None):
+    """Draw the app icon once at MASTER_ICON_SIZE for render-once mode.
+    
+    Every icon size is then resized from this file (see create_original_icon),
+    so worker processes read the master instead of each drawing it again.
+    """
+    img = draw_app_icon(MASTER_ICON_SIZE, color_scheme or APP_ICON_COLORS)
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    img.save(filename)
+    print(f"Created icon master: {filename}")
+
+@functools.lru_cache(maxsize=None)
+def render_app_icon(size, color_scheme_items):
+    """Draw the app icon and return it as PNG bytes."""
+    img = draw_app_icon(size, dict(color_scheme_items))
+    buffer = io.BytesIO()
+    img.save(buffer, "PNG")
+    return buffer.getvalue()
+
+def draw_app_icon(size, color_scheme):
+    """Draw the app icon design at the given size."""
     # Create image
     img = Image.new('RGBA', (size, size), color_scheme['background'])
     draw = ImageDraw.Draw(img)
@@ -73,36 +147,58 @@ def create_app_icon(size, filename, color_scheme=None):
                   circle_center[0] + circle_radius, circle_center[1] + circle_radius],
                  fill=color_scheme['accent'], outline=color_scheme['text'], width=size//50)
     
-    # Save image
-    img.save(filename)
+    return img
+
+def create_original_icon(original_path, size, filename):
+    """Resize the original artwork (or the render-once icon master) to the specified icon size."""
+    data = original_icon_variants(original_path, file_fingerprint(original_path)).encoded(size)
+    with open(filename, "wb") as f:
+        f.write(data)
     print(f"Created icon: {filename}")
 
+@functools.lru_cache(maxsize=4)
+def original_icon_variants(original_path, fingerprint):
+    """Decode the original artwork once per version of the file, within the memory budget."""
+    return IconVariants(load_master(original_path))
+
+def create_svg_asset(svg_path, width, height, filename, background=None):
+    """Rasterize a vector source directly at the specified dimensions."""
+    # The SVG is parsed once per process and kept in memory
+    img = svg_raster.load(svg_path).render((width, height), background)
+    img.save(filename)
+    print(f"Created {os.path.basename(svg_path)} render: {filename}")
+
 def create_splash_screen(width, height, filename, is_landscape=False):
     """Create a splash screen with the specified dimensions."""
-    color_scheme = {
-        'background': (78, 205, 196),  # #4ECDC4 teal
-        'accent': (255, 107, 107),     # #FF6B6B coral
-        'text': (255, 255, 255)        # white
-    }
+    # Layers are drawn once per aspect ratio and scaled to this size
+    img = splash_compositor().compose(width, height)
     
-    # Create image
-    img = Image.new('RGBA', (width, height), color_scheme['background'])
+    # Save image
+    img.save(filename)
+    print(f"Created splash screen: {filename}")
+
+@functools.lru_cache(maxsize=None)
+def splash_compositor():
+    """Return the compositor holding the splash screen layers of this process."""
+    return LayerCompositor(SPLASH_COLORS['background'],
+                           [draw_splash_title, draw_splash_icon, draw_splash_tagline])
+
+def draw_splash_title(width, height):
+    """Draw the splash screen app name on a transparent canvas."""
+    img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
     draw = ImageDraw.Draw(img)
     
-    # Add app name
-    try:
-        # Try to use a system font
-        font = ImageFont.truetype("arial.ttf", min(width, height) // 15)
-    except:
-        # Fallback to default font
-        font = ImageFont.load_default()
-    
-    app_name = "AAC Communication Helper"
-    text_width = draw.textlength(app_name, font=font)
-    text_x = (width - text_width) // 2
-    text_y = height // 6
-    
-    draw.text((text_x, text_y), app_name, fill=color_scheme['text'], font=font)
+    # Add app name, as large as fits between the top and the icon
+    title_box = (width // 20, height // 6, width - width // 20, height // 3 - height // 40)
+    title = fit_text("AAC Communication Helper", title_box[2] - title_box[0],
+                     title_box[3] - title_box[1], min(width, height) // 15, family=FONT_FAMILY)
+    draw_layout(draw, title, title_box, SPLASH_COLORS['text'], valign="top")
+    return img
+
+def draw_splash_icon(width, height):
+    """Draw the splash screen app icon on a transparent canvas."""
+    img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
     
     # Draw app icon in the center
     icon_size = min(width, height) // 4
@@ -112,7 +208,7 @@ def create_splash_screen(width, height, filename, is_landscape=False):
     # Draw icon background circle
     draw.ellipse([icon_margin_x, icon_margin_y, 
                   icon_margin_x + icon_size, icon_margin_y + icon_size], 
-                 fill=color_scheme['text'])
+                 fill=SPLASH_COLORS['text'])
     
     # Draw speech bubble
     bubble_size = icon_size // 2
@@ -120,7 +216,7 @@ def create_splash_screen(width, height, filename, is_landscape=False):
     bubble_margin_y = icon_margin_y + (icon_size - bubble_size) // 2 + icon_size // 8
     draw.rectangle([bubble_margin_x, bubble_margin_y, 
                     bubble_margin_x + bubble_size, bubble_margin_y + bubble_size // 2], 
-                   fill=color_scheme['background'])
+                   fill=SPLASH_COLORS['background'])
     
     # Draw heart
     heart_size = icon_size // 4
@@ -135,24 +231,23 @@ def create_splash_screen(width, height, filename, is_landscape=False):
         (heart_margin_x + heart_size, heart_margin_y + heart_size//3),
         (heart_margin_x + heart_size//2, heart_margin_y + heart_size)
     ]
-    draw.polygon(points, fill=color_scheme['accent'])
-    
-    # Add tagline
-    tagline = "Empowering Communication for All"
-    try:
-        tagline_font = ImageFont.truetype("arial.ttf", min(width, height) // 25)
-    except:
-        tagline_font = ImageFont.load_default()
+    draw.polygon(points, fill=SPLASH_COLORS['accent'])
     
-    tagline_width = draw.textlength(tagline, font=tagline_font)
-    tagline_x = (width - tagline_width) // 2
-    tagline_y = height * 2 // 3
+    return img
+
+def draw_splash_tagline(width, height):
+    """Draw the splash screen tagline on a transparent canvas."""
+    img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
     
-    draw.text((tagline_x, tagline_y), tagline, fill=color_scheme['text'], font=tagline_font)
+    # Add tagline
+    tagline_box = (width // 20, height * 2 // 3, width - width // 20, height * 5 // 6)
+    tagline = fit_text("Empowering Communication for All", tagline_box[2] - tagline_box[0],
+                       tagline_box[3] - tagline_box[1], min(width, height) // 25,
+                       family=FONT_FAMILY)
+    draw_layout(draw, tagline, tagline_box, SPLASH_COLORS['text'], valign="top")
     
-    # Save image
-    img.save(filename)
-    print(f"Created splash screen: {filename}")
+    return img
 
 def create_screenshot(width, height, filename, content):
     """Create a placeholder screenshot."""
@@ -169,21 +264,11 @@ def create_screenshot(width, height, filename, content):
     img = Image.new('RGBA', (width, height), color_scheme['background'])
     draw = ImageDraw.Draw(img)
     
-    # Add content text
-    try:
-        font = ImageFont.truetype("arial.ttf", min(width, height) // 20)
-    except:
-        font = ImageFont.load_default()
-    
-    # Split content by newlines
-    lines = content.split('\n')
-    line_height = min(width, height) // 15
-    
-    for i, line in enumerate(lines):
-        text_width = draw.textlength(line, font=font)
-        text_x = (width - text_width) // 2
-        text_y = height // 2 - (len(lines) * line_height // 2) + i * line_height
-        draw.text((text_x, text_y), line, fill=color_scheme['text'], font=font)
+    # Add content text, wrapped and sized to fit the screen
+    box = (width // 20, height // 10, width - width // 20, height - height // 10)
+    layout = fit_text(content, box[2] - box[0], box[3] - box[1], min(width, height) // 20,
+                      family=FONT_FAMILY, line_spacing=4 / 3)
+    draw_layout(draw, layout, box, color_scheme['text'])
     
     # Save image
     img.save(filename)
@@ -201,21 +286,15 @@ def create_feature_graphic(width, height, filename, platform):
     draw = ImageDraw.Draw(img)
     
     # Add platform-specific text
-    try:
-        font = ImageFont.truetype("arial.ttf", min(width, height) // 15)
-    except:
-        font = ImageFont.load_default()
-    
     if "Google" in platform:
         text = "Google Play Feature Graphic"
     else:
         text = "App Store Feature Graphic"
     
-    text_width = draw.textlength(text, font=font)
-    text_x = (width - text_width) // 2
-    text_y = (height - min(width, height) // 15) // 2
-    
-    draw.text((text_x, text_y), text, fill=color_scheme['text'], font=font)
+    box = (width // 20, height // 10, width - width // 20, height - height // 10)
+    layout = fit_text(text, box[2] - box[0], box[3] - box[1], min(width, height) // 15,
+                      family=FONT_FAMILY)
+    draw_layout(draw, layout, box, color_scheme['text'])
     
     # Save image
     img.save(filename)
@@ -233,23 +312,46 @@ def create_marketing_asset(width, height, filename, asset_type):
     draw = ImageDraw.Draw(img)
     
     # Add asset type text
-    try:
-        font = ImageFont.truetype("arial.ttf", min(width, height) // 15)
-    except:
-        font = ImageFont.load_default()
-    
     text = asset_type.replace('_', ' ').title()
-    text_width = draw.textlength(text, font=font)
-    text_x = (width - text_width) // 2
-    text_y = (height - min(width, height) // 15) // 2
-    
-    draw.text((text_x, text_y), text, fill=color_scheme['text'], font=font)
+    box = (width // 20, height // 10, width - width // 20, height - height // 10)
+    layout = fit_text(text, box[2] - box[0], box[3] - box[1], min(width, height) // 15,
+                      family=FONT_FAMILY)
+    draw_layout(draw, layout, box, color_scheme['text'])
     
     # Save image
     img.save(filename)
     print(f"Created marketing asset: {filename}")
 
-def generate_android_icons():
+def schedule_icon(graph, size, filename, render_once=False, source="procedural",
+                  original=ORIGINAL_ICON):
+    """Schedule one app icon, drawn procedurally, rendered from the logo SVG or
+    resized from the original artwork."""
+    if source == "svg":
+        graph.schedule(filename, create_svg_asset, LOGO_SVG, size, size, filename,
+                       files=(LOGO_SVG,), cost=size * size)
+    elif source == "original":
+        graph.schedule(filename, create_original_icon, original, size, filename,
+                       files=(original,), cost=size * size)
+    elif render_once:
+        # Resized from the master schedule_assets drew, on any worker
+        graph.schedule(filename, create_original_icon, ICON_MASTER, size, filename,
+                       files=(ICON_MASTER,), cost=size * size)
+    else:
+        graph.schedule(filename, create_app_icon, size, filename, cost=size * size)
+
+def schedule_splash_screen(graph, width, height, filename, source="procedural"):
+    """Schedule one splash screen, drawn procedurally or rendered from the splash SVG."""
+    if source == "svg":
+        graph.schedule(filename, create_svg_asset, SPLASH_SVG, width, height, filename,
+                       background=SPLASH_BACKGROUND,
+                       files=(SPLASH_SVG,) + font_dependencies(), cost=width * height)
+    else:
+        # One worker renders a whole aspect class, drawing its layers once
+        graph.schedule(filename, create_splash_screen, width, height, filename,
+                       files=font_dependencies(), cost=width * height,
+                       group=("splash", aspect_class(width, height)))
+
+def generate_android_icons(graph, render_once=False, source="procedural", original=ORIGINAL_ICON):
     """Generate all Android icons."""
     android_sizes = {
         36: "assets_store/icons/android/android_icon_36dp.png",
@@ -261,28 +363,28 @@ def generate_android_icons():
     }
     
     for size, filename in android_sizes.items():
-        create_app_icon(size, filename)
+        schedule_icon(graph, size, filename, render_once, source, original)
 
-def generate_ios_icons():
+def generate_ios_icons(graph, render_once=False, source="procedural", original=ORIGINAL_ICON):
     """Generate all iOS icons."""
-    ios_sizes = {
-        40: "assets_store/icons/ios/ios_icon_20x20@2x.png",
-        60: "assets_store/icons/ios/ios_icon_20x20@3x.png",
-        58: "assets_store/icons/ios/ios_icon_29x29@2x.png",
-        87: "assets_store/icons/ios/ios_icon_29x29@3x.png",
-        80: "assets_store/icons/ios/ios_icon_40x40@2x.png",
-        120: "assets_store/icons/ios/ios_icon_40x40@3x.png",
-        120: "assets_store/icons/ios/ios_icon_60x60@2x.png",
-        180: "assets_store/icons/ios/ios_icon_60x60@3x.png",
-        152: "assets_store/icons/ios/ios_icon_76x76@2x.png",
-        167: "assets_store/icons/ios/ios_icon_83.5x83.5@2x.png",
-        1024: "assets_store/icons/ios/ios_icon_1024x1024.png"
-    }
+    ios_sizes = [
+        (40, "assets_store/icons/ios/ios_icon_20x20@2x.png"),
+        (60, "assets_store/icons/ios/ios_icon_20x20@3x.png"),
+        (58, "assets_store/icons/ios/ios_icon_29x29@2x.png"),
+        (87, "assets_store/icons/ios/ios_icon_29x29@3x.png"),
+        (80, "assets_store/icons/ios/ios_icon_40x40@2x.png"),
+        (120, "assets_store/icons/ios/ios_icon_40x40@3x.png"),
+        (120, "assets_store/icons/ios/ios_icon_60x60@2x.png"),
+        (180, "assets_store/icons/ios/ios_icon_60x60@3x.png"),
+        (152, "assets_store/icons/ios/ios_icon_76x76@2x.png"),
+        (167, "assets_store/icons/ios/ios_icon_83.5x83.5@2x.png"),
+        (1024, "assets_store/icons/ios/ios_icon_1024x1024.png")
+    ]
     
-    for size, filename in ios_sizes.items():
-        create_app_icon(size, filename)
+    for size, filename in ios_sizes:
+        schedule_icon(graph, size, filename, render_once, source, original)
 
-def generate_web_icons():
+def generate_web_icons(graph, render_once=False, source="procedural", original=ORIGINAL_ICON):
     """Generate all web icons."""
     web_sizes = {
         16: "assets_store/icons/web/web_icon_16x16.png",
@@ -292,9 +394,9 @@ def generate_web_icons():
     }
     
     for size, filename in web_sizes.items():
-        create_app_icon(size, filename)
+        schedule_icon(graph, size, filename, render_once, source, original)
 
-def generate_mobile_splash_screens():
+def generate_mobile_splash_screens(graph, source="procedural"):
     """Generate all mobile splash screens."""
     mobile_sizes = {
         (640, 1136): "assets_store/splashscreens/mobile/splash_mobile_640x1136.png",
@@ -306,9 +408,9 @@ def generate_mobile_splash_screens():
     }
     
     for (width, height), filename in mobile_sizes.items():
-        create_splash_screen(width, height, filename)
+        schedule_splash_screen(graph, width, height, filename, source)
 
-def generate_tablet_splash_screens():
+def generate_tablet_splash_screens(graph, source="procedural"):
     """Generate all tablet splash screens."""
     tablet_sizes = {
         (1536, 2048): "assets_store/splashscreens/tablet/splash_tablet_1536x2048.png",
@@ -318,9 +420,9 @@ def generate_tablet_splash_screens():
     }
     
     for (width, height), filename in tablet_sizes.items():
-        create_splash_screen(width, height, filename)
+        schedule_splash_screen(graph, width, height, filename, source)
 
-def generate_screenshots():
+def generate_screenshots(graph):
     """Generate all screenshots."""
     screenshot_sizes = {
         (1080, 1920): [
@@ -334,9 +436,10 @@ def generate_screenshots():
     
     for (width, height), screenshots in screenshot_sizes.items():
         for filename, content in screenshots:
-            create_screenshot(width, height, filename, content)
+            graph.schedule(filename, create_screenshot, width, height, filename, content,
+                           files=font_dependencies(), cost=width * height)
 
-def generate_feature_graphics():
+def generate_feature_graphics(graph):
     """Generate all feature graphics."""
     feature_graphics = {
         (1024, 500): ("assets_store/promotional/feature_graphics/feature_graphic_1024x500.png", "Google Play"),
@@ -344,9 +447,10 @@ def generate_feature_graphics():
     }
     
     for (width, height), (filename, platform) in feature_graphics.items():
-        create_feature_graphic(width, height, filename, platform)
+        graph.schedule(filename, create_feature_graphic, width, height, filename, platform,
+                       files=font_dependencies(), cost=width * height)
 
-def generate_marketing_assets():
+def generate_marketing_assets(graph):
     """Generate all marketing assets."""
     marketing_assets = {
         (400, 150): "assets_store/promotional/marketing/logo_horizontal.png",
@@ -358,10 +462,82 @@ def generate_marketing_assets():
     
     for (width, height), filename in marketing_assets.items():
         asset_type = filename.split('/')[-1].replace('.png', '')
-        create_marketing_asset(width, height, filename, asset_type)
+        graph.schedule(filename, create_marketing_asset, width, height, filename, asset_type,
+                       files=font_dependencies(), cost=width * height)
 
-def main():
+def schedule_assets(graph, args):
+    """Schedule every stage; outputs that are up to date are skipped."""
+    if args.render_once and args.source == "procedural":
+        # Drawn here, before any worker starts; the icon tasks read the file
+        graph.build(ICON_MASTER, create_icon_master, ICON_MASTER)
+    
+    print("\nGenerating Android Icons...")
+    generate_android_icons(graph, args.render_once, args.source, args.original)
+    
+    print("\nGenerating iOS Icons...")
+    generate_ios_icons(graph, args.render_once, args.source, args.original)
+    
+    print("\nGenerating Web Icons...")
+    generate_web_icons(graph, args.render_once, args.source, args.original)
+    
+    print("\nGenerating Mobile Splash Screens...")
+    generate_mobile_splash_screens(graph, source=args.source)
+    
+    print("\nGenerating Tablet Splash Screens...")
+    generate_tablet_splash_screens(graph, source=args.source)
+    
+    print("\nGenerating Screenshots...")
+    generate_screenshots(graph)
+    
+    print("\nGenerating Feature Graphics...")
+    generate_feature_graphics(graph)
+    
+    print("\nGenerating Marketing Assets...")
+    generate_marketing_assets(graph)
+
+def render_assets(graph, args):
+    """Render the scheduled assets, optimize them if asked and save the build state."""
+    print(f"\nRendering {len(graph.pending)} assets with {max(args.jobs, 1)} worker(s)...")
+    start = time.perf_counter()
+    try:
+        graph.run(jobs=args.jobs)
+        graph.report_timings(time.perf_counter() - start)
+        
+        # Restored outputs are cached as rendered, so they are optimized too
+        outputs = [output for output, _ in graph.timings] + graph.restored
+        if args.optimize and outputs:
+            print("\nOptimizing redrawn assets...")
+            png_optimizer.optimize_all(outputs, jobs=max(args.jobs, 1))
+            # Optimized files keep their inputs, so they stay up to date
+            for output in outputs:
+                graph.record(output, graph.nodes[output]["deps"])
+    finally:
+        graph.save()
+
+def main(argv=None):
     """Main function to generate all assets."""
+    parser = argparse.ArgumentParser(description="Generate app store assets")
+    parser.add_argument("--force", action="store_true",
+                        help="redraw every asset, even if it is up to date or in the render cache")
+    parser.add_argument("--source", choices=["procedural", "svg", "original"], default="procedural",
+                        help="draw icons and splash screens in Python, render them from "
+                             "source_logo.svg / splash_source.svg, or resize the icons from "
+                             "the original artwork (--original)")
+    parser.add_argument("--original", default=ORIGINAL_ICON, metavar="PNG",
+                        help=f"artwork for --source original (default: {ORIGINAL_ICON})")
+    parser.add_argument("--render-once", action="store_true",
+                        help=f"derive every icon size from one {MASTER_ICON_SIZE}px master")
+    parser.add_argument("--jobs", "-j", type=int, default=1, metavar="N",
+                        help="render on N worker processes (default: 1)")
+    parser.add_argument("--optimize", action="store_true",
+                        help="losslessly shrink every redrawn PNG with png_optimizer")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="do not restore or store renders in the shared render cache")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep running and regenerate and redeploy the assets affected "
+                             "by every change to a source file or generator module")
+    args = parser.parse_args(argv)
+
     print("Generating App Store Assets for AAC Communication Helper")
     print("=" * 54)
     
@@ -373,42 +549,40 @@ def main():
         print("Please install Pillow using: pip install Pillow")
         return
     
+    if args.source == "original" and not os.path.exists(args.original):
+        print(f"❌ {args.original} not found!")
+        print(f"Please save your original image as '{args.original}' "
+              "(or pass --original PNG), then run this script again.")
+        return
+    
     # Create directory structure
     create_directory_structure()
     
-    # Generate all assets
-    print("\nGenerating Android Icons...")
-    generate_android_icons()
-    
-    print("\nGenerating iOS Icons...")
-    generate_ios_icons()
-    
-    print("\nGenerating Web Icons...")
-    generate_web_icons()
-    
-    print("\nGenerating Mobile Splash Screens...")
-    generate_mobile_splash_screens()
-    
-    print("\nGenerating Tablet Splash Screens...")
-    generate_tablet_splash_screens()
-    
-    print("\nGenerating Screenshots...")
-    generate_screenshots()
+    # Only outputs whose inputs changed since the last run are redrawn
+    cache = None if args.no_cache else render_cache.default_cache()
+    graph = BuildGraph(version=SCRIPT_VERSION, cache=cache, force=args.force)
     
-    print("\nGenerating Feature Graphics...")
-    generate_feature_graphics()
+    if args.watch:
+        import asset_watch
+        asset_watch.watch(graph, args)
+        return
     
-    print("\nGenerating Marketing Assets...")
-    generate_marketing_assets()
+    # Collect the render tasks of every stage, then render them together
+    schedule_assets(graph, args)
+    render_assets(graph, args)
     
     print("\n" + "=" * 54)
     print("All assets generated successfully!")
+    print(f"Rebuilt {graph.built} assets, restored {len(graph.restored)} from the render cache, "
+          f"{graph.skipped} already up to date")
+    if cache is not None:
+        print(f"Render cache: {render_cache.format_stats(cache.stats())}")
     print("=" * 54)
     print("\nNext steps:")
     print("1. Review all generated assets in the assets_store directory")
-    print("2. Replace placeholder screenshots with actual app screenshots")
-    print("3. Optimize images for file size if needed")
-    print("4. Verify all assets meet store requirements")
+    print("2. Replace placeholder screenshots with actual app screenshots (screenshot_pipeline.py)")
+    print("3. Optimize images for file size if needed (--optimize or png_optimizer.py)")
+    print("4. Verify all assets meet store requirements (store_validator.py)")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
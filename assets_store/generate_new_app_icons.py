@@ -3,32 +3,56 @@
 Generate new app icons with the colorful figures design for AAC Communication Helper.
 """
 
+import argparse
+import math
 import os
 from PIL import Image, ImageDraw
 
-def create_colorful_app_icon(size, filename):
+from resize_engine import IconVariants
+
+# Resolution the design is drawn at in render-once mode; 2x the largest
+# platform size so every derived size is a downscale.
+MASTER_SIZE = 2048
+
+ICON_COLORS = {
+    'blue': (0, 149, 221),      # Blue figure
+    'green': (139, 195, 74),    # Green figure  
+    'orange': (255, 152, 0),    # Orange figure
+    'purple': (156, 39, 176),   # Purple figure
+    'teal': (0, 150, 136),      # Teal figure
+    'play_button': (13, 71, 161), # Dark blue play button
+    'white': (255, 255, 255)
+}
+
+def create_colorful_app_icon(size, filename, renderer="draw"):
     """Create the new app icon with colorful figures and play button."""
+    img = draw_colorful_app_icon(size, renderer)
+    
+    # Save the image
+    img.save(filename, "PNG")
+    print(f"Created new app icon: {filename}")
+
+def draw_colorful_app_icon(size, renderer="draw"):
+    """Draw the colorful figures and play button design at the given size.
+    
+    renderer "draw" uses ImageDraw directly; "sdf" rasterizes the same design
+    from colorful_icon_shapes() with anti-aliasing.
+    """
+    if renderer == "sdf":
+        import sdf_raster
+        return sdf_raster.render(colorful_icon_shapes(), size)
     
     # Create image with white background
     img = Image.new('RGBA', (size, size), (255, 255, 255, 255))
     draw = ImageDraw.Draw(img)
     
     # Define colors matching the new design
-    colors = {
-        'blue': (0, 149, 221),      # Blue figure
-        'green': (139, 195, 74),    # Green figure  
-        'orange': (255, 152, 0),    # Orange figure
-        'purple': (156, 39, 176),   # Purple figure
-        'teal': (0, 150, 136),      # Teal figure
-        'play_button': (13, 71, 161), # Dark blue play button
-        'white': (255, 255, 255)
-    }
+    colors = ICON_COLORS
     
     center = size // 2
     figure_size = size // 8
     
     # Position figures around a circle
-    import math
     positions = []
     for i in range(5):  # 5 figures
         angle = (i * 72 - 90) * math.pi / 180  # Start from top, 72 degrees apart
@@ -103,12 +127,75 @@ def create_colorful_app_icon(size, filename):
     ]
     draw.polygon(triangle_points, fill=colors['white'])
     
-    # Save the image
-    img.save(filename, "PNG")
-    print(f"Created new app icon: {filename}")
+    return img
 
-def generate_all_app_icons():
-    """Generate all required app icon sizes for different platforms."""
+def colorful_icon_shapes():
+    """Describe the colorful figures design as sdf_raster shapes in unit coordinates."""
+    import sdf_raster as sdf
+    
+    colors = ICON_COLORS
+    center = 0.5
+    figure_size = 1 / 8
+    figure_colors = [colors['blue'], colors['teal'], colors['purple'], colors['green'], colors['orange']]
+    
+    shapes = []
+    for i, color in enumerate(figure_colors):
+        angle = math.radians(i * 72 - 90)  # Start from top, 72 degrees apart
+        x = center + math.cos(angle) / 3
+        y = center + math.sin(angle) / 3
+        
+        # Head
+        head_radius = figure_size / 3
+        shapes.append(sdf.ellipse(x, y - figure_size / 2, head_radius, head_radius, color))
+        
+        # Body (elongated oval)
+        body_width = figure_size / 2
+        body_height = figure_size
+        shapes.append(sdf.ellipse(x, y - figure_size / 3 + body_height / 2,
+                                  body_width / 2, body_height / 2, color))
+        
+        # Arms (extending outward)
+        arm_length = figure_size / 2
+        arm_width = figure_size / 6
+        for arm_angle, start_x in (((-45 if i % 2 == 0 else -30), x - body_width / 3),
+                                   ((45 if i % 2 == 0 else 30), x + body_width / 3)):
+            shapes.append(sdf.line(start_x, y,
+                                   x + arm_length * math.cos(math.radians(arm_angle)),
+                                   y + arm_length * math.sin(math.radians(arm_angle)),
+                                   arm_width, color))
+        
+        # Legs
+        leg_length = figure_size / 2
+        leg_width = figure_size / 6
+        hip_y = y + body_height / 2
+        shapes.append(sdf.line(x - body_width / 4, hip_y, x - body_width / 2, hip_y + leg_length,
+                               leg_width, color))
+        shapes.append(sdf.line(x + body_width / 4, hip_y, x + body_width / 2, hip_y + leg_length,
+                               leg_width, color))
+    
+    # Central play button
+    play_size = 1 / 4
+    shapes.append(sdf.ellipse(center, center, play_size / 2, play_size / 2, colors['play_button']))
+    
+    triangle_size = play_size / 2
+    triangle_center_x = center + play_size / 12  # Slightly offset to look centered
+    triangle_width = triangle_size * 0.866  # For equilateral triangle
+    shapes.append(sdf.polygon([
+        (triangle_center_x - triangle_width / 2, center - triangle_size / 2),
+        (triangle_center_x - triangle_width / 2, center + triangle_size / 2),
+        (triangle_center_x + triangle_width / 2, center),
+    ], colors['white']))
+    
+    return shapes
+
+def generate_all_app_icons(render_once=False, renderer="draw"):
+    """Generate all required app icon sizes for different platforms.
+    
+    With render_once the design is drawn a single time at MASTER_SIZE and
+    every platform size is derived from it through the shared resize path,
+    instead of re-running the drawing math (and its integer truncation) at
+    each size.
+    """
     
     # Create directories
     os.makedirs("assets_store/icons/android", exist_ok=True)
@@ -146,22 +233,47 @@ def generate_all_app_icons():
         (512, "assets_store/icons/web/icon-512.png"),
     ]
     
+    if render_once:
+        variants = IconVariants(draw_colorful_app_icon(MASTER_SIZE, renderer))
+        
+        def create_icon(size, filename):
+            variants.save(filename, size)
+            print(f"Created new app icon: {filename}")
+    else:
+        def create_icon(size, filename):
+            create_colorful_app_icon(size, filename, renderer)
+    
     print("Generating Android icons...")
     for size, filename in android_sizes:
-        create_colorful_app_icon(size, filename)
+        create_icon(size, filename)
     
     print("Generating iOS icons...")
     for size, filename in ios_sizes:
-        create_colorful_app_icon(size, filename)
+        create_icon(size, filename)
     
     print("Generating Web icons...")
     for size, filename in web_sizes:
-        create_colorful_app_icon(size, filename)
+        create_icon(size, filename)
     
     # Create master icon
-    create_colorful_app_icon(1024, "assets_store/icons/app_icon_master.png")
+    create_icon(1024, "assets_store/icons/app_icon_master.png")
     
     print("✅ All app icons generated successfully!")
 
 if __name__ == "__main__":
-    generate_all_app_icons()
+    parser = argparse.ArgumentParser(description="Generate the colorful app icons")
+    parser.add_argument("--render-once", action="store_true",
+                        help=f"draw the design once at {MASTER_SIZE}px and derive every size from it")
+    parser.add_argument("--renderer", choices=["draw", "sdf"], default="draw",
+                        help="ImageDraw primitives, or the anti-aliased NumPy SDF rasterizer")
+    args = parser.parse_args()
+    
+    if args.renderer == "sdf":
+        try:
+            import numpy
+        except ImportError:
+            print("Error: NumPy is not installed")
+            print("Please install NumPy using: pip install numpy")
+            raise SystemExit(1)
+    
+    generate_all_app_icons(render_once=args.render_once, renderer=args.renderer)
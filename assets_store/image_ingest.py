@@ -0,0 +1,238 @@
+"""
+Bounded-memory loading of user-supplied source images.
+
+Design tools happily export a 12000px original, and decoding one and
+converting it to RGBA takes gigabytes. load_master() inspects the header
+first and brings oversized sources down to a working master no larger
+than needed (MASTER_SIZE) while staying within a memory budget:
+
+  * sources that are small enough are decoded as before
+  * JPEGs are decoded at a reduced DCT scale (Image.draft)
+  * non-interlaced 8-bit PNGs are decoded a strip of rows at a time; each
+    strip is box-reduced with Image.reduce() and pasted into the master,
+    so only one strip is ever held in memory
+  * anything else is decoded whole if that fits the budget, and refused
+    with an IngestError otherwise
+
+Reducing by an integer factor first and leaving the final LANCZOS step to
+the ResizePyramid is what Image.thumbnail's reducing_gap does, so the
+icons look the same as when the full source is resized directly.
+
+The budget defaults to $ASSET_MEMORY_BUDGET, or 512M.
+"""
+
+import io
+import os
+import struct
+import zlib
+
+from PIL import Image
+
+from render_cache import parse_size
+
+DEFAULT_MEMORY_BUDGET = os.environ.get("ASSET_MEMORY_BUDGET", "512M")
+
+# Twice the largest icon (the 1024px store icon), so the resize pyramid
+# still filters over several source pixels for every size
+MASTER_SIZE = 2048
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# 8-bit PNG color type -> bytes per pixel
+PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+# Chunks a strip of a PNG needs besides its pixels
+PNG_STRIP_CHUNKS = (b"PLTE", b"tRNS")
+
+# Working modes for sources whose own mode reduce() cannot handle
+MASTER_MODES = {"P": "RGBA", "PA": "RGBA", "LA": "RGBA", "1": "L",
+                "I;16": "I", "I;16B": "I", "I;16L": "I", "CMYK": "RGB", "YCbCr": "RGB"}
+
+# Bytes per pixel of decoded images, for budget estimates
+BYTES_PER_PIXEL = {"1": 1, "L": 1, "P": 1, "LA": 2, "PA": 2, "I;16": 2, "I;16B": 2,
+                   "I;16L": 2, "RGB": 4, "YCbCr": 4, "RGBA": 4, "CMYK": 4, "I": 4, "F": 4}
+
+
+class IngestError(Exception):
+    """Raised when a source image cannot be loaded within the memory budget."""
+
+
+def reduction_factor(size, max_size=MASTER_SIZE):
+    """Return the largest integer factor that keeps size at least max_size."""
+    return max(1, max(size) // max_size)
+
+
+def decoded_bytes(size, mode):
+    """Estimate the memory a decoded image of size and mode takes."""
+    return size[0] * size[1] * BYTES_PER_PIXEL.get(mode, 4)
+
+
+def _open(path):
+    """Open an image lazily (header only), without Pillow's decompression bomb
+    check: load_master enforces its own memory budget."""
+    limit = Image.MAX_IMAGE_PIXELS
+    Image.MAX_IMAGE_PIXELS = None
+    try:
+        return Image.open(path)
+    finally:
+        Image.MAX_IMAGE_PIXELS = limit
+
+
+def _chunk(kind, data):
+    """Return one PNG chunk."""
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+class _PngStrips:
+    """Decodes a non-interlaced 8-bit PNG a strip of rows at a time."""
+
+    def __init__(self, f):
+        self.f = f
+        if f.read(8) != PNG_SIGNATURE:
+            raise IngestError("not a PNG file")
+        self.chunks = []
+        self.header = None
+        while True:
+            length, kind = struct.unpack(">I4s", f.read(8))
+            if kind == b"IDAT":
+                self.remaining = length
+                break
+            data = f.read(length)
+            f.read(4)
+            if kind == b"IHDR":
+                self.header = struct.unpack(">IIBBBBB", data)
+            elif kind in PNG_STRIP_CHUNKS:
+                self.chunks.append((kind, data))
+            elif kind == b"IEND":
+                raise IngestError("PNG has no image data")
+
+        width, height, bit_depth, color_type, _, _, interlace = self.header
+        self.size = (width, height)
+        self.streamable = bit_depth == 8 and color_type in PNG_CHANNELS and not interlace
+        self.stride = 1 + width * PNG_CHANNELS.get(color_type, 0)
+        self.decompressor = zlib.decompressobj()
+        self.previous_row = None
+
+    def _compressed(self):
+        """Return the next piece of the IDAT stream, or b"" at its end."""
+        while self.remaining == 0:
+            self.f.read(4)
+            header = self.f.read(8)
+            if len(header) < 8:
+                return b""
+            length, kind = struct.unpack(">I4s", header)
+            if kind != b"IDAT":
+                return b""
+            self.remaining = length
+        data = self.f.read(min(self.remaining, 1 << 20))
+        self.remaining -= len(data)
+        return data
+
+    def _read_rows(self, count):
+        """Return the filtered bytes of the next count rows."""
+        wanted = count * self.stride
+        rows = bytearray()
+        while len(rows) < wanted:
+            data = self.decompressor.unconsumed_tail or self._compressed()
+            if not data:
+                raise IngestError("PNG image data is truncated")
+            rows += self.decompressor.decompress(data, wanted - len(rows))
+        return bytes(rows)
+
+    def read(self, count):
+        """Decode the next count rows and return them as an image."""
+        width, _, bit_depth, color_type = self.header[:4]
+        rows = self._read_rows(count)
+        if self.previous_row is not None:
+            # Filters refer to the row above, so the last decoded row goes
+            # first, unfiltered, and is cropped off again below
+            rows = b"\0" + self.previous_row + rows
+        height = len(rows) // self.stride
+
+        ihdr = struct.pack(">IIBBBBB", width, height, bit_depth, color_type, 0, 0, 0)
+        png = (PNG_SIGNATURE + _chunk(b"IHDR", ihdr)
+               + b"".join(_chunk(kind, data) for kind, data in self.chunks)
+               + _chunk(b"IDAT", zlib.compress(rows, 0)) + _chunk(b"IEND", b""))
+        strip = Image.open(io.BytesIO(png))
+        strip.load()
+
+        self.previous_row = strip.crop((0, height - 1, width, height)).tobytes()
+        if height > count:
+            strip = strip.crop((0, 1, width, height))
+        return strip
+
+
+def _master_mode(mode, wanted):
+    """Return the mode the master is built in."""
+    return wanted or MASTER_MODES.get(mode, mode)
+
+
+def _load_png_strips(path, factor, budget, mode):
+    """Build the master of a PNG by reducing strips of rows as they are decoded."""
+    with open(path, "rb") as f:
+        strips = _PngStrips(f)
+        width, height = strips.size
+        master = None
+        # Raw, recompressed, decoded and converted copies of a strip
+        row_cost = strips.stride * 2 + width * 8
+        rows = max(factor, (budget // 2) // row_cost // factor * factor)
+
+        y = 0
+        while y < height:
+            count = min(rows, height - y)
+            strip = strips.read(count)
+            strip = strip.convert(_master_mode(strip.mode, mode))
+            reduced = strip.reduce(factor) if factor > 1 else strip
+            if master is None:
+                master = Image.new(reduced.mode, (-(-width // factor), -(-height // factor)))
+            master.paste(reduced, (0, y // factor))
+            y += count
+    return master
+
+
+def load_master(path, max_size=MASTER_SIZE, budget=None, mode="RGBA"):
+    """Load a source image as a master of at most about max_size px, within budget bytes.
+
+    mode is the master's mode; None keeps the source's mode where possible.
+    Sources that need no reduction are returned as decoded.
+    """
+    budget = parse_size(budget if budget is not None else DEFAULT_MEMORY_BUDGET)
+    img = _open(path)
+    factor = reduction_factor(img.size, max_size)
+    full_cost = decoded_bytes(img.size, img.mode) + decoded_bytes(img.size, mode or img.mode)
+
+    if factor == 1 and full_cost <= budget:
+        img.load()
+        return img.convert(mode) if mode and img.mode != mode else img
+
+    source_size = img.size
+    if img.format == "JPEG":
+        # The decoder scales by 1/2, 1/4 or 1/8, never below the requested size
+        img.draft(img.mode, (source_size[0] // factor, source_size[1] // factor))
+        factor = reduction_factor(img.size, max_size)
+        full_cost = decoded_bytes(img.size, img.mode) + decoded_bytes(img.size, mode or img.mode)
+
+    if img.format == "PNG":
+        img.close()
+        with open(path, "rb") as f:
+            streamable = _PngStrips(f).streamable
+        if streamable:
+            master = _load_png_strips(path, factor, budget, mode)
+            print(f"📉 Reduced {source_size[0]}x{source_size[1]} source to a "
+                  f"{master.width}x{master.height} master, in strips")
+            return master
+        img = _open(path)
+
+    if full_cost > budget:
+        raise IngestError(
+            f"{path} is {source_size[0]}x{source_size[1]} and needs about "
+            f"{full_cost / 1024 ** 2:.0f} MB to decode, over the "
+            f"{budget / 1024 ** 2:.0f} MB budget; export it as a non-interlaced 8-bit PNG "
+            "or a JPEG, or raise ASSET_MEMORY_BUDGET")
+
+    img.load()
+    img = img.convert(_master_mode(img.mode, mode))
+    master = img.reduce(factor) if factor > 1 else img
+    print(f"📉 Reduced {source_size[0]}x{source_size[1]} source to a "
+          f"{master.width}x{master.height} master")
+    return master
@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Capture screenshots on every connected Android device at once.
+
+Store listings need phone, 7-inch tablet and 10-inch tablet screenshots.
+This finds every device and emulator `adb devices` reports, sorts each into
+a device class by its smallest width in dp, and runs the capture scenarios
+on all of them concurrently with asyncio. Screenshots are written to
+promotional/screenshots/android/<class>/.
+
+Shots come from a declarative scenario file (capture_scenarios.json): each
+one drives the app with adb actions and waits for a readiness condition
+instead of a fixed delay, so a capture pass runs unattended. Finished shots
+are journaled and not captured again on the next run (their actions are
+replayed to reach the missing shots).
+
+Frames are streamed raw (see screencap.py) and PNG-encoded on a thread pool,
+so devices never wait on each other's encoding. Run it against
+fake_adb.py to try it without devices:
+
+    ADB=assets_store/fake_adb.py python assets_store/multi_device_capture.py
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from adb_client import AdbProtocolError, default_client
+from screencap import (ADB, STABLE_FRAMES, STABLE_THRESHOLD, FrameStability,
+                       save_raw_png)
+
+OUTPUT_ROOT = "assets_store/promotional/screenshots/android"
+
+# Smallest-width (dp) lower bounds of each device class, largest first
+DEVICE_CLASSES = [
+    (720, "tablet_10"),
+    (600, "tablet_7"),
+    (0, "phone"),
+]
+
+# Declarative shot list; see load_scenarios() for the format
+SCENARIO_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "capture_scenarios.json")
+
+# Finished shots are recorded here (inside the output folder) so a rerun
+# after a failure only captures what is missing
+JOURNAL_NAME = ".capture_journal.json"
+
+# Defaults for "ready" conditions
+READY_TIMEOUT = 10.0
+READY_INTERVAL = 0.25
+
+KEYCODES = {"BACK": 4, "HOME": 3, "ENTER": 66, "TAB": 61, "MENU": 82}
+
+Device = namedtuple("Device", "serial width height density device_class")
+
+
+class AdbError(Exception):
+    """Raised when an adb command exits with an error."""
+
+
+class ScenarioError(Exception):
+    """Raised for an invalid scenario file or a readiness condition that never held."""
+
+
+async def run_adb(*args, device_id=None, adb=None, timeout=30):
+    """Run one adb command without blocking the event loop; return stdout bytes.
+
+    Goes straight to the adb server over its socket protocol when possible,
+    so no process is started per command.
+    """
+    client = default_client() if adb is None else None
+    if client is not None:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(None, client.run, args, device_id)
+        except (OSError, AdbProtocolError) as e:
+            raise AdbError(f"adb {' '.join(args)} failed: {e}") from e
+
+    command = [adb or ADB] + (["-s", device_id] if device_id else []) + list(args)
+    process = await asyncio.create_subprocess_exec(
+        *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise AdbError(f"{' '.join(command)} timed out after {timeout}s")
+    if process.returncode != 0:
+        raise AdbError(f"{' '.join(command)} failed: {stderr.decode(errors='replace').strip()}")
+    return stdout
+
+
+async def list_devices(adb=None):
+    """Return the serials of every device that is online."""
+    output = (await run_adb("devices", adb=adb)).decode(errors="replace")
+    serials = []
+    for line in output.splitlines()[1:]:
+        fields = line.split()
+        if len(fields) >= 2 and fields[1] == "device":
+            serials.append(fields[0])
+    return serials
+
+
+def classify(width, height, density):
+    """Return the device class for a screen size in pixels and its density."""
+    smallest_width_dp = min(width, height) * 160 / density
+    for lower_bound, device_class in DEVICE_CLASSES:
+        if smallest_width_dp >= lower_bound:
+            return device_class
+    return DEVICE_CLASSES[-1][1]
+
+
+def _last_match(pattern, text):
+    """Return the groups of the last match, so override values beat physical ones."""
+    matches = re.findall(pattern, text)
+    return matches[-1] if matches else None
+
+
+async def probe_device(serial, adb=None):
+    """Read a device's screen size and density and classify it."""
+    size_output, density_output = await asyncio.gather(
+        run_adb("shell", "wm", "size", device_id=serial, adb=adb),
+        run_adb("shell", "wm", "density", device_id=serial, adb=adb))
+
+    size = _last_match(r"size:\s*(\d+)x(\d+)", size_output.decode(errors="replace"))
+    density = _last_match(r"density:\s*(\d+)", density_output.decode(errors="replace"))
+    if size is None or density is None:
+        raise AdbError(f"could not read the screen size of {serial}")
+
+    width, height = int(size[0]), int(size[1])
+    density = int(density)
+    return Device(serial, width, height, density, classify(width, height, density))
+
+
+def output_paths(devices, output_root):
+    """Return {serial: folder}, giving devices that share a class their own folder."""
+    by_class = {}
+    for device in devices:
+        by_class.setdefault(device.device_class, []).append(device)
+
+    folders = {}
+    for device_class, members in by_class.items():
+        for device in members:
+            folder = os.path.join(output_root, device_class)
+            if len(members) > 1:
+                folder = os.path.join(folder, re.sub(r"[^\w.-]", "_", device.serial))
+            folders[device.serial] = folder
+    return folders
+
+
+def load_scenarios(path=SCENARIO_FILE):
+    """Load the shot list from a scenario file.
+
+    The file is JSON: {"shots": [shot, ...]}, where each shot has a "name"
+    (the PNG file name), an optional "description", a list of "actions" and
+    an optional "ready" condition. Actions are single-key objects:
+
+        {"start": "pkg/.Activity", "restart": true}   am start -W [-S] -n ...
+        {"deep_link": "scheme://path", "package": "pkg"}
+        {"tap": [x, y]}            {"swipe": [x1, y1, x2, y2, ms]}
+        {"text": "hello"}          {"key": "BACK" or a keycode}
+        {"shell": "any command"}   {"wait": seconds}
+
+    Coordinates <= 1 are fractions of the device's screen size. "ready" may
+    hold "activity" (a substring of the focused window) and "text" (shown in
+    the UI hierarchy), plus "timeout" and "interval" in seconds. With
+    "stable": true (or {"frames": N, "threshold": T}) the shot is taken once
+    the screen has stopped changing, see screencap.FrameStability.
+    """
+    with open(path) as f:
+        scenario = json.load(f)
+
+    shots = scenario.get("shots") if isinstance(scenario, dict) else scenario
+    if not isinstance(shots, list):
+        raise ScenarioError(f"{path}: expected a list of shots")
+    for shot in shots:
+        if not isinstance(shot, dict) or not shot.get("name"):
+            raise ScenarioError(f"{path}: every shot needs a name")
+    return shots
+
+
+def _point(device, x, y):
+    """Convert a scenario coordinate pair to device pixels."""
+    if 0 <= x <= 1 and 0 <= y <= 1:
+        x, y = x * device.width, y * device.height
+    return str(int(round(x))), str(int(round(y)))
+
+
+def action_command(device, action):
+    """Return the `adb shell` arguments for one scenario action, or None for a wait."""
+    if "start" in action:
+        return ["am", "start", "-W"] + (["-S"] if action.get("restart") else []) + \
+            ["-n", action["start"]]
+    if "deep_link" in action:
+        command = ["am", "start", "-W", "-a", "android.intent.action.VIEW",
+                   "-d", action["deep_link"]]
+        return command + ([action["package"]] if action.get("package") else [])
+    if "tap" in action:
+        return ["input", "tap", *_point(device, *action["tap"])]
+    if "swipe" in action:
+        x1, y1, x2, y2, *duration = action["swipe"]
+        return ["input", "swipe", *_point(device, x1, y1), *_point(device, x2, y2),
+                *[str(int(d)) for d in duration]]
+    if "text" in action:
+        # input text needs spaces escaped as %s
+        return ["input", "text", action["text"].replace(" ", "%s")]
+    if "key" in action:
+        key = action["key"]
+        return ["input", "keyevent", str(KEYCODES.get(str(key).upper(), key))]
+    if "shell" in action:
+        return action["shell"].split()
+    if "wait" in action:
+        return None
+    raise ScenarioError(f"unknown scenario action: {action}")
+
+
+async def perform_action(device, action, adb=None):
+    """Run one scenario action on a device."""
+    command = action_command(device, action)
+    if command is None:
+        await asyncio.sleep(action["wait"])
+    else:
+        await run_adb("shell", *command, device_id=device.serial, adb=adb)
+
+
+async def _condition_holds(device, ready, adb):
+    """Check every condition of a "ready" block once."""
+    if "activity" in ready:
+        windows = await run_adb("shell", "dumpsys", "window", "windows",
+                                device_id=device.serial, adb=adb)
+        focus = [line for line in windows.decode(errors="replace").splitlines()
+                 if "mCurrentFocus" in line or "mFocusedApp" in line]
+        if not any(ready["activity"] in line for line in focus):
+            return False
+    if "text" in ready:
+        hierarchy = await run_adb("exec-out", "uiautomator", "dump", "/dev/tty",
+                                  device_id=device.serial, adb=adb)
+        if ready["text"] not in hierarchy.decode(errors="replace"):
+            return False
+    return True
+
+
+async def wait_until_ready(device, ready, adb=None):
+    """Poll a shot's "ready" conditions until they hold, or raise on timeout."""
+    if not ready or not ready.keys() & {"activity", "text"}:
+        return 0.0
+    timeout = ready.get("timeout", READY_TIMEOUT)
+    interval = ready.get("interval", READY_INTERVAL)
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    while True:
+        if await _condition_holds(device, ready, adb):
+            return loop.time() - start
+        if loop.time() - start >= timeout:
+            raise ScenarioError(f"{device.serial}: not ready after {timeout}s: {ready}")
+        await asyncio.sleep(interval)
+
+
+class CaptureJournal:
+    """Record of finished shots, saved after every capture."""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                # A corrupt journal just means recapturing everything
+                self.entries = {}
+
+    def is_done(self, output):
+        """Return True if output was captured before and still exists."""
+        return output in self.entries and os.path.exists(output)
+
+    def record(self, output, seconds):
+        """Mark output as captured and persist the journal atomically."""
+        self.entries[output] = {
+            "captured": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seconds": round(seconds, 3),
+        }
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+async def capture(device, path, encoder, adb=None):
+    """Stream one raw frame from device and encode it to path on the encoder pool."""
+    data = await run_adb("exec-out", "screencap", device_id=device.serial, adb=adb)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(encoder, save_raw_png, data, path,
+                                      device.density)
+
+
+async def capture_when_stable(device, path, encoder, adb=None, frames=STABLE_FRAMES,
+                              threshold=STABLE_THRESHOLD, timeout=READY_TIMEOUT):
+    """Capture once frames stop changing; the last, full-size frame is saved."""
+    stability = FrameStability(frames, threshold)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    while True:
+        data = await run_adb("exec-out", "screencap", device_id=device.serial, adb=adb)
+        stable = stability.update(data)
+        if stable or loop.time() - start >= timeout:
+            break
+
+    if not stable:
+        print(f"⚠️  {device.serial}: screen still changing after {timeout}s, capturing anyway")
+    return await loop.run_in_executor(encoder, save_raw_png, data, path,
+                                      device.density)
+
+
+async def drive_to(device, shot, adb=None):
+    """Run a shot's actions and wait until its "ready" conditions hold."""
+    for action in shot.get("actions", []):
+        await perform_action(device, action, adb)
+    ready = shot.get("ready") or {}
+    await wait_until_ready(device, ready, adb)
+    return ready
+
+
+async def run_scenarios(device, scenarios, folder, encoder, adb=None, journal=None):
+    """Run every shot of a scenario on one device; return the written paths.
+
+    Shots the journal already lists are not captured again, but their
+    actions are still replayed when a later shot is missing: shots build on
+    the screen the previous one left, so skipping them would capture the
+    wrong screen.
+    """
+    paths = [os.path.join(folder, shot["name"]) for shot in scenarios]
+    done = [journal is not None and journal.is_done(path) for path in paths]
+    # Nothing after the last missing shot needs to be driven to
+    last = max((i for i, d in enumerate(done) if not d), default=-1)
+
+    written = []
+    for i, (shot, path) in enumerate(zip(scenarios, paths)):
+        if done[i]:
+            print(f"⏭️  {device.serial} ({device.device_class}): {path} already captured")
+            if i < last:
+                await drive_to(device, shot, adb)
+            continue
+
+        start = time.perf_counter()
+        ready = await drive_to(device, shot, adb)
+
+        stable = ready.get("stable")
+        if stable:
+            options = dict(stable) if isinstance(stable, dict) else {}
+            options.setdefault("timeout", ready.get("timeout", READY_TIMEOUT))
+            await capture_when_stable(device, path, encoder, adb, **options)
+        else:
+            await capture(device, path, encoder, adb)
+        seconds = time.perf_counter() - start
+        if journal is not None:
+            journal.record(path, seconds)
+        print(f"📸 {device.serial} ({device.device_class}): {path} ({seconds:.1f}s)")
+        written.append(path)
+    return written
+
+
+async def capture_all_devices(scenarios=None, adb=None, output_root=OUTPUT_ROOT, resume=True):
+    """Run the scenarios on every connected device at once.
+
+    scenarios defaults to the shots in SCENARIO_FILE. With resume, shots
+    recorded in the output folder's journal are not captured again.
+    Returns {serial: [paths]}; a device that fails is reported and skipped
+    without stopping the others.
+    """
+    scenarios = load_scenarios() if scenarios is None else scenarios
+    journal = CaptureJournal(os.path.join(output_root, JOURNAL_NAME)) if resume else None
+    serials = await list_devices(adb)
+    if not serials:
+        print("❌ No Android devices found")
+        return {}
+
+    probes = await asyncio.gather(*(probe_device(serial, adb) for serial in serials),
+                                  return_exceptions=True)
+    devices = []
+    for serial, device in zip(serials, probes):
+        if isinstance(device, Exception):
+            print(f"❌ {serial}: could not probe the device, skipping it: {device}")
+            continue
+        print(f"📱 {device.serial}: {device.width}x{device.height} @ {device.density}dpi "
+              f"-> {device.device_class}")
+        devices.append(device)
+    if not devices:
+        return {}
+    folders = output_paths(devices, output_root)
+
+    with ThreadPoolExecutor(max_workers=max(len(devices), 1),
+                            thread_name_prefix="screencap-encode") as encoder:
+        results = await asyncio.gather(
+            *(run_scenarios(device, scenarios, folders[device.serial], encoder, adb, journal)
+              for device in devices),
+            return_exceptions=True)
+
+    captured = {}
+    for device, result in zip(devices, results):
+        if isinstance(result, Exception):
+            print(f"❌ {device.serial}: {result}")
+        else:
+            captured[device.serial] = result
+    return captured
+
+
+def main(argv=None):
+    """Capture a scenario file on every connected device, unattended."""
+    parser = argparse.ArgumentParser(description="Capture screenshots on all Android devices")
+    parser.add_argument("--adb", default=None,
+                        help="adb executable to use (default: $ADB or adb on PATH)")
+    parser.add_argument("--output", default=OUTPUT_ROOT,
+                        help=f"folder for the per-device-class screenshots (default: {OUTPUT_ROOT})")
+    parser.add_argument("--scenario", default=SCENARIO_FILE,
+                        help="JSON shot list to run (default: capture_scenarios.json)")
+    parser.add_argument("--restart", action="store_true",
+                        help="ignore the journal and capture every shot again")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    captured = asyncio.run(capture_all_devices(load_scenarios(args.scenario), adb=args.adb,
+                                               output_root=args.output,
+                                               resume=not args.restart))
+    total = sum(len(paths) for paths in captured.values())
+    print(f"\n✅ Captured {total} screenshots on {len(captured)} device(s) "
+          f"in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Shrink the PNG assets in the repository without changing how they look.
+
+Every PNG is re-encoded several ways on a process pool: lossless mode
+reductions (RGBA without transparency to RGB, few-color images to an exact
+palette), zlib compression strategies at maximum compression, and optionally
+lossy palette quantization for low-color icons. Metadata chunks are dropped.
+The smallest candidate that decodes to the same pixels (or stays within
+--max-error per channel) replaces the original, and the bytes saved are
+reported per folder.
+"""
+
+import argparse
+import hashlib
+import io
+import os
+import time
+import zlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageChops
+
+import render_cache
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Folders holding generated, deployed and shipped PNGs, relative to the repo root
+DEFAULT_PATHS = [
+    "assets_store/icons",
+    "assets_store/splashscreens",
+    "assets_store/promotional",
+    "android/app/src/main/res",
+    "ios/Runner/Assets.xcassets",
+    "assets/icons",
+    "web/icons",
+]
+
+# zlib strategies tried at maximum compression
+ZLIB_STRATEGIES = [zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED, zlib.Z_RLE]
+
+# Images with at most this many colors are tried as lossy palette images
+QUANTIZE_COLORS = 256
+
+
+def find_pngs(paths):
+    """Return every PNG file under the given files and directories."""
+    found = []
+    for path in paths:
+        if os.path.isfile(path):
+            if path.lower().endswith(".png"):
+                found.append(path)
+            continue
+        for dirpath, _, filenames in os.walk(path):
+            found.extend(os.path.join(dirpath, name) for name in sorted(filenames)
+                         if name.lower().endswith(".png"))
+    return found
+
+
+def _encode(image, strategy):
+    """Encode image as PNG with maximum compression and no metadata."""
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG", optimize=True, compress_level=9, compress_type=strategy)
+    return buffer.getvalue()
+
+
+def candidates(image, max_error):
+    """Yield (description, image, lossless) variants worth encoding."""
+    rgba = image.convert("RGBA")
+    yield "original mode", image, True
+
+    opaque = rgba.getextrema()[3][0] == 255
+    if opaque and image.mode != "RGB":
+        yield "rgb", rgba.convert("RGB"), True
+
+    source = rgba.convert("RGB") if opaque else rgba
+    # Pillow only quantizes images with transparency using FASTOCTREE
+    method = Image.Quantize.MEDIANCUT if opaque else Image.Quantize.FASTOCTREE
+    colors = source.getcolors(256)
+    if colors is not None and image.mode != "P":
+        # Few enough colors for an exact palette
+        yield "exact palette", source.quantize(colors=len(colors), method=method,
+                                               dither=Image.Dither.NONE), False
+    elif colors is None and max_error > 0:
+        yield "quantized", source.quantize(colors=QUANTIZE_COLORS, method=method,
+                                           dither=Image.Dither.NONE), False
+
+
+def max_difference(reference, data):
+    """Return the largest per-channel difference between reference and data."""
+    decoded = Image.open(io.BytesIO(data)).convert("RGBA")
+    diff = ImageChops.difference(reference, decoded)
+    return max(high for _, high in diff.getextrema())
+
+
+def _optimize(original, max_error):
+    """Return the smallest acceptable encoding of PNG bytes (possibly the original)."""
+    image = Image.open(io.BytesIO(original))
+    image.load()
+    reference = image.convert("RGBA")
+
+    best = original
+    for _, candidate, lossless in candidates(image, max_error):
+        for strategy in ZLIB_STRATEGIES:
+            data = _encode(candidate, strategy)
+            if len(data) >= len(best):
+                continue
+            # Palette conversions are verified; plain re-encodes are exact by design
+            if not lossless and max_difference(reference, data) > max_error:
+                break
+            best = data
+    return best
+
+
+def optimize_png(path, max_error=0, dry_run=False):
+    """Re-encode one PNG as small as possible; return (path, before, after).
+
+    Results are kept in the render cache, keyed by the input bytes, so a file
+    that was optimized before (here or under another name) is not searched again.
+    """
+    with open(path, "rb") as f:
+        original = f.read()
+
+    cache = render_cache.default_cache()
+    key = render_cache.cache_key("png_optimizer", render_cache.code_version(_optimize),
+                                 hashlib.sha256(original).hexdigest(), max_error)
+    best = cache.get(key) if cache is not None else None
+    if best is None:
+        best = _optimize(original, max_error)
+        if cache is not None:
+            cache.put(key, best)
+    # Pool workers exit without running atexit handlers
+    render_cache.flush_default()
+
+    if best != original and not dry_run:
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(best)
+        os.replace(tmp_path, path)
+
+    return path, len(original), len(best)
+
+
+def _folder(path, root):
+    """Return the folder a file is reported under."""
+    return os.path.relpath(os.path.dirname(path), root)
+
+
+def optimize_all(paths, jobs=None, max_error=0, dry_run=False, root=REPO_ROOT):
+    """Optimize every PNG under paths on a process pool and report savings.
+
+    Returns a list of (path, before, after) results.
+    """
+    files = find_pngs(paths)
+    if not files:
+        print("No PNG files found")
+        return []
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        results = list(pool.map(optimize_png, files, [max_error] * len(files),
+                                [dry_run] * len(files), chunksize=4))
+
+    per_folder = defaultdict(lambda: [0, 0, 0])
+    for path, before, after in results:
+        totals = per_folder[_folder(path, root)]
+        totals[0] += 1
+        totals[1] += before
+        totals[2] += after
+
+    print(f"\n{'Folder':<50} {'Files':>5} {'Before':>10} {'After':>10} {'Saved':>10}")
+    for folder in sorted(per_folder):
+        count, before, after = per_folder[folder]
+        print(f"{folder:<50} {count:>5} {before:>10,} {after:>10,} {before - after:>10,}")
+
+    before = sum(r[1] for r in results)
+    after = sum(r[2] for r in results)
+    saved_pct = (before - after) * 100 / before if before else 0
+    print(f"\n{'Total':<50} {len(results):>5} {before:>10,} {after:>10,} {before - after:>10,}"
+          f" ({saved_pct:.1f}%)")
+    print(f"Optimized {len(results)} files in {time.perf_counter() - start:.1f}s"
+          + (" (dry run, nothing written)" if dry_run else ""))
+    return results
+
+
+def main(argv=None):
+    """Optimize the repository's PNG assets."""
+    parser = argparse.ArgumentParser(description="Losslessly shrink PNG assets")
+    parser.add_argument("paths", nargs="*",
+                        help="files or folders to optimize (default: all asset folders)")
+    parser.add_argument("--jobs", "-j", type=int, default=None, metavar="N",
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--max-error", type=int, default=0, metavar="E",
+                        help="allow palette quantization that changes any channel by at most E "
+                             "(default: 0, pixel-exact only)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="report the savings without rewriting any file")
+    args = parser.parse_args(argv)
+
+    paths = args.paths or [os.path.join(REPO_ROOT, p) for p in DEFAULT_PATHS]
+    print("🗜️  Optimizing PNG assets...")
+    optimize_all(paths, jobs=args.jobs, max_error=args.max_error, dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
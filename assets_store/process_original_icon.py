@@ -5,9 +5,11 @@ Save the user's original icon image and create all required sizes.
 
 import os
 import base64
-from PIL import Image
 import io
 
+from image_ingest import load_master
+from resize_engine import IconVariants, WHITE
+
 def save_original_and_generate():
     """Save the original user image and generate all sizes."""
     
@@ -25,13 +27,12 @@ def save_original_and_generate():
         return False
     
     try:
-        # Load the original image
-        original_img = Image.open(original_path)
+        # Load the original image as RGBA; huge exports are reduced while decoding
+        original_img = load_master(original_path)
         print(f"Successfully loaded original image: {original_img.size}")
         
-        # Convert to RGBA if not already
-        if original_img.mode != 'RGBA':
-            original_img = original_img.convert('RGBA')
+        # Every size below is resized and encoded once, then shared by all destinations
+        variants = IconVariants(original_img)
         
         # Android icon sizes (mipmap densities)
         android_sizes = {
@@ -57,12 +58,9 @@ def save_original_and_generate():
         os.makedirs(android_dir, exist_ok=True)
         
         for density, size in android_sizes.items():
-            resized = original_img.resize((size, size), Image.Resampling.LANCZOS)
             # Save as RGB for Android (no transparency issues)
-            rgb_img = Image.new('RGB', (size, size), (255, 255, 255))
-            rgb_img.paste(resized, mask=resized.split()[-1] if resized.mode == 'RGBA' else None)
-            rgb_img.save(os.path.join(android_dir, f"ic_launcher_{density}.png"))
-            rgb_img.save(os.path.join(android_dir, f"ic_launcher_round_{density}.png"))
+            variants.save(os.path.join(android_dir, f"ic_launcher_{density}.png"), size, background=WHITE)
+            variants.save(os.path.join(android_dir, f"ic_launcher_round_{density}.png"), size, background=WHITE)
             print(f"✓ Android {density}: {size}x{size}")
         
         # iOS icons
@@ -70,11 +68,8 @@ def save_original_and_generate():
         os.makedirs(ios_dir, exist_ok=True)
         
         for size in ios_sizes:
-            resized = original_img.resize((size, size), Image.Resampling.LANCZOS)
             # iOS also prefers RGB
-            rgb_img = Image.new('RGB', (size, size), (255, 255, 255))
-            rgb_img.paste(resized, mask=resized.split()[-1] if resized.mode == 'RGBA' else None)
-            rgb_img.save(os.path.join(ios_dir, f"icon_{size}x{size}.png"))
+            variants.save(os.path.join(ios_dir, f"icon_{size}x{size}.png"), size, background=WHITE)
             print(f"✓ iOS: {size}x{size}")
         
         # Web icons (keep RGBA for web)
@@ -82,8 +77,7 @@ def save_original_and_generate():
         os.makedirs(web_dir, exist_ok=True)
         
         for size in web_sizes:
-            resized = original_img.resize((size, size), Image.Resampling.LANCZOS)
-            resized.save(os.path.join(web_dir, f"icon_{size}x{size}.png"))
+            variants.save(os.path.join(web_dir, f"icon_{size}x{size}.png"), size)
             print(f"✓ Web: {size}x{size}")
         
         print(f"\n🎉 All icons generated successfully in '{output_dir}' folder!")
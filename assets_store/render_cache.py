@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Content-addressed store of rendered asset bytes, shared by the asset scripts.
+
+Like ccache for compilers: a render result is stored under a hash of
+everything that determines it (input hashes, parameters and the generator's
+code version), so switching branches or regenerating an identical asset
+under another name restores the bytes instead of drawing them again.
+
+BuildGraph caches whole outputs, IconVariants caches each resized and
+encoded variant, and png_optimizer caches optimized files. The store lives
+in $ASSET_CACHE_DIR (default ~/.cache/aac-assets), is capped at
+$ASSET_CACHE_SIZE (default 1G) by evicting the least recently used entries,
+and is turned off with ASSET_CACHE=off.
+
+    python assets_store/render_cache.py              # hit/miss statistics
+    python assets_store/render_cache.py --trim --max-size 200M
+    python assets_store/render_cache.py --clear
+"""
+
+import argparse
+import atexit
+import functools
+import hashlib
+import json
+import os
+import sys
+import time
+
+DEFAULT_DIR = os.environ.get("ASSET_CACHE_DIR") or os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "aac-assets")
+DEFAULT_MAX_SIZE = os.environ.get("ASSET_CACHE_SIZE", "1G")
+
+# Eviction trims the store to this fraction of the cap, so it does not run
+# again on the very next store
+TRIM_RATIO = 0.9
+
+# Per-process statistics files are merged once there are more than this
+# many; only files untouched for STATS_MERGE_AGE seconds, whose process is
+# done with them
+STATS_FILES_MAX = 64
+STATS_MERGE_AGE = 3600
+
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+COUNTERS = ("hits", "misses", "stores", "evictions")
+
+
+def parse_size(text):
+    """Parse a size such as 1048576, 512M or 2G into bytes."""
+    text = str(text).strip().upper().rstrip("B")
+    unit = text[-1:] if text[-1:] in SIZE_UNITS else ""
+    return int(float(text[:len(text) - len(unit)]) * SIZE_UNITS[unit])
+
+
+def cache_key(*parts):
+    """Return the key for a render described by JSON-serializable parts."""
+    data = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _file_version(path, size, mtime):
+    """Return a hash of one version of a source file."""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()[:16]
+    except OSError:
+        return None
+
+
+def code_version(obj):
+    """Return a hash of the source file defining obj (a module, class or function)."""
+    module = sys.modules.get(getattr(obj, "__module__", None) or getattr(obj, "__name__", ""))
+    path = getattr(module, "__file__", None)
+    if not path:
+        return None
+    # Keyed by size and mtime, so an edit during a watch session is noticed
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return _file_version(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+def _write_atomic(path, data):
+    """Write data to path through a temporary file and a rename."""
+    temp = f"{path}.{os.getpid()}.tmp"
+    with open(temp, "wb") as f:
+        f.write(data)
+    os.replace(temp, path)
+
+
+class RenderCache:
+    """A directory of render results keyed by content hash, with LRU eviction."""
+
+    def __init__(self, directory=DEFAULT_DIR, max_size=DEFAULT_MAX_SIZE):
+        self.directory = directory
+        self.max_size = parse_size(max_size)
+        self._added = 0
+        self._pid = None
+        self._check_process()
+
+    def _check_process(self):
+        """Start fresh counters in a forked worker, which inherits its parent's."""
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self._flushed = dict(self.counters)
+        self._stats_name = f"{self._pid}-{time.time_ns()}.json"
+
+    def _path(self, key):
+        """Return where the entry for key is stored."""
+        return os.path.join(self.directory, "objects", key[:2], key[2:])
+
+    def get(self, key):
+        """Return the bytes stored under key, or None."""
+        self._check_process()
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            self.counters["misses"] += 1
+            return None
+        # The modification time records the last use for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.counters["hits"] += 1
+        return data
+
+    def put(self, key, data):
+        """Store bytes under key, evicting old entries if the cap is exceeded."""
+        self._check_process()
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _write_atomic(path, data)
+        self.counters["stores"] += 1
+        self._added += len(data)
+        if self._added > self.max_size * (1 - TRIM_RATIO):
+            self.trim()
+
+    def get_file(self, key, path):
+        """Restore the entry for key to path; return False on a miss."""
+        data = self.get(key)
+        if data is None:
+            return False
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        _write_atomic(path, data)
+        return True
+
+    def put_file(self, key, path):
+        """Store the contents of the file at path under key."""
+        with open(path, "rb") as f:
+            self.put(key, f.read())
+
+    def entries(self):
+        """Return [(mtime, size, path)] for every stored entry."""
+        found = []
+        for root, _, names in os.walk(os.path.join(self.directory, "objects")):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                found.append((stat.st_mtime_ns, stat.st_size, path))
+        return found
+
+    def trim(self, max_size=None):
+        """Evict least recently used entries until the store fits; return the count."""
+        max_size = self.max_size if max_size is None else parse_size(max_size)
+        self._added = 0
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= max_size:
+            return 0
+
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= max_size * TRIM_RATIO:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        self.counters["evictions"] += evicted
+        return evicted
+
+    def clear(self):
+        """Remove every entry; statistics are kept."""
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def flush(self):
+        """Save this process's statistics (a no-op if nothing changed since the last flush)."""
+        self._check_process()
+        if self.counters == self._flushed:
+            return
+        stats_dir = os.path.join(self.directory, "stats")
+        os.makedirs(stats_dir, exist_ok=True)
+        _write_atomic(os.path.join(stats_dir, self._stats_name),
+                      json.dumps(self.counters).encode("utf-8"))
+        self._flushed = dict(self.counters)
+
+        names = os.listdir(stats_dir)
+        if len(names) > STATS_FILES_MAX:
+            cutoff = time.time() - STATS_MERGE_AGE
+            old = []
+            for name in names:
+                try:
+                    if os.path.getmtime(os.path.join(stats_dir, name)) < cutoff:
+                        old.append(name)
+                except OSError:
+                    pass
+            self._merge_stats(stats_dir, old)
+
+    def _merge_stats(self, stats_dir, names):
+        """Fold other processes' finished statistics files into one."""
+        if len(names) < 2:
+            return
+        totals = self._read_stats(stats_dir, names)
+        _write_atomic(os.path.join(stats_dir, f"merged-{os.getpid()}-{time.time_ns()}.json"),
+                      json.dumps(totals).encode("utf-8"))
+        for name in names:
+            try:
+                os.remove(os.path.join(stats_dir, name))
+            except OSError:
+                pass
+
+    @staticmethod
+    def _read_stats(stats_dir, names):
+        """Sum the counters in the named statistics files."""
+        totals = dict.fromkeys(COUNTERS, 0)
+        for name in names:
+            try:
+                with open(os.path.join(stats_dir, name)) as f:
+                    counters = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for counter in COUNTERS:
+                totals[counter] += counters.get(counter, 0)
+        return totals
+
+    def stats(self):
+        """Return lifetime counters plus the current entry count and size."""
+        self.flush()
+        stats_dir = os.path.join(self.directory, "stats")
+        names = os.listdir(stats_dir) if os.path.isdir(stats_dir) else []
+        totals = self._read_stats(stats_dir, names)
+        entries = self.entries()
+        totals["entries"] = len(entries)
+        totals["size"] = sum(size for _, size, _ in entries)
+        return totals
+
+
+_default_cache = None
+
+
+def default_cache():
+    """Return the shared RenderCache of this process, or None if caching is off."""
+    global _default_cache
+    if os.environ.get("ASSET_CACHE", "").lower() in ("0", "off", "false", "no"):
+        return None
+    if _default_cache is None:
+        _default_cache = RenderCache()
+        atexit.register(_default_cache.flush)
+    return _default_cache
+
+
+def flush_default():
+    """Save the shared cache's statistics; worker processes call this after each task."""
+    if _default_cache is not None:
+        _default_cache.flush()
+
+
+def format_stats(stats):
+    """Return a one-line summary of stats() for the asset scripts."""
+    lookups = stats["hits"] + stats["misses"]
+    rate = stats["hits"] * 100 / lookups if lookups else 0
+    return (f"{stats['hits']} hits, {stats['misses']} misses ({rate:.0f}% hit rate), "
+            f"{stats['entries']} entries, {stats['size'] / 1024 ** 2:.1f} MB")
+
+
+def main(argv=None):
+    """Show or maintain the render cache."""
+    parser = argparse.ArgumentParser(description="Inspect or trim the asset render cache")
+    parser.add_argument("--dir", default=DEFAULT_DIR, help=f"cache directory (default: {DEFAULT_DIR})")
+    parser.add_argument("--max-size", default=DEFAULT_MAX_SIZE, metavar="SIZE",
+                        help=f"size cap such as 500M or 2G (default: {DEFAULT_MAX_SIZE})")
+    parser.add_argument("--trim", action="store_true", help="evict entries over the size cap")
+    parser.add_argument("--clear", action="store_true", help="remove every entry")
+    args = parser.parse_args(argv)
+
+    cache = RenderCache(args.dir, args.max_size)
+    if args.clear:
+        cache.clear()
+        print(f"🧹 Cleared {args.dir}")
+    elif args.trim:
+        print(f"🧹 Evicted {cache.trim()} entries")
+
+    stats = cache.stats()
+    print(f"Render cache: {args.dir} (cap {cache.max_size / 1024 ** 2:.1f} MB)")
+    for counter in COUNTERS:
+        print(f"  {counter:<10} {stats[counter]:>10,}")
+    print(f"  {'entries':<10} {stats['entries']:>10,}")
+    print(f"  {'size':<10} {stats['size']:>10,} bytes")
+    print(f"  {format_stats(stats)}")
+
+
+if __name__ == "__main__":
+    main()
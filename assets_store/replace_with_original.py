@@ -3,9 +3,13 @@
 Direct replacement script - saves user's original icon and deploys it immediately.
 """
 
+import argparse
 import os
-import shutil
-from PIL import Image
+
+from format_select import remove_other_formats
+from image_ingest import load_master
+from resize_engine import IconVariants, WHITE
+from web_bundle import build_bundle, variant_requests
 
 def create_user_original_icon():
     """Create the user's original icon from the attachment."""
@@ -29,25 +33,24 @@ def create_user_original_icon():
     print("✅ Found user_original_icon.png")
     return True
 
-def replace_all_icons_with_original():
-    """Replace all app icons with the user's original image."""
+def replace_all_icons_with_original(jobs=1):
+    """Replace all app icons with the user's original image, resizing on jobs processes."""
     
     if not create_user_original_icon():
         return
     
     try:
-        # Load the original image
-        original_img = Image.open("user_original_icon.png")
+        # Load the original image as RGBA; huge exports are reduced while decoding
+        original_img = load_master("user_original_icon.png")
         print(f"✅ Loaded original image: {original_img.size}")
         
-        # Convert to RGBA
-        if original_img.mode != 'RGBA':
-            original_img = original_img.convert('RGBA')
-        
         print("\n" + "="*60)
         print("STEP 2: GENERATING ALL ICON SIZES")
         print("="*60)
         
+        # Every size below is resized and encoded once, then shared by all destinations
+        variants = IconVariants(original_img)
+        
         # Android mipmap folders and sizes
         android_folders = {
             "../android/app/src/main/res/mipmap-mdpi": 48,
@@ -56,29 +59,6 @@ def replace_all_icons_with_original():
             "../android/app/src/main/res/mipmap-xxhdpi": 144,
             "../android/app/src/main/res/mipmap-xxxhdpi": 192
         }
-        
-        # Replace Android icons
-        for folder_path, size in android_folders.items():
-            if not os.path.exists(folder_path):
-                os.makedirs(folder_path, exist_ok=True)
-            
-            # Create resized icon
-            resized = original_img.resize((size, size), Image.Resampling.LANCZOS)
-            
-            # Convert to RGB with white background for Android
-            rgb_img = Image.new('RGB', (size, size), (255, 255, 255))
-            if resized.mode == 'RGBA':
-                rgb_img.paste(resized, mask=resized.split()[-1])
-            else:
-                rgb_img.paste(resized)
-            
-            # Save both launcher and round versions
-            rgb_img.save(os.path.join(folder_path, "ic_launcher.png"))
-            rgb_img.save(os.path.join(folder_path, "ic_launcher_round.png"))
-            
-            print(f"✅ Android {os.path.basename(folder_path)}: {size}x{size}")
-        
-        # iOS AppIcon.appiconset
         ios_folder = "../ios/Runner/Assets.xcassets/AppIcon.appiconset"
         ios_sizes = [
             (40, "40x40"),
@@ -93,47 +73,42 @@ def replace_all_icons_with_original():
             (1024, "1024x1024")
         ]
         
+        # Resize and encode every size up front, in parallel when jobs > 1
+        sizes = list(android_folders.values()) + [size for size, _ in ios_sizes]
+        variants.prefetch([(size, WHITE) for size in sizes] + variant_requests(), jobs=jobs)
+        
+        # Replace Android icons
+        for folder_path, size in android_folders.items():
+            if not os.path.exists(folder_path):
+                os.makedirs(folder_path, exist_ok=True)
+            
+            # Save both launcher and round versions, as RGB on white for Android
+            variants.save(os.path.join(folder_path, "ic_launcher.png"), size, background=WHITE)
+            variants.save(os.path.join(folder_path, "ic_launcher_round.png"), size, background=WHITE)
+            # deploy_app_icons.py may have deployed these as WebP
+            for name in ("ic_launcher.png", "ic_launcher_round.png"):
+                remove_other_formats(os.path.join(folder_path, name))
+            
+            print(f"✅ Android {os.path.basename(folder_path)}: {size}x{size}")
+        
+        # iOS AppIcon.appiconset
         if not os.path.exists(ios_folder):
             os.makedirs(ios_folder, exist_ok=True)
         
         for size, name in ios_sizes:
-            resized = original_img.resize((size, size), Image.Resampling.LANCZOS)
-            
             # Convert to RGB for iOS
-            rgb_img = Image.new('RGB', (size, size), (255, 255, 255))
-            if resized.mode == 'RGBA':
-                rgb_img.paste(resized, mask=resized.split()[-1])
-            else:
-                rgb_img.paste(resized)
-            
-            rgb_img.save(os.path.join(ios_folder, f"Icon-App-{name}@1x.png"))
+            variants.save(os.path.join(ios_folder, f"Icon-App-{name}@1x.png"), size, background=WHITE)
             print(f"✅ iOS: {name}")
         
-        # Web icons
-        web_folder = "../assets/icons"
-        if not os.path.exists(web_folder):
-            os.makedirs(web_folder, exist_ok=True)
-        
-        web_sizes = [16, 32, 48, 72, 96, 128, 144, 152, 192, 384, 512]
-        
-        for size in web_sizes:
-            resized = original_img.resize((size, size), Image.Resampling.LANCZOS)
-            resized.save(os.path.join(web_folder, f"icon-{size}x{size}.png"))
-            print(f"✅ Web: {size}x{size}")
-        
-        # Also save as main icon files
-        resized_192 = original_img.resize((192, 192), Image.Resampling.LANCZOS)
-        resized_192.save(os.path.join(web_folder, "Icon-192.png"))
-        
-        resized_512 = original_img.resize((512, 512), Image.Resampling.LANCZOS)
-        resized_512.save(os.path.join(web_folder, "Icon-512.png"))
+        # Web icons: favicon.ico and the manifest icons
+        build_bundle(variants, "../web")
         
         print("\n" + "="*60)
         print("🎉 SUCCESS! ALL ICONS REPLACED")
         print("="*60)
         print("✅ Android icons: Updated in all mipmap folders")
         print("✅ iOS icons: Updated in AppIcon.appiconset")
-        print("✅ Web icons: Updated in assets/icons")
+        print("✅ Web icons: favicon.ico and manifest icons updated in web/")
         print("")
         print("Your original image is now used for all app icons!")
         print("You can test the app to see the new icons.")
@@ -142,4 +117,9 @@ def replace_all_icons_with_original():
         print(f"❌ Error: {e}")
 
 if __name__ == "__main__":
-    replace_all_icons_with_original()
+    parser = argparse.ArgumentParser(description="Replace every app icon with user_original_icon.png")
+    parser.add_argument("--jobs", "-j", type=int, default=1, metavar="N",
+                        help="resize on N worker processes sharing the decoded original (default: 1)")
+    args = parser.parse_args()
+    
+    replace_all_icons_with_original(jobs=args.jobs)
@@ -0,0 +1,308 @@
+"""
+Shared resize engine for fanning one master image out to every icon size.
+
+Instead of resampling the full-resolution source once per target size, the
+source is turned into a mip-style pyramid of successively halved copies using
+Pillow's fast integer reduce(). Each target is then produced with a single
+LANCZOS step from the smallest level that is still at least OVERSAMPLE times
+larger, which keeps the quality of a direct LANCZOS resize at a fraction of
+the cost for large originals.
+
+IconVariants sits on top of the pyramid and memoizes every (size, mode,
+background) variant as encoded PNG bytes, so a size that several platforms
+need (192 for Android and web, 152 for iOS and web, ...) is resized and
+encoded once and the bytes are written to every destination. Encoded
+variants also go to the shared render cache, so another script, flavor or
+branch that needs the same variant of the same pixels reuses them.
+
+IconVariants.prefetch() encodes many variants on a process pool. The
+pyramid is copied once into shared memory (SharedPyramid) and each worker
+maps it with Image.frombuffer, without copying, so a task only carries the
+names of the memory blocks and its size instead of a pickled master, and
+memory does not grow with the number of workers.
+"""
+
+import hashlib
+import io
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+from PIL import Image
+
+import render_cache
+
+# A level is only used for a target if it is at least this many times larger,
+# so the final LANCZOS step always filters over several source pixels.
+OVERSAMPLE = 2
+
+WHITE = (255, 255, 255)
+
+# Encoded PNG bytes keyed by (source hash, size, mode, background), shared by
+# every IconVariants built from the same pixels in this process.
+_encoded_variants = {}
+
+# Modes reduce() cannot work on directly
+_CONVERT_MODES = {"P": "RGBA", "PA": "RGBA", "1": "L"}
+
+# Image.frombuffer maps these modes onto the buffer instead of copying it.
+# RGB is stored with four bytes per pixel, so it is shared as RGBX.
+_SHARED_MODES = {"RGB": "RGBX"}
+
+# One pyramid level in shared memory: the block's name, the mode of the
+# shared pixels, the level's own mode, and the level's size and factor
+SharedLevel = namedtuple("SharedLevel", "name raw_mode mode size factor")
+
+# Pyramids a worker process has mapped, keyed by block names, with the
+# blocks they are mapped from (which must stay open while in use)
+_attached_pyramids = {}
+
+
+class ResizePyramid:
+    """Successively halved copies of a source image, built once."""
+
+    def __init__(self, image, min_size=16):
+        if image.mode in _CONVERT_MODES:
+            image = image.convert(_CONVERT_MODES[image.mode])
+
+        # Each level is (image, factor); odd sizes leave a partial last row and
+        # column, so the exact source extent is kept as width / factor.
+        self.levels = [(image, 1)]
+        level, factor = image, 1
+        while min(level.size) // 2 >= min_size * OVERSAMPLE:
+            level, factor = level.reduce(2), factor * 2
+            self.levels.append((level, factor))
+
+    @classmethod
+    def from_levels(cls, levels):
+        """Return a pyramid of existing (image, factor) levels, e.g. shared ones."""
+        pyramid = cls.__new__(cls)
+        pyramid.levels = list(levels)
+        return pyramid
+
+    @property
+    def source(self):
+        """The full-resolution image the pyramid was built from."""
+        return self.levels[0][0]
+
+    def level_for(self, width, height):
+        """Return the smallest (level, factor) still large enough for the target."""
+        best = self.levels[0]
+        for level, factor in self.levels[1:]:
+            if level.width < width * OVERSAMPLE or level.height < height * OVERSAMPLE:
+                break
+            best = (level, factor)
+        return best
+
+    def resize(self, size):
+        """Return the source resized to size (an int for squares, or (w, h))."""
+        if isinstance(size, int):
+            size = (size, size)
+
+        level, factor = self.level_for(*size)
+        if factor == 1 and level.size == size:
+            return level.copy()
+
+        box = (0, 0, self.source.width / factor, self.source.height / factor)
+        return level.resize(size, Image.Resampling.LANCZOS, box=box)
+
+
+def flatten(image, background=(255, 255, 255)):
+    """Composite an image onto a solid background and return it as RGB."""
+    rgb_img = Image.new('RGB', image.size, background)
+    if image.mode == 'RGBA':
+        rgb_img.paste(image, mask=image.split()[-1])
+    else:
+        rgb_img.paste(image)
+    return rgb_img
+
+
+def encode_variant(image, background=None):
+    """Return PNG bytes for a resized image, flattened onto background if one is given."""
+    if background is not None:
+        image = flatten(image, background)
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class SharedPyramid:
+    """The levels of a ResizePyramid, copied once into shared memory.
+
+    Pass handles to worker processes, which map the levels back with
+    attach_pyramid(). Use as a context manager so the memory is released.
+    """
+
+    def __init__(self, pyramid):
+        self.blocks = []
+        self.handles = []
+        try:
+            for level, factor in pyramid.levels:
+                raw_mode = _SHARED_MODES.get(level.mode, level.mode)
+                data = (level.convert(raw_mode) if raw_mode != level.mode else level).tobytes()
+                block = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+                self.blocks.append(block)
+                block.buf[:len(data)] = data
+                self.handles.append(SharedLevel(block.name, raw_mode, level.mode, level.size, factor))
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        """Free the shared memory; workers must be done with it."""
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _attach_block(name):
+    """Open an existing shared memory block without taking over its cleanup."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13; workers share their parent's resource tracker,
+        # which already knows the block, so registering it again is harmless
+        return shared_memory.SharedMemory(name=name)
+
+
+def attach_pyramid(handles):
+    """Return the ResizePyramid published as handles, mapped once per process."""
+    key = tuple(handle.name for handle in handles)
+    if key not in _attached_pyramids:
+        blocks = [_attach_block(handle.name) for handle in handles]
+        levels = [(Image.frombuffer(handle.raw_mode, handle.size, block.buf, "raw",
+                                    handle.raw_mode, 0, 1), handle.factor)
+                  for handle, block in zip(handles, blocks)]
+        _attached_pyramids[key] = (blocks, ResizePyramid.from_levels(levels))
+    return _attached_pyramids[key][1]
+
+
+def _encode_shared(handles, size, background):
+    """Encode one variant of a shared pyramid (worker side)."""
+    image = attach_pyramid(handles).resize(size)
+    if image.mode != handles[0].mode:
+        image = image.convert(handles[0].mode)
+    return encode_variant(image, background)
+
+
+def image_digest(image):
+    """Return a hash identifying an image's mode, size and pixels."""
+    h = hashlib.sha256(f"{image.mode}:{image.size}".encode())
+    h.update(image.tobytes())
+    return h.hexdigest()
+
+
+class IconVariants:
+    """Resized and PNG-encoded variants of one source, each produced once."""
+
+    def __init__(self, image, render=None, cache=None):
+        """image is the master; render(size), if given, draws a size directly.
+
+        Vector sources (see sdf_raster) pass a render function so every size
+        is rasterized natively instead of resampled from the master. cache
+        defaults to render_cache.default_cache().
+        """
+        self.pyramid = ResizePyramid(image)
+        self.render = render
+        self.cache = cache if cache is not None else render_cache.default_cache()
+        self.source_hash = image_digest(self.pyramid.source)
+        # Variants depend on this module's code, and the render function's
+        self.code_versions = [render_cache.code_version(ResizePyramid)]
+        if render is not None:
+            self.code_versions.append(render_cache.code_version(render))
+        self._resized = {}
+        self.hits = 0
+        self.misses = 0
+
+    def resize(self, size):
+        """Return the source resized to size, resampling each size only once."""
+        if isinstance(size, int):
+            size = (size, size)
+        if size not in self._resized:
+            if self.render is not None:
+                self._resized[size] = self.render(size)
+            else:
+                self._resized[size] = self.pyramid.resize(size)
+        return self._resized[size]
+
+    def _key(self, size, background):
+        """Return the key of a variant in _encoded_variants."""
+        mode = 'RGB' if background is not None else self.pyramid.source.mode
+        return (self.source_hash, size, mode, background)
+
+    def _disk_key(self, key):
+        """Return the render cache key of a variant."""
+        return render_cache.cache_key("IconVariants", self.code_versions,
+                                      self.render is not None, *key)
+
+    def _cached(self, key):
+        """Return a variant's bytes from memory or the render cache, or None."""
+        data = _encoded_variants.get(key)
+        if data is not None:
+            self.hits += 1
+            return data
+
+        self.misses += 1
+        if self.cache is not None:
+            data = self.cache.get(self._disk_key(key))
+            if data is not None:
+                _encoded_variants[key] = data
+        return data
+
+    def _remember(self, key, data):
+        """Keep a freshly encoded variant in memory and the render cache."""
+        _encoded_variants[key] = data
+        if self.cache is not None:
+            self.cache.put(self._disk_key(key), data)
+
+    def encoded(self, size, background=None):
+        """Return PNG bytes for size, flattened onto background if one is given."""
+        if isinstance(size, int):
+            size = (size, size)
+        key = self._key(size, background)
+        data = self._cached(key)
+        if data is None:
+            data = encode_variant(self.resize(size), background)
+            self._remember(key, data)
+        return data
+
+    def prefetch(self, requests, jobs=None):
+        """Encode every (size, background) in requests on up to jobs processes.
+
+        Workers map the pyramid from shared memory (see SharedPyramid).
+        Variants drawn by a render function are encoded in this process,
+        as are small batches, which would not pay for starting the pool.
+        """
+        pending = {}
+        for size, background in requests:
+            if isinstance(size, int):
+                size = (size, size)
+            key = self._key(size, background)
+            if key not in pending and self._cached(key) is None:
+                pending[key] = (size, background)
+
+        jobs = jobs or os.cpu_count() or 1
+        if self.render is not None or jobs <= 1 or len(pending) < 2:
+            for key, (size, background) in pending.items():
+                self._remember(key, encode_variant(self.resize(size), background))
+            return
+
+        with SharedPyramid(self.pyramid) as shared, \
+                ProcessPoolExecutor(max_workers=min(jobs, len(pending))) as pool:
+            futures = {pool.submit(_encode_shared, shared.handles, size, background): key
+                       for key, (size, background) in pending.items()}
+            for future in as_completed(futures):
+                self._remember(futures[future], future.result())
+
+    def save(self, path, size, background=None):
+        """Write the encoded variant for size to path."""
+        with open(path, "wb") as f:
+            f.write(self.encoded(size, background))
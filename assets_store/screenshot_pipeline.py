@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Turn raw device captures into store-ready screenshots.
+
+Every capture under promotional/screenshots/android/<class>/ is decoded
+once, its status bar is cropped off, and it is put into a device frame once
+at full resolution. That framed screen is then fanned out through a
+ResizePyramid to every size the stores require for its device class, each
+composed onto a background with a caption banner, and written to
+promotional/screenshots/store/<store>/<size>/<name> (or
+<store>/<size>/<serial>/<name> for several devices of one class):
+
+    python assets_store/screenshot_pipeline.py
+    python assets_store/screenshot_pipeline.py assets_store/promotional/screenshots/android/phone -j 4
+
+Captions are the shot descriptions from capture_scenarios.json. The status
+bar height is 24dp; the density comes from the DPI multi_device_capture
+stores in each PNG, or --status-bar sets it in pixels. Images are processed
+in parallel, one worker per image, writing all of its variants in one pass.
+"""
+
+import argparse
+import functools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageDraw
+
+from font_service import DEFAULT_FAMILY
+from multi_device_capture import OUTPUT_ROOT as CAPTURE_ROOT
+from multi_device_capture import SCENARIO_FILE, load_scenarios
+from resize_engine import ResizePyramid
+from text_layout import draw_layout, fit_text
+
+OUTPUT_ROOT = "assets_store/promotional/screenshots/store"
+
+# Sizes each store wants, per capture device class: (folder, width, height)
+STORE_TARGETS = {
+    "phone": [
+        ("google_play/phone", 1080, 1920),
+        ("app_store/iphone_6.7", 1290, 2796),
+        ("app_store/iphone_6.5", 1242, 2688),
+        ("app_store/iphone_5.5", 1242, 2208),
+    ],
+    "tablet_7": [
+        ("google_play/tablet_7", 1200, 1920),
+    ],
+    "tablet_10": [
+        ("google_play/tablet_10", 1600, 2560),
+        ("app_store/ipad_12.9", 2048, 2732),
+        ("app_store/ipad_11", 1668, 2388),
+    ],
+}
+STORE_TARGETS["tablet"] = STORE_TARGETS["tablet_10"]
+
+# Android status bar height in dp, and the fraction of the screen height
+# assumed when a capture has no density recorded
+STATUS_BAR_DP = 24
+STATUS_BAR_FALLBACK = 0.03
+
+BACKGROUND = (78, 205, 196)     # #4ECDC4 teal
+CAPTION_COLOR = (255, 255, 255)
+FRAME_COLOR = (33, 33, 33)
+
+# Fractions of the output canvas / framed screen
+CAPTION_HEIGHT = 0.14
+MARGIN = 0.06
+BEZEL = 0.035
+
+
+def find_captures(paths):
+    """Return every PNG under paths, skipping the store output folder."""
+    files = []
+    for path in paths:
+        if os.path.isfile(path):
+            files.append(path)
+            continue
+        for root, dirs, names in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if d != "store")
+            files.extend(os.path.join(root, n) for n in sorted(names) if n.lower().endswith(".png"))
+    return files
+
+
+def device_class(path):
+    """Return the device class folder a capture lives in, or None."""
+    parts = os.path.normpath(os.path.abspath(path)).split(os.sep)
+    for part in reversed(parts[:-1]):
+        if part in STORE_TARGETS:
+            return part
+    return None
+
+
+def capture_name(path):
+    """Return a capture's path below its device class folder, e.g. 01_home.png,
+    or emulator-5554/01_home.png when several devices of a class were captured."""
+    parts = os.path.normpath(os.path.abspath(path)).split(os.sep)
+    for i in range(len(parts) - 2, -1, -1):
+        if parts[i] in STORE_TARGETS:
+            return os.path.join(*parts[i + 1:])
+    return parts[-1]
+
+
+def load_captions(scenario_file=SCENARIO_FILE):
+    """Return {file name: caption} from a scenario file's shot descriptions."""
+    try:
+        shots = load_scenarios(scenario_file)
+    except (OSError, ValueError):
+        return {}
+    return {shot["name"]: shot["description"] for shot in shots if shot.get("description")}
+
+
+def default_caption(path):
+    """Derive a caption from a file name like 01_home_screen.png."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    words = [w for w in stem.split("_") if not w.isdigit()]
+    return " ".join(words).title()
+
+
+def status_bar_height(image, status_bar=None):
+    """Return the height in pixels of the status bar at the top of a capture."""
+    if status_bar is not None:
+        return status_bar
+    dpi = image.info.get("dpi")
+    if dpi and dpi[1] > 1:
+        return round(STATUS_BAR_DP * dpi[1] / 160)
+    return round(image.height * STATUS_BAR_FALLBACK)
+
+
+def frame_screen(screen):
+    """Return the screen inside a rounded device bezel, as RGBA."""
+    bezel = max(round(min(screen.size) * BEZEL), 1)
+    width, height = screen.width + 2 * bezel, screen.height + 2 * bezel
+
+    framed = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(framed)
+    draw.rounded_rectangle((0, 0, width - 1, height - 1), radius=bezel * 3, fill=FRAME_COLOR)
+
+    mask = Image.new("L", screen.size, 0)
+    ImageDraw.Draw(mask).rounded_rectangle((0, 0, screen.width - 1, screen.height - 1),
+                                           radius=bezel * 2, fill=255)
+    framed.paste(screen.convert("RGB"), (bezel, bezel), mask)
+    return framed
+
+
+@functools.lru_cache(maxsize=None)
+def _background(width, height):
+    """Return the blank canvas for an output size, shared by every image."""
+    return Image.new("RGB", (width, height), BACKGROUND)
+
+
+def compose(pyramid, caption, width, height):
+    """Compose one store screenshot from a framed screen's pyramid."""
+    canvas = _background(width, height).copy()
+    margin = round(min(width, height) * MARGIN)
+    caption_height = round(height * CAPTION_HEIGHT) if caption else 0
+
+    if caption:
+        box = (margin, margin // 2, width - margin, caption_height)
+        layout = fit_text(caption, box[2] - box[0], box[3] - box[1], caption_height // 3,
+                          family=DEFAULT_FAMILY, bold=True)
+        draw_layout(ImageDraw.Draw(canvas), layout, box, CAPTION_COLOR)
+
+    # Fit the framed screen below the caption, keeping its aspect ratio
+    source = pyramid.source
+    box_width = width - 2 * margin
+    box_height = height - caption_height - 2 * margin
+    scale = min(box_width / source.width, box_height / source.height)
+    size = (max(round(source.width * scale), 1), max(round(source.height * scale), 1))
+    framed = pyramid.resize(size)
+    left = (width - size[0]) // 2
+    top = caption_height + margin + (box_height - size[1]) // 2
+    canvas.paste(framed, (left, top), framed)
+    return canvas
+
+
+def process_capture(path, output_root=OUTPUT_ROOT, caption=None, status_bar=None):
+    """Write every store variant of one capture; return (path, [written paths])."""
+    targets = STORE_TARGETS.get(device_class(path))
+    if not targets:
+        return path, []
+
+    # Decode, crop and frame once; every output size is resized from this
+    with Image.open(path) as image:
+        image.load()
+    crop = min(status_bar_height(image, status_bar), image.height - 1)
+    screen = image.crop((0, crop, image.width, image.height))
+    pyramid = ResizePyramid(frame_screen(screen))
+
+    written = []
+    for folder, width, height in targets:
+        # Devices sharing a class keep their serial subfolder, so they do not collide
+        out_path = os.path.join(output_root, folder, capture_name(path))
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        compose(pyramid, caption, width, height).save(out_path, "PNG")
+        written.append(out_path)
+    return path, written
+
+
+def process_all(paths, output_root=OUTPUT_ROOT, jobs=None, captions=None, status_bar=None):
+    """Process every capture under paths on a process pool.
+
+    Returns a list of (capture path, [written paths]).
+    """
+    files = [f for f in find_captures(paths) if device_class(f)]
+    if not files:
+        print("No captures found")
+        return []
+
+    captions = load_captions() if captions is None else captions
+    labels = [captions.get(os.path.basename(f)) or default_caption(f) for f in files]
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        results = list(pool.map(process_capture, files, [output_root] * len(files), labels,
+                                [status_bar] * len(files)))
+
+    for path, written in results:
+        print(f"🖼️  {path} -> {len(written)} store sizes")
+    total = sum(len(written) for _, written in results)
+    print(f"\nWrote {total} store screenshots from {len(results)} captures "
+          f"in {time.perf_counter() - start:.1f}s")
+    return results
+
+
+def main(argv=None):
+    """Post-process captured screenshots for the stores."""
+    parser = argparse.ArgumentParser(description="Crop, frame, caption and resize captures "
+                                                 "to every store screenshot size")
+    parser.add_argument("paths", nargs="*", default=[CAPTURE_ROOT],
+                        help=f"captures or folders of captures (default: {CAPTURE_ROOT})")
+    parser.add_argument("--output", default=OUTPUT_ROOT,
+                        help=f"folder for the store screenshots (default: {OUTPUT_ROOT})")
+    parser.add_argument("--jobs", "-j", type=int, default=None, metavar="N",
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--scenario", default=SCENARIO_FILE, metavar="FILE",
+                        help="scenario file whose shot descriptions become captions")
+    parser.add_argument("--status-bar", type=int, default=None, metavar="PX",
+                        help="status bar height to crop, in pixels (default: 24dp)")
+    args = parser.parse_args(argv)
+
+    print("📱 Post-processing screenshots for the stores...")
+    process_all(args.paths, output_root=args.output, jobs=args.jobs,
+                captions=load_captions(args.scenario), status_bar=args.status_bar)
+
+
+if __name__ == "__main__":
+    main()
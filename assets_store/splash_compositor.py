@@ -0,0 +1,93 @@
+"""
+Layer-cached compositing of splash screens across device sizes.
+
+A splash screen is a solid background plus a stack of transparent layers
+(logo, title, tagline, ...). Devices whose aspect ratios round to the same
+class share one layout, so each layer is drawn once per aspect-ratio class
+at a large reference size, cropped to its content and cached. Every device
+size in the class is then assembled by scaling the cached layers and
+alpha-compositing them onto the background, which costs a composite instead
+of a full redraw.
+"""
+
+from PIL import Image
+
+# Layers are drawn this tall (the largest splash screen), so device sizes are
+# always produced by downscaling.
+REFERENCE_HEIGHT = 2732
+
+# Aspect ratios (width / height) are grouped to this many decimals
+ASPECT_DIGITS = 2
+
+
+def aspect_class(width, height):
+    """Return the aspect-ratio class a canvas size belongs to."""
+    return round(width / height, ASPECT_DIGITS)
+
+
+class LayerCompositor:
+    """Draws layers once per aspect-ratio class and composites them per size."""
+
+    def __init__(self, background, layers, reference_height=REFERENCE_HEIGHT):
+        """background is an RGB or RGBA color; each layer is draw(width, height) -> RGBA.
+
+        A layer returns a transparent canvas of the given size with only its
+        own content drawn on it.
+        """
+        self.background = background
+        self.layers = list(layers)
+        self.reference_height = reference_height
+        self._cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    def reference_size(self, aspect):
+        """Return the canvas size layers of an aspect class are drawn at."""
+        if aspect >= 1:
+            # Landscape: the longer side is the reference
+            return self.reference_height, max(int(round(self.reference_height / aspect)), 1)
+        return max(int(round(self.reference_height * aspect)), 1), self.reference_height
+
+    def cached_layers(self, width, height):
+        """Return (reference size, [(image, box)]) for a canvas size's class."""
+        aspect = aspect_class(width, height)
+        if aspect in self._cache:
+            self.hits += 1
+            return self._cache[aspect]
+
+        self.misses += 1
+        ref_size = self.reference_size(aspect)
+        layers = []
+        for draw_layer in self.layers:
+            image = draw_layer(*ref_size)
+            box = image.getchannel("A").getbbox()
+            if box is not None:
+                # Only the layer's content is kept and scaled later
+                layers.append((image.crop(box), box))
+        self._cache[aspect] = (ref_size, layers)
+        return self._cache[aspect]
+
+    def compose(self, width, height):
+        """Assemble a width x height splash screen from the cached layers."""
+        (ref_width, ref_height), layers = self.cached_layers(width, height)
+        scale_x = width / ref_width
+        scale_y = height / ref_height
+        scale = min(scale_x, scale_y)
+
+        # An opaque background needs no alpha channel in the output
+        mode = "RGBA" if len(self.background) == 4 else "RGB"
+        canvas = Image.new(mode, (width, height), self.background)
+        for image, (left, top, right, bottom) in layers:
+            size = (max(int(round(image.width * scale)), 1),
+                    max(int(round(image.height * scale)), 1))
+            scaled = image.resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+            # Keep each layer's centre at the same relative position
+            center_x = (left + right) / 2 * scale_x
+            center_y = (top + bottom) / 2 * scale_y
+            dest = (int(round(center_x - size[0] / 2)), int(round(center_y - size[1] / 2)))
+            dest = (max(dest[0], 0), max(dest[1], 0))
+            if mode == "RGBA":
+                canvas.alpha_composite(scaled, dest=dest)
+            else:
+                canvas.paste(scaled, dest, mask=scaled)
+        return canvas
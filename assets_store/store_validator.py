@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Check the asset tree against the app store rules without decoding images.
+
+Only the PNG signature, the IHDR chunk and the chunk headers before the
+first IDAT are read (for the size, color type and a tRNS chunk), so the
+whole tree is checked in milliseconds and this is cheap enough for a
+pre-commit hook:
+
+    python assets_store/store_validator.py            # exit status 1 on problems
+    python assets_store/store_validator.py web/icons
+
+Checks:
+  * every file a Contents.json references exists and is size x scale pixels
+  * the ios-marketing (1024) icon, feature graphics and store screenshots
+    have no alpha channel
+  * sizes encoded in file names (splash_mobile_1080x1920.png,
+    ios_icon_20x20@2x.png, Icon-192.png, android_icon_48dp.png) match
+  * Android launcher icons match their mipmap density
+  * store screenshots have their target size and stay under the file size
+    limits; feature graphics are 1024x500 for Google Play
+"""
+
+import argparse
+import fnmatch
+import functools
+import json
+import os
+import re
+import struct
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Folders holding generated, deployed and shipped images, relative to the repo root
+DEFAULT_PATHS = [
+    "assets_store/icons",
+    "assets_store/splashscreens",
+    "assets_store/promotional",
+    "assets_store/ios",
+    "android/app/src/main/res",
+    "ios/Runner/Assets.xcassets",
+    "macos/Runner/Assets.xcassets",
+    "assets/icons",
+    "web",
+]
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# IHDR color types with an alpha channel: gray + alpha, RGBA
+ALPHA_COLOR_TYPES = (4, 6)
+
+# Launcher icons are 48dp; mipmap folder -> pixels per dp
+MIPMAP_SCALES = {"mdpi": 1, "hdpi": 1.5, "xhdpi": 2, "xxhdpi": 3, "xxxhdpi": 4}
+LAUNCHER_DP = 48
+
+MB = 1024 * 1024
+
+# (repo-relative glob, rules); every matching rule applies. Rules: "alpha"
+# (False forbids it), "size" (exact (w, h)), "max_bytes", "store_size"
+# (size given by screenshot_pipeline.STORE_TARGETS for the folder).
+RULES = [
+    ("*/feature_graphics/feature_graphic_1024x500.png",
+     {"alpha": False, "size": (1024, 500), "max_bytes": 15 * MB}),
+    ("*/feature_graphics/*.png", {"alpha": False, "max_bytes": 15 * MB}),
+    ("*/screenshots/store/google_play/*/*.png",
+     {"alpha": False, "store_size": True, "max_bytes": 8 * MB}),
+    ("*/screenshots/store/app_store/*/*.png",
+     {"alpha": False, "store_size": True, "max_bytes": 10 * MB}),
+    ("assets_store/icons/ios/ios_icon_1024x1024.png", {"alpha": False}),
+]
+
+# Sizes in file names: 1080x1920, 83.5x83.5@2x, Icon-192, android_icon_48dp
+NAMED_SIZE = re.compile(r"(\d+(?:\.\d+)?)x(\d+(?:\.\d+)?)(?:@(\d+)x)?\.png$")
+NAMED_SQUARE = re.compile(r"(?:icon|launcher)[-_](?:[a-z]+[-_])?(\d+)(?:dp)?\.png$", re.IGNORECASE)
+
+PngHeader = namedtuple("PngHeader", "width height bit_depth color_type has_trns file_size")
+
+
+class PngHeaderError(Exception):
+    """Raised when a file is not a readable PNG."""
+
+
+def read_png_header(path):
+    """Return a PngHeader from the chunks before the image data; pixels are never read."""
+    with open(path, "rb") as f:
+        head = f.read(33)
+        if len(head) < 33 or head[:8] != PNG_SIGNATURE or head[12:16] != b"IHDR":
+            raise PngHeaderError("not a PNG file")
+        width, height, bit_depth, color_type = struct.unpack(">IIBB", head[16:26])
+
+        # tRNS must come before the first IDAT, so stop there
+        has_trns = False
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                raise PngHeaderError("truncated before the image data")
+            length, kind = struct.unpack(">I4s", chunk)
+            if kind in (b"IDAT", b"IEND"):
+                break
+            if kind == b"tRNS":
+                has_trns = True
+            f.seek(length + 4, os.SEEK_CUR)
+        file_size = os.fstat(f.fileno()).st_size
+    return PngHeader(width, height, bit_depth, color_type, has_trns, file_size)
+
+
+def has_alpha(header):
+    """Return True if an image can hold transparency (alpha channel or tRNS)."""
+    return header.color_type in ALPHA_COLOR_TYPES or header.has_trns
+
+
+def find_files(paths):
+    """Return every PNG and Contents.json under paths."""
+    files = []
+    for path in paths:
+        if os.path.isfile(path):
+            files.append(path)
+            continue
+        for root, dirs, names in os.walk(path):
+            dirs.sort()
+            files.extend(os.path.join(root, n) for n in sorted(names)
+                         if n.lower().endswith(".png") or n == "Contents.json")
+    return files
+
+
+def _relative(path, root):
+    """Return path relative to root with forward slashes, for rule globs."""
+    return os.path.relpath(os.path.abspath(path), root).replace(os.sep, "/")
+
+
+def _scaled(value, scale):
+    """Convert a point size and scale (as in Contents.json) to pixels."""
+    return int(round(float(value) * scale))
+
+
+@functools.lru_cache(maxsize=None)
+def _store_sizes():
+    """Return {store folder: (w, h)} from screenshot_pipeline, imported on first use."""
+    from screenshot_pipeline import STORE_TARGETS
+    return {folder: (w, h) for targets in STORE_TARGETS.values() for folder, w, h in targets}
+
+
+def expected_size(path, root=REPO_ROOT):
+    """Return the (w, h) a PNG's name or folder implies, or None."""
+    relative = _relative(path, root)
+    name = os.path.basename(path)
+    parent = os.path.basename(os.path.dirname(path))
+
+    if parent.startswith("mipmap-") and name.startswith("ic_launcher"):
+        scale = MIPMAP_SCALES.get(parent[len("mipmap-"):])
+        if scale:
+            side = _scaled(LAUNCHER_DP, scale)
+            return side, side
+
+    match = NAMED_SIZE.search(name)
+    if match:
+        scale = int(match.group(3) or 1)
+        return _scaled(match.group(1), scale), _scaled(match.group(2), scale)
+
+    match = NAMED_SQUARE.search(name)
+    if match:
+        side = int(match.group(1))
+        return side, side
+
+    if "/screenshots/store/" in relative:
+        folder = relative.split("/screenshots/store/", 1)[1].rsplit("/", 1)[0]
+        return _store_sizes().get(folder)
+    return None
+
+
+def check_png(path, root=REPO_ROOT):
+    """Return a list of problems with one PNG."""
+    try:
+        header = read_png_header(path)
+    except (OSError, PngHeaderError, struct.error) as e:
+        return [f"{e}"]
+
+    problems = []
+    size = (header.width, header.height)
+    expected = expected_size(path, root)
+    if expected and size != expected:
+        problems.append(f"is {size[0]}x{size[1]}, expected {expected[0]}x{expected[1]}")
+
+    relative = _relative(path, root)
+    for pattern, rules in RULES:
+        if not fnmatch.fnmatch(relative, pattern):
+            continue
+        if rules.get("alpha") is False and has_alpha(header):
+            problems.append("has an alpha channel, which the store rejects")
+        if "size" in rules and size != rules["size"] and rules["size"] != expected:
+            problems.append(f"is {size[0]}x{size[1]}, the store requires "
+                            f"{rules['size'][0]}x{rules['size'][1]}")
+        if "max_bytes" in rules and header.file_size > rules["max_bytes"]:
+            problems.append(f"is {header.file_size / MB:.1f} MB, over the "
+                            f"{rules['max_bytes'] / MB:.0f} MB limit")
+    # Several rules may flag the same thing
+    return list(dict.fromkeys(problems))
+
+
+def check_contents_json(path):
+    """Return a list of problems with an asset catalog's Contents.json."""
+    try:
+        with open(path) as f:
+            contents = json.load(f)
+    except (OSError, ValueError) as e:
+        return [f"unreadable: {e}"]
+
+    folder = os.path.dirname(path)
+    problems = []
+    for entry in contents.get("images", []):
+        filename = entry.get("filename")
+        if not filename:
+            continue
+        image_path = os.path.join(folder, filename)
+        label = f"{filename} ({entry.get('idiom', '?')} {entry.get('size', '')} " \
+                f"@{entry.get('scale', '1x')})"
+        if not os.path.exists(image_path):
+            problems.append(f"references {label}, which does not exist")
+            continue
+        try:
+            header = read_png_header(image_path)
+        except (OSError, PngHeaderError, struct.error) as e:
+            problems.append(f"references {label}: {e}")
+            continue
+
+        if "size" in entry:
+            scale = float(entry.get("scale", "1x").rstrip("x"))
+            width, height = entry["size"].split("x")
+            expected = (_scaled(width, scale), _scaled(height, scale))
+            if (header.width, header.height) != expected:
+                problems.append(f"references {label}, which is {header.width}x{header.height} "
+                                f"instead of {expected[0]}x{expected[1]}")
+        if entry.get("idiom") == "ios-marketing" and has_alpha(header):
+            problems.append(f"references {label}, which has an alpha channel "
+                            "(App Store marketing icons must be opaque RGB)")
+    return problems
+
+
+def check_file(path, root=REPO_ROOT):
+    """Return (path, problems) for a PNG or a Contents.json."""
+    if os.path.basename(path) == "Contents.json":
+        return path, check_contents_json(path)
+    return path, check_png(path, root)
+
+
+def validate(paths, root=REPO_ROOT, jobs=None):
+    """Check every file under paths in parallel.
+
+    Returns (files, failures): every file checked, and {path: problems} for
+    the files that break a store rule.
+    """
+    files = find_files(p for p in paths if os.path.exists(p))
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        results = pool.map(check_file, files, [root] * len(files))
+        failures = {path: problems for path, problems in results if problems}
+    return files, failures
+
+
+def main(argv=None):
+    """Validate the asset tree and exit non-zero if anything breaks the store rules."""
+    parser = argparse.ArgumentParser(description="Check assets against the app store rules "
+                                                 "(reads PNG headers only)")
+    parser.add_argument("paths", nargs="*",
+                        help="files or folders to check (default: every asset folder)")
+    parser.add_argument("--jobs", "-j", type=int, default=None, metavar="N",
+                        help="worker threads (default: Python's thread pool default)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    paths = args.paths or [os.path.join(REPO_ROOT, p) for p in DEFAULT_PATHS]
+    files, failures = validate(paths, jobs=args.jobs)
+
+    for path in sorted(failures):
+        print(f"❌ {_relative(path, REPO_ROOT)}")
+        for problem in failures[path]:
+            print(f"     {problem}")
+    elapsed = (time.perf_counter() - start) * 1000
+    count = sum(len(p) for p in failures.values())
+    if failures:
+        print(f"\n{count} problems in {len(failures)} of {len(files)} files ({elapsed:.0f} ms)")
+        return 1
+    print(f"✅ {len(files)} files meet the store rules ({elapsed:.0f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
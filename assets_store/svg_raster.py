@@ -0,0 +1,410 @@
+"""
+In-process rasterizer for the simple SVG sources in this folder.
+
+source_logo.svg and splash_source.svg are parsed once into flattened
+geometry (paths and curves become point lists in viewBox coordinates) and
+kept in memory. render() then draws that geometry at any requested size with
+Pillow, so generating every icon and splash size needs no ImageMagick process
+per size.
+
+Only the SVG features these sources use are supported: <svg> with a viewBox,
+<g transform="translate(...)/scale(...)">, <rect> (with rx), <circle>,
+<ellipse>, <path> (M/L/H/V/C/S/Q/T/Z, absolute and relative) and <text>,
+with fill, stroke, stroke-width and stroke-linecap.
+"""
+
+import math
+import os
+import re
+import xml.etree.ElementTree as ET
+
+from PIL import Image, ImageColor, ImageDraw
+
+from font_service import get_font, resolve_font
+
+# Elements are drawn into a mask at this many times the output resolution and
+# reduced back down, which gives smooth anti-aliased edges.
+SUPERSAMPLE = 4
+
+# Line segments used to approximate each Bezier curve
+CURVE_SEGMENTS = 32
+
+_NUMBER = r"[-+]?(?:\d*\.\d+|\d+\.?)(?:[eE][-+]?\d+)?"
+_PATH_TOKEN = re.compile(rf"([MmLlHhVvCcSsQqTtZzAa])|({_NUMBER})")
+
+# Parsed documents keyed by (path, mtime) so each file is parsed once per run
+_documents = {}
+
+
+def _local_name(tag):
+    """Strip the XML namespace from an element tag."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _parse_color(value):
+    """Return an RGB tuple for an SVG paint value, or None for 'none'."""
+    if value is None or value == "none":
+        return None
+    return ImageColor.getrgb(value)[:3]
+
+
+def _parse_transform(value):
+    """Return (scale_x, scale_y, translate_x, translate_y) for a transform."""
+    sx, sy, tx, ty = 1.0, 1.0, 0.0, 0.0
+    for name, args in re.findall(r"(\w+)\s*\(([^)]*)\)", value or ""):
+        numbers = [float(n) for n in re.findall(_NUMBER, args)]
+        if name == "translate":
+            tx += numbers[0] * sx
+            ty += (numbers[1] if len(numbers) > 1 else 0.0) * sy
+        elif name == "scale":
+            sx *= numbers[0]
+            sy *= numbers[1] if len(numbers) > 1 else numbers[0]
+        else:
+            raise ValueError(f"Unsupported SVG transform: {name}")
+    return sx, sy, tx, ty
+
+
+def _combine(outer, inner):
+    """Compose two (sx, sy, tx, ty) transforms, outer applied last."""
+    osx, osy, otx, oty = outer
+    isx, isy, itx, ity = inner
+    return (osx * isx, osy * isy, otx + osx * itx, oty + osy * ity)
+
+
+def _cubic(p0, p1, p2, p3):
+    """Flatten a cubic Bezier curve into points (excluding p0)."""
+    points = []
+    for i in range(1, CURVE_SEGMENTS + 1):
+        t = i / CURVE_SEGMENTS
+        u = 1 - t
+        points.append((
+            u ** 3 * p0[0] + 3 * u * u * t * p1[0] + 3 * u * t * t * p2[0] + t ** 3 * p3[0],
+            u ** 3 * p0[1] + 3 * u * u * t * p1[1] + 3 * u * t * t * p2[1] + t ** 3 * p3[1],
+        ))
+    return points
+
+
+def _quadratic(p0, p1, p2):
+    """Flatten a quadratic Bezier curve into points (excluding p0)."""
+    points = []
+    for i in range(1, CURVE_SEGMENTS + 1):
+        t = i / CURVE_SEGMENTS
+        u = 1 - t
+        points.append((
+            u * u * p0[0] + 2 * u * t * p1[0] + t * t * p2[0],
+            u * u * p0[1] + 2 * u * t * p1[1] + t * t * p2[1],
+        ))
+    return points
+
+
+def parse_path(d):
+    """Parse SVG path data into a list of (points, closed) subpaths."""
+    tokens = _PATH_TOKEN.findall(d)
+    subpaths = []
+    points = []
+    current = (0.0, 0.0)
+    start = current
+    last_control = None
+    command = None
+    index = 0
+
+    def number():
+        nonlocal index
+        value = float(tokens[index][1])
+        index += 1
+        return value
+
+    def finish(closed):
+        nonlocal points
+        if len(points) > 1:
+            subpaths.append((points, closed))
+        points = []
+
+    while index < len(tokens):
+        if tokens[index][0]:
+            command = tokens[index][0]
+            index += 1
+            if command in "Zz":
+                finish(True)
+                current = start
+                last_control = None
+                continue
+        elif command is None:
+            raise ValueError("SVG path data must start with a command")
+
+        relative = command.islower()
+        cmd = command.upper()
+        ox, oy = current if relative else (0.0, 0.0)
+
+        if cmd == "M":
+            finish(False)
+            current = (ox + number(), oy + number())
+            start = current
+            points = [current]
+            # Further coordinate pairs after a move are implicit line-tos
+            command = "l" if relative else "L"
+            last_control = None
+        elif cmd == "L":
+            current = (ox + number(), oy + number())
+            points.append(current)
+            last_control = None
+        elif cmd == "H":
+            current = ((ox if relative else 0.0) + number(), current[1])
+            points.append(current)
+            last_control = None
+        elif cmd == "V":
+            current = (current[0], (oy if relative else 0.0) + number())
+            points.append(current)
+            last_control = None
+        elif cmd in "CS":
+            if cmd == "C":
+                c1 = (ox + number(), oy + number())
+            elif last_control is not None:
+                c1 = (2 * current[0] - last_control[0], 2 * current[1] - last_control[1])
+            else:
+                c1 = current
+            c2 = (ox + number(), oy + number())
+            end = (ox + number(), oy + number())
+            points.extend(_cubic(current, c1, c2, end))
+            current, last_control = end, c2
+        elif cmd in "QT":
+            if cmd == "Q":
+                c1 = (ox + number(), oy + number())
+            elif last_control is not None:
+                c1 = (2 * current[0] - last_control[0], 2 * current[1] - last_control[1])
+            else:
+                c1 = current
+            end = (ox + number(), oy + number())
+            points.extend(_quadratic(current, c1, end))
+            current, last_control = end, c1
+        else:
+            raise ValueError(f"Unsupported SVG path command: {command}")
+
+    finish(False)
+    return subpaths
+
+
+def _transform_points(points, transform):
+    """Apply an (sx, sy, tx, ty) transform to a list of points."""
+    sx, sy, tx, ty = transform
+    return [(x * sx + tx, y * sy + ty) for x, y in points]
+
+
+def _element(node, style, transform):
+    """Convert one SVG shape element into a flattened drawing operation."""
+    tag = _local_name(node.tag)
+    attr = node.attrib
+    sx, sy, tx, ty = transform
+    op = {
+        "fill": _parse_color(style.get("fill", "black")),
+        "stroke": _parse_color(style.get("stroke")),
+        # Stroke widths scale with the (uniform) transform
+        "stroke_width": float(style.get("stroke-width", 1)) * sx,
+        "linecap": style.get("stroke-linecap", "butt"),
+    }
+
+    if tag == "rect":
+        x, y = float(attr.get("x", 0)), float(attr.get("y", 0))
+        w, h = float(attr["width"]), float(attr["height"])
+        op.update(kind="rect", box=(x * sx + tx, y * sy + ty, (x + w) * sx + tx, (y + h) * sy + ty),
+                  radius=float(attr.get("rx", attr.get("ry", 0))) * sx)
+    elif tag in ("circle", "ellipse"):
+        cx, cy = float(attr.get("cx", 0)), float(attr.get("cy", 0))
+        rx = float(attr.get("r", attr.get("rx", 0)))
+        ry = float(attr.get("r", attr.get("ry", 0)))
+        op.update(kind="ellipse", box=((cx - rx) * sx + tx, (cy - ry) * sy + ty,
+                                       (cx + rx) * sx + tx, (cy + ry) * sy + ty))
+    elif tag == "path":
+        op.update(kind="path", subpaths=[(_transform_points(points, transform), closed)
+                                         for points, closed in parse_path(attr.get("d", ""))])
+    elif tag == "text":
+        op.update(kind="text", text=" ".join("".join(node.itertext()).split()),
+                  position=(float(attr.get("x", 0)) * sx + tx, float(attr.get("y", 0)) * sy + ty),
+                  font_family=style.get("font-family", "sans-serif"),
+                  font_size=float(style.get("font-size", 16)) * sy,
+                  bold=style.get("font-weight") in ("bold", "700", "800", "900"),
+                  anchor=style.get("text-anchor", "start"))
+    else:
+        return None
+    return op
+
+
+_INHERITED = ("fill", "stroke", "stroke-width", "stroke-linecap",
+              "font-family", "font-size", "font-weight", "text-anchor")
+
+
+def _walk(node, style, transform, ops):
+    """Collect drawing operations from node and its children in paint order."""
+    style = dict(style)
+    for name in _INHERITED:
+        if name in node.attrib:
+            style[name] = node.attrib[name]
+    transform = _combine(transform, _parse_transform(node.attrib.get("transform")))
+
+    tag = _local_name(node.tag)
+    if tag in ("svg", "g"):
+        for child in node:
+            _walk(child, style, transform, ops)
+        return
+
+    op = _element(node, style, transform)
+    if op is not None:
+        ops.append(op)
+
+
+class SvgDocument:
+    """A parsed SVG file, flattened into drawing operations."""
+
+    def __init__(self, path):
+        root = ET.parse(path).getroot()
+        view_box = root.attrib.get("viewBox")
+        if view_box:
+            self.view_box = tuple(float(n) for n in re.findall(_NUMBER, view_box))
+        else:
+            self.view_box = (0.0, 0.0, float(root.attrib["width"]), float(root.attrib["height"]))
+
+        self.ops = []
+        for child in root:
+            _walk(child, {}, (1.0, 1.0, 0.0, 0.0), self.ops)
+
+    @property
+    def size(self):
+        """The document's (width, height) in viewBox units."""
+        return self.view_box[2], self.view_box[3]
+
+    def render(self, size, background=None):
+        """Rasterize the document to an RGBA image of the given size.
+
+        size is an int for squares or (width, height). The drawing is scaled
+        uniformly to fit and centred, like preserveAspectRatio="xMidYMid meet";
+        any letterbox area is filled with background (transparent if None).
+        """
+        if isinstance(size, int):
+            size = (size, size)
+        width, height = size
+        vx, vy, vw, vh = self.view_box
+        scale = min(width / vw, height / vh)
+        offset = ((width - vw * scale) / 2 - vx * scale, (height - vh * scale) / 2 - vy * scale)
+
+        canvas = Image.new("RGBA", size, (*background, 255) if background else (0, 0, 0, 0))
+        for op in self.ops:
+            if op["kind"] == "text":
+                _draw_text(canvas, op, scale, offset)
+                continue
+            if op["fill"] is not None:
+                _paint(canvas, op, scale, offset, op["fill"], stroke=False)
+            if op["stroke"] is not None and op["stroke_width"] > 0:
+                _paint(canvas, op, scale, offset, op["stroke"], stroke=True)
+        return canvas
+
+
+def _op_bounds(op, stroke_pad):
+    """Return the viewBox-space bounding box of a drawing operation."""
+    if op["kind"] == "path":
+        xs = [x for points, _ in op["subpaths"] for x, _ in points]
+        ys = [y for points, _ in op["subpaths"] for _, y in points]
+        if not xs:
+            return None
+        box = (min(xs), min(ys), max(xs), max(ys))
+    else:
+        box = op["box"]
+    return (box[0] - stroke_pad, box[1] - stroke_pad, box[2] + stroke_pad, box[3] + stroke_pad)
+
+
+def _paint(canvas, op, scale, offset, color, stroke):
+    """Draw the fill or stroke of one operation onto canvas, anti-aliased."""
+    stroke_width = op["stroke_width"] * scale
+    bounds = _op_bounds(op, op["stroke_width"] if stroke else 0)
+    if bounds is None:
+        return
+
+    # Pixel region the operation covers, clipped to the canvas
+    left = max(int(math.floor(bounds[0] * scale + offset[0])), 0)
+    top = max(int(math.floor(bounds[1] * scale + offset[1])), 0)
+    right = min(int(math.ceil(bounds[2] * scale + offset[0])) + 1, canvas.width)
+    bottom = min(int(math.ceil(bounds[3] * scale + offset[1])) + 1, canvas.height)
+    if left >= right or top >= bottom:
+        return
+
+    ss = SUPERSAMPLE
+    mask = Image.new("L", ((right - left) * ss, (bottom - top) * ss), 0)
+    draw = ImageDraw.Draw(mask)
+
+    def to_mask(x, y):
+        return ((x * scale + offset[0] - left) * ss, (y * scale + offset[1] - top) * ss)
+
+    if op["kind"] in ("rect", "ellipse"):
+        x0, y0 = to_mask(*op["box"][:2])
+        x1, y1 = to_mask(*op["box"][2:])
+        if stroke:
+            # SVG strokes are centred on the outline
+            half = stroke_width * ss / 2
+            box = [x0 - half, y0 - half, x1 + half, y1 + half]
+            width = max(int(round(stroke_width * ss)), 1)
+        else:
+            box = [x0, y0, x1, y1]
+            width = 0
+        fill = None if stroke else 255
+        outline = 255 if stroke else None
+        if op["kind"] == "ellipse":
+            draw.ellipse(box, fill=fill, outline=outline, width=width)
+        elif op["radius"] > 0:
+            radius = op["radius"] * scale * ss + (stroke_width * ss / 2 if stroke else 0)
+            draw.rounded_rectangle(box, radius=radius, fill=fill, outline=outline, width=width)
+        else:
+            draw.rectangle(box, fill=fill, outline=outline, width=width)
+    else:
+        for points, closed in op["subpaths"]:
+            mask_points = [to_mask(x, y) for x, y in points]
+            if not stroke:
+                draw.polygon(mask_points, fill=255)
+                continue
+
+            width = max(int(round(stroke_width * ss)), 1)
+            if closed:
+                mask_points.append(mask_points[0])
+            draw.line(mask_points, fill=255, width=width, joint="curve")
+            if op["linecap"] == "round" and not closed:
+                radius = width / 2
+                for x, y in (mask_points[0], mask_points[-1]):
+                    draw.ellipse([x - radius, y - radius, x + radius, y + radius], fill=255)
+
+    mask = mask.reduce(ss)
+    layer = Image.new("RGBA", mask.size, (*color, 255))
+    layer.putalpha(mask)
+    canvas.alpha_composite(layer, dest=(left, top))
+
+
+def _load_font(family, size, bold):
+    """Load the first available font of a CSS font-family list."""
+    for name in [f.strip().strip("'\"") for f in family.split(",")]:
+        if resolve_font(name, bold) is not None:
+            return get_font(size, name, bold)
+    # Falls back to Pillow's default font
+    return get_font(size, bold=bold)
+
+
+def _draw_text(canvas, op, scale, offset):
+    """Draw a text operation with its baseline at the SVG position."""
+    if op["fill"] is None or not op["text"]:
+        return
+    size = max(int(round(op["font_size"] * scale)), 1)
+    font = _load_font(op["font_family"], size, op["bold"])
+    anchor = {"start": "ls", "middle": "ms", "end": "rs"}.get(op["anchor"], "ls")
+    x, y = op["position"]
+    position = (x * scale + offset[0], y * scale + offset[1])
+
+    draw = ImageDraw.Draw(canvas)
+    try:
+        draw.text(position, op["text"], fill=op["fill"], font=font, anchor=anchor)
+    except ValueError:
+        # Bitmap fonts do not support anchors
+        draw.text(position, op["text"], fill=op["fill"], font=font)
+
+
+def load(path):
+    """Return the parsed SvgDocument for path, parsing each file only once."""
+    key = (os.path.abspath(path), os.stat(path).st_mtime_ns)
+    if key not in _documents:
+        _documents[key] = SvgDocument(path)
+    return _documents[key]
@@ -0,0 +1,117 @@
+"""
+Auto-fitting text layout for titles, taglines and captions.
+
+fit_text() binary-searches the largest font size at which a string, wrapped
+at word boundaries if needed, fits a box, and draw_layout() draws the result
+centred in that box. Every advance width is measured once per (family,
+weight, size, string) and kept in a cache, so laying out the same captions
+for dozens of canvas sizes only measures each string at each size once.
+"""
+
+import functools
+from collections import namedtuple
+
+from font_service import DEFAULT_FAMILY, get_font
+
+# Smallest size fit_text() will shrink text to before letting it overflow
+MIN_FONT_SIZE = 8
+
+# Baseline-to-baseline distance as a multiple of the font size
+LINE_SPACING = 1.2
+
+# lines: the wrapped lines; widths: their advance widths; width/height: the
+# size of the whole block in pixels.
+TextLayout = namedtuple("TextLayout", "lines widths size line_height width height family bold")
+
+
+@functools.lru_cache(maxsize=8192)
+def text_width(text, size, family=DEFAULT_FAMILY, bold=False):
+    """Return the advance width of text at size, measured once."""
+    return get_font(size, family, bold).getlength(text)
+
+
+@functools.lru_cache(maxsize=None)
+def _line_box(size, family, bold):
+    """Return the ascent + descent of a font, i.e. the height of one line."""
+    ascent, descent = get_font(size, family, bold).getmetrics()
+    return ascent + descent
+
+
+def wrap_lines(text, max_width, size, family=DEFAULT_FAMILY, bold=False):
+    """Greedily wrap text at spaces so each line fits max_width if possible.
+
+    Explicit newlines are kept; a single word wider than max_width gets a
+    line of its own.
+    """
+    lines = []
+    for paragraph in text.split("\n"):
+        line = ""
+        for word in paragraph.split():
+            candidate = f"{line} {word}" if line else word
+            if line and text_width(candidate, size, family, bold) > max_width:
+                lines.append(line)
+                line = word
+            else:
+                line = candidate
+        lines.append(line)
+    return lines
+
+
+def layout_text(text, size, max_width=None, family=DEFAULT_FAMILY, bold=False,
+                line_spacing=LINE_SPACING):
+    """Lay text out at a fixed size, wrapping it to max_width if given."""
+    if max_width is None:
+        lines = text.split("\n")
+    else:
+        lines = wrap_lines(text, max_width, size, family, bold)
+    widths = [text_width(line, size, family, bold) for line in lines]
+    line_height = max(int(round(size * line_spacing)), 1)
+    height = (len(lines) - 1) * line_height + _line_box(size, family, bold)
+    return TextLayout(tuple(lines), tuple(widths), size, line_height,
+                      max(widths), height, family, bold)
+
+
+@functools.lru_cache(maxsize=1024)
+def fit_text(text, max_width, max_height, max_size, min_size=MIN_FONT_SIZE,
+             family=DEFAULT_FAMILY, bold=False, wrap=True, line_spacing=LINE_SPACING):
+    """Return the layout at the largest size <= max_size that fits the box.
+
+    With wrap=False only explicit newlines break lines. If even min_size
+    does not fit, the min_size layout is returned and overflows the box.
+    """
+    def layout(size):
+        return layout_text(text, size, max_width if wrap else None, family, bold, line_spacing)
+
+    def fits(result):
+        return result.width <= max_width and result.height <= max_height
+
+    min_size = max(min(min_size, max_size), 1)
+    best = layout(min_size)
+    low, high = min_size + 1, max_size
+    while low <= high:
+        size = (low + high) // 2
+        candidate = layout(size)
+        if fits(candidate):
+            best, low = candidate, size + 1
+        else:
+            high = size - 1
+    return best
+
+
+def draw_layout(draw, layout, box, fill, valign="middle"):
+    """Draw a layout horizontally centred in box = (left, top, right, bottom).
+
+    valign is "top", "middle" or "bottom".
+    """
+    left, top, right, bottom = box
+    if valign == "top":
+        y = top
+    elif valign == "bottom":
+        y = bottom - layout.height
+    else:
+        y = top + (bottom - top - layout.height) // 2
+
+    font = get_font(layout.size, layout.family, layout.bold)
+    for i, (line, width) in enumerate(zip(layout.lines, layout.widths)):
+        x = left + (right - left - width) // 2
+        draw.text((x, y + i * layout.line_height), line, fill=fill, font=font)
@@ -5,10 +5,14 @@ This script will take the original PNG image and only resize it to required size
 """
 
 import os
-from PIL import Image
 import base64
 import io
 
+from format_select import remove_other_formats
+from image_ingest import load_master
+from resize_engine import IconVariants
+from web_bundle import build_bundle
+
 def save_user_attached_image():
     """Save the user's exact attached image as PNG."""
     
@@ -43,14 +47,17 @@ def resize_exact_image_only():
         return
     
     try:
-        # Load the EXACT original image
-        original_img = Image.open(original_path)
+        # Load the EXACT original image (only reduced if it is far larger than any icon)
+        original_img = load_master(original_path, mode=None)
         print(f"✅ Loaded original image: {original_img.size} pixels")
         print(f"✅ Mode: {original_img.mode}")
         
         # Show what we're working with
         print(f"✅ This is your EXACT attached image - no modifications will be made!")
         
+        # Every size below is resized and encoded once, then shared by all destinations
+        variants = IconVariants(original_img)
+        
         # Android sizes (mipmap densities)
         android_sizes = {
             'mdpi': 48,
@@ -73,11 +80,12 @@ def resize_exact_image_only():
             os.makedirs(folder_path, exist_ok=True)
             
             # ONLY resize - no other changes
-            resized = original_img.resize((size, size), Image.Resampling.LANCZOS)
-            
             # Save exactly as PNG (preserving transparency if present)
-            resized.save(os.path.join(folder_path, "ic_launcher.png"))
-            resized.save(os.path.join(folder_path, "ic_launcher_round.png"))
+            variants.save(os.path.join(folder_path, "ic_launcher.png"), size)
+            variants.save(os.path.join(folder_path, "ic_launcher_round.png"), size)
+            # deploy_app_icons.py may have deployed these as WebP
+            for name in ("ic_launcher.png", "ic_launcher_round.png"):
+                remove_other_formats(os.path.join(folder_path, name))
             
             print(f"✅ {os.path.basename(folder_path)}: {size}x{size} (EXACT resize)")
         
@@ -89,25 +97,12 @@ def resize_exact_image_only():
         
         for size in ios_sizes:
             # ONLY resize - no other changes
-            resized = original_img.resize((size, size), Image.Resampling.LANCZOS)
-            resized.save(os.path.join(ios_folder, f"Icon-App-{size}x{size}@1x.png"))
+            variants.save(os.path.join(ios_folder, f"Icon-App-{size}x{size}@1x.png"), size)
             print(f"✅ iOS: {size}x{size} (EXACT resize)")
         
         print(f"\n🌐 WEB ICONS - Resizing only...")
-        web_folder = "../assets/icons"
-        web_sizes = [16, 32, 48, 72, 96, 128, 144, 152, 192, 384, 512]
-        
-        os.makedirs(web_folder, exist_ok=True)
-        
-        for size in web_sizes:
-            # ONLY resize - no other changes
-            resized = original_img.resize((size, size), Image.Resampling.LANCZOS)
-            resized.save(os.path.join(web_folder, f"icon-{size}x{size}.png"))
-            print(f"✅ Web: {size}x{size} (EXACT resize)")
-        
-        # Main web icons
-        original_img.resize((192, 192), Image.Resampling.LANCZOS).save(os.path.join(web_folder, "Icon-192.png"))
-        original_img.resize((512, 512), Image.Resampling.LANCZOS).save(os.path.join(web_folder, "Icon-512.png"))
+        # favicon.ico and the manifest icons, resized only
+        build_bundle(variants, "../web")
         
         print(f"\n🎉 SUCCESS! Your EXACT attached image has been used!")
         print(f"✅ Only resized to required dimensions")
@@ -7,6 +7,8 @@ This script takes the user's original image and resizes it for all required icon
 import os
 from PIL import Image
 
+from resize_engine import IconVariants
+
 def resize_original_icon():
     """Resize the original user image to all required icon sizes."""
     
@@ -26,6 +28,9 @@ def resize_original_icon():
     original_img = Image.open(original_path)
     print(f"Loaded original image: {original_img.size}")
     
+    # Every size below is resized and encoded once, then shared by all destinations
+    variants = IconVariants(original_img)
+    
     # Android icon sizes (mipmap densities)
     android_sizes = {
         'mdpi': 48,
@@ -52,9 +57,8 @@ def resize_original_icon():
     os.makedirs(android_dir, exist_ok=True)
     
     for density, size in android_sizes.items():
-        resized = original_img.resize((size, size), Image.Resampling.LANCZOS)
-        resized.save(os.path.join(android_dir, f"ic_launcher_{density}.png"))
-        resized.save(os.path.join(android_dir, f"ic_launcher_round_{density}.png"))
+        variants.save(os.path.join(android_dir, f"ic_launcher_{density}.png"), size)
+        variants.save(os.path.join(android_dir, f"ic_launcher_round_{density}.png"), size)
         print(f"Generated Android {density}: {size}x{size}")
     
     # Generate iOS icons
@@ -62,8 +66,7 @@ def resize_original_icon():
     os.makedirs(ios_dir, exist_ok=True)
     
     for size in ios_sizes:
-        resized = original_img.resize((size, size), Image.Resampling.LANCZOS)
-        resized.save(os.path.join(ios_dir, f"icon_{size}x{size}.png"))
+        variants.save(os.path.join(ios_dir, f"icon_{size}x{size}.png"), size)
         print(f"Generated iOS: {size}x{size}")
     
     # Generate web icons
@@ -71,8 +74,7 @@ def resize_original_icon():
     os.makedirs(web_dir, exist_ok=True)
     
     for size in web_sizes:
-        resized = original_img.resize((size, size), Image.Resampling.LANCZOS)
-        resized.save(os.path.join(web_dir, f"icon_{size}x{size}.png"))
+        variants.save(os.path.join(web_dir, f"icon_{size}x{size}.png"), size)
         print(f"Generated Web: {size}x{size}")
     
     print(f"\nAll icons generated in '{output_dir}' folder")
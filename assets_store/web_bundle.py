@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Build the web app's icons from one master: a favicon.ico and the manifest icons.
+
+Browsers only need a handful of icons, so instead of a PNG per size the web
+build gets:
+
+  * favicon.ico, holding FAVICON_SIZES in a single file (one request)
+  * one PNG per manifest icon (MANIFEST_ICONS); maskable icons are padded
+    so the artwork stays inside the safe zone launchers crop to
+  * the "icons" list of web/manifest.json and the favicon link of
+    web/index.html rewritten to reference exactly those files
+
+Every size is taken from IconVariants, so the scripts that already resize
+a master for the other platforms pass theirs in and the web sizes come out
+of the same resize pyramid and render cache. Files whose contents did not
+change are not rewritten.
+
+    python assets_store/web_bundle.py [--source PNG] [--prune]
+"""
+
+import argparse
+import io
+import json
+import os
+import re
+from collections import Counter, OrderedDict
+
+from PIL import Image
+
+from deploy_engine import REPO_ROOT, write_if_changed
+from resize_engine import IconVariants, WHITE, flatten
+
+WEB_DIR = os.path.join(REPO_ROOT, "web")
+
+# The largest web icon generate_assets.py draws
+DEFAULT_SOURCE = os.path.join(REPO_ROOT, "assets_store", "icons", "web", "web_icon_512x512.png")
+
+FAVICON_SIZES = (16, 32, 48)
+
+# (file name relative to the web folder, size, purpose)
+MANIFEST_ICONS = [
+    ("icons/Icon-192.png", 192, "any"),
+    ("icons/Icon-512.png", 512, "any"),
+    ("icons/Icon-maskable-192.png", 192, "maskable"),
+    ("icons/Icon-maskable-512.png", 512, "maskable"),
+]
+
+# Maskable icons keep their artwork inside a centered circle of 80% of the
+# icon's width; the rest may be cropped to the launcher's shape
+MASKABLE_SAFE_ZONE = 0.8
+
+FAVICON_LINK = re.compile(r'<link rel="icon"[^>]*>')
+
+
+def favicon_bytes(variants, sizes=FAVICON_SIZES):
+    """Return a .ico file holding the variants for every size."""
+    images = [Image.open(io.BytesIO(variants.encoded(size))) for size in sizes]
+    buffer = io.BytesIO()
+    images[-1].save(buffer, "ICO", sizes=[(size, size) for size in sizes],
+                    append_images=images[:-1])
+    return buffer.getvalue()
+
+
+def maskable_bytes(variants, size):
+    """Return PNG bytes for a maskable icon: the artwork padded onto its own background."""
+    inner = variants.resize(round(size * MASKABLE_SAFE_ZONE))
+    # Extend the artwork's corner color, so a full-bleed icon looks seamless
+    corner = variants.pyramid.source.convert("RGBA").crop((0, 0, 1, 1))
+    image = Image.new("RGB", (size, size), flatten(corner, WHITE).getpixel((0, 0)))
+    offset = (size - inner.width) // 2
+    if "A" in inner.getbands():
+        image.paste(inner, (offset, offset), inner.getchannel("A"))
+    else:
+        image.paste(inner, (offset, offset))
+
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def variant_requests():
+    """Return the (size, background) variants the bundle takes from IconVariants."""
+    sizes = list(FAVICON_SIZES) + [size for _, size, purpose in MANIFEST_ICONS if purpose == "any"]
+    return [(size, None) for size in sizes]
+
+
+def bundle_files(variants):
+    """Return {file name relative to the web folder: bytes} for the bundle."""
+    files = OrderedDict([("favicon.ico", favicon_bytes(variants))])
+    for name, size, purpose in MANIFEST_ICONS:
+        files[name] = maskable_bytes(variants, size) if purpose == "maskable" \
+            else variants.encoded(size)
+    return files
+
+
+def manifest_icons():
+    """Return the "icons" entries of manifest.json for MANIFEST_ICONS."""
+    icons = []
+    for name, size, purpose in MANIFEST_ICONS:
+        icon = OrderedDict([("src", name), ("sizes", f"{size}x{size}"), ("type", "image/png")])
+        if purpose != "any":
+            icon["purpose"] = purpose
+        icons.append(icon)
+    return icons
+
+
+def update_manifest(path):
+    """Point the web manifest's icons at the bundle; return True if it changed."""
+    with open(path) as f:
+        manifest = json.load(f, object_pairs_hook=OrderedDict)
+    manifest["icons"] = manifest_icons()
+    return write_if_changed(path, (json.dumps(manifest, indent=4) + "\n").encode("utf-8"))
+
+
+def update_index(path):
+    """Point index.html's favicon link at favicon.ico; return True if it changed."""
+    with open(path, encoding="utf-8") as f:
+        html = f.read()
+    sizes = " ".join(f"{size}x{size}" for size in FAVICON_SIZES)
+    link = f'<link rel="icon" type="image/x-icon" href="favicon.ico" sizes="{sizes}"/>'
+    return write_if_changed(path, FAVICON_LINK.sub(link, html, count=1).encode("utf-8"))
+
+
+def stale_files(web_dir, files):
+    """Return icons in web_dir that the bundle no longer references."""
+    icons_dir = os.path.join(web_dir, "icons")
+    names = ["favicon.png"]
+    if os.path.isdir(icons_dir):
+        names += [f"icons/{n}" for n in sorted(os.listdir(icons_dir)) if n.lower().endswith(".png")]
+    return [n for n in names if n not in files and os.path.exists(os.path.join(web_dir, n))]
+
+
+def build_bundle(variants, web_dir=WEB_DIR, prune=False):
+    """Write the web icon bundle for variants into web_dir; return a Counter."""
+    stats = Counter()
+    files = bundle_files(variants)
+    for name, data in files.items():
+        if write_if_changed(os.path.join(web_dir, name), data):
+            stats["written"] += 1
+            print(f"✅ Web: {name} ({len(data):,} bytes)")
+        else:
+            stats["unchanged"] += 1
+
+    for name, update in (("manifest.json", update_manifest), ("index.html", update_index)):
+        path = os.path.join(web_dir, name)
+        if os.path.exists(path) and update(path):
+            stats["written"] += 1
+            print(f"✅ Web: updated {name}")
+
+    for name in stale_files(web_dir, files):
+        if prune:
+            os.remove(os.path.join(web_dir, name))
+            stats["removed"] += 1
+            print(f"🗑️  Web: removed {name}")
+        else:
+            print(f"⚠️  Web: {name} is no longer referenced (remove it with --prune)")
+
+    total = sum(len(data) for data in files.values())
+    print(f"   {len(files)} web icon files, {total:,} bytes "
+          f"({stats['written']} written, {stats['unchanged']} unchanged)")
+    return stats
+
+
+def main(argv=None):
+    """Build the web icon bundle from a master icon."""
+    parser = argparse.ArgumentParser(description="Build favicon.ico and the web manifest icons")
+    parser.add_argument("--source", default=DEFAULT_SOURCE, metavar="PNG",
+                        help="master icon, at least 512px (default: the generated 512px web icon)")
+    parser.add_argument("--web-dir", default=WEB_DIR, help="Flutter web folder (default: web)")
+    parser.add_argument("--prune", action="store_true",
+                        help="remove old icons the bundle no longer references")
+    args = parser.parse_args(argv)
+
+    with Image.open(args.source) as img:
+        variants = IconVariants(img.convert("RGBA"))
+    print(f"Building web icons from {os.path.relpath(args.source)}...")
+    build_bundle(variants, args.web_dir, args.prune)
+
+
+if __name__ == "__main__":
+    main()
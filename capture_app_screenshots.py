@@ -5,29 +5,16 @@ Captures required app screenshots using ADB commands
 """
 
 import subprocess
-import time
 import os
+import sys
 from datetime import datetime
 
-def run_adb_command(command):
-    """Run an ADB command and return the result"""
-    try:
-        # Use full path to ADB with proper PowerShell execution
-        adb_path = os.path.expanduser(r"~\AppData\Local\Android\Sdk\platform-tools\adb.exe")
-        
-        # For PowerShell, we need to properly handle the command
-        full_command = f'& "{adb_path}" {command}'
-        result = subprocess.run(["powershell", "-Command", full_command], 
-                               capture_output=True, text=True, shell=False)
-        
-        if result.returncode != 0:
-            print(f"ADB command failed: {command}")
-            print(f"Error: {result.stderr}")
-            return False
-        return True  # Return True for success, since some commands output to stderr
-    except Exception as e:
-        print(f"Error running ADB command: {e}")
-        return False
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets_store"))
+from adb_client import AdbProtocolError, default_client
+from screencap import ScreencapError, capture_png
+
+# Full path to ADB from the Android SDK
+ADB_PATH = os.path.expanduser(r"~\AppData\Local\Android\Sdk\platform-tools\adb.exe")
 
 def capture_screenshot(filename, description=""):
     """Capture a screenshot and save it with the given filename"""
@@ -39,17 +26,15 @@ def capture_screenshot(filename, description=""):
     # Ensure directory exists
     os.makedirs(os.path.dirname(screenshot_path), exist_ok=True)
     
-    # Capture screenshot on device
-    if not run_adb_command("shell screencap -p /sdcard/screenshot.png"):
-        return False
-    
-    # Pull screenshot to computer
-    if not run_adb_command(f"pull /sdcard/screenshot.png {screenshot_path}"):
+    # Stream raw frames until the UI has settled and encode the PNG here; adb is
+    # called directly because PowerShell pipes would corrupt the binary output
+    adb = ADB_PATH if os.path.exists(ADB_PATH) else None
+    try:
+        capture_png(screenshot_path, adb=adb, wait_stable=True)
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError, ScreencapError) as e:
+        print(f"Error capturing screenshot: {e}")
         return False
     
-    # Clean up device
-    run_adb_command("shell rm /sdcard/screenshot.png")
-    
     print(f"Screenshot saved: {screenshot_path}")
     return True
 
@@ -59,8 +44,16 @@ def wait_for_user_input(message):
 
 def check_device_connection():
     """Check if device is connected and return device info"""
+    client = default_client()
+    if client is not None:
+        try:
+            return client.run(["devices"]).decode("utf-8").strip()
+        except (OSError, AdbProtocolError) as e:
+            print(f"Error checking device connection: {e}")
+            return False
+
     try:
-        adb_path = os.path.expanduser(r"~\AppData\Local\Android\Sdk\platform-tools\adb.exe")
+        adb_path = ADB_PATH
         full_command = f'& "{adb_path}" devices'
         result = subprocess.run(["powershell", "-Command", full_command], 
                                capture_output=True, text=True, shell=False)
@@ -134,7 +127,6 @@ def capture_all_screenshots():
             return False
         
         print("-" * 50)
-        time.sleep(1)
     
     print("🎉 All screenshots captured successfully!")
     print(f"Screenshots saved in: promotional/screenshots/android/phone/")